@@ -0,0 +1,80 @@
+"""
+Strukturis Pro — Benchmark da extração de tabelas em PDFs digitais
+Compara, página a página, o caminho por texto/regex (model.extract) com o
+caminho por posição das palavras (model.extract_layout): tempo por página
+e concordância das verbas (código, referência, vencimento, desconto).
+
+Uso:
+    python benchmark_tables.py holerites.pdf [--model "Contracheque — Padrão"] [--repeat 5]
+"""
+
+import argparse
+import time
+from core.document_models import ModelManager
+from core.pdf_layout import PDFLayout
+
+FIELDS = ('referencia', 'vencimento', 'desconto')
+
+
+def _timed(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(arg)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: regex x posição na tabela de verbas")
+    parser.add_argument('pdf')
+    parser.add_argument('--model', default="Contracheque — Padrão")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    model = ModelManager.get_model_by_name(args.model)
+    if model is None:
+        print(f"Modelo não encontrado: {args.model}")
+        return
+
+    start = time.perf_counter()
+    layouts = PDFLayout.extract(args.pdf)
+    t_layout = time.perf_counter() - start
+    layouts = {i: l for i, l in layouts.items() if l['word_count'] >= PDFLayout.MIN_WORDS}
+    if not layouts:
+        print("Nenhuma página com camada de texto.")
+        return
+
+    t_regex = t_pos = 0.0
+    n_regex = n_pos = matched = agree = 0
+    diffs = []
+    for idx, layout in layouts.items():
+        text = PDFLayout.layout_text(layout)
+        by_regex, dt = _timed(model.extract, text, args.repeat)
+        t_regex += dt
+        by_pos, dt = _timed(model.extract_layout, layout, args.repeat)
+        t_pos += dt
+
+        v_regex = {v['codigo']: v for v in by_regex.get('verbas', [])}
+        v_pos = {v['codigo']: v for v in by_pos.get('verbas', [])}
+        n_regex += len(v_regex)
+        n_pos += len(v_pos)
+        for codigo in v_regex.keys() & v_pos.keys():
+            matched += 1
+            a, b = v_regex[codigo], v_pos[codigo]
+            if all(a.get(f) == b.get(f) for f in FIELDS):
+                agree += 1
+            elif len(diffs) < 10:
+                diffs.append((idx + 1, codigo, a.get('descricao'),
+                              {f: a.get(f) for f in FIELDS}, {f: b.get(f) for f in FIELDS}))
+
+    pages = len(layouts)
+    print(f"Páginas digitais: {pages}  (leitura do layout: {t_layout * 1000 / pages:.2f} ms/página)")
+    print(f"Regex:   {t_regex * 1000 / pages:8.3f} ms/página   {n_regex} verbas")
+    print(f"Posição: {t_pos * 1000 / pages:8.3f} ms/página   {n_pos} verbas")
+    if matched:
+        print(f"Verbas em comum: {matched}  —  colunas idênticas em {agree} ({agree * 100 / matched:.1f}%)")
+    for page, codigo, descricao, a, b in diffs:
+        print(f"  pág. {page} [{codigo}] {descricao}\n      regex:   {a}\n      posição: {b}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 """
 Strukturis Pro — Parser de Dados e Exportação Inteligente
-Exporta para Excel (formatado), CSV (UTF-8 BOM), e PDF (relatório).
+Exporta para Excel (formatado), CSV (UTF-8 BOM), PDF (relatório) e
+PDF pesquisável (camada de texto sobre a imagem).
 """
 
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import re
 from io import StringIO, BytesIO
@@ -273,3 +277,88 @@ class Exporter:
         """Exporta texto puro."""
         with open(path, 'w', encoding='utf-8') as f:
             f.write(text)
+
+    SEARCHABLE_CHUNK = 16
+    IMAGE_DPI = 150  # tamanho de página assumido para arquivos de imagem
+
+    @staticmethod
+    def to_searchable_pdf(source_path, path, lang='por', pages=None, workers=None,
+                          progress_callback=None):
+        """
+        Gera um PDF pesquisável: cada página original recebe por cima uma
+        camada de texto invisível (renderizador PDF do Tesseract, modo só
+        texto), gerada em paralelo entre as páginas.
+        Páginas que já têm camada de texto são copiadas sem OCR.
+        O documento é montado em partes de SEARCHABLE_CHUNK páginas gravadas
+        em disco e mescladas em fluxo, sem manter todas as imagens na memória.
+        pages: lista 0-based, None = todas. progress_callback(feitas, total).
+        """
+        import fitz
+        from core.image_processing import ImageProcessing
+        from core.ocr_manager import OCRManager
+        from core.pdf_layout import PDFLayout
+        from core.pdf_tools import PDFTools
+
+        is_pdf = source_path.lower().endswith('.pdf')
+        total = ImageProcessing.get_pdf_page_count(source_path) if is_pdf else 1
+        pages = list(range(total)) if pages is None else pages
+        digital = set(PDFLayout.text_pages(source_path, pages)) if is_pdf else set()
+        done = 0
+
+        src = fitz.open(source_path) if is_pdf else None
+        try:
+            out_dir = os.path.dirname(os.path.abspath(path))
+            with tempfile.TemporaryDirectory(dir=out_dir) as tmp, \
+                    ThreadPoolExecutor(max_workers=workers or OCRManager.MAX_WORKERS) as pool:
+                parts = []
+                for start in range(0, len(pages), Exporter.SEARCHABLE_CHUNK):
+                    chunk = pages[start:start + Exporter.SEARCHABLE_CHUNK]
+
+                    # Render sequencial (MuPDF), OCR em paralelo (processos do Tesseract)
+                    layers, images = {}, {}
+                    for idx in chunk:
+                        if idx in digital:
+                            continue
+                        img = ImageProcessing.load_pdf_as_image(source_path, idx) if is_pdf \
+                            else ImageProcessing.load_image(source_path)
+                        if img is None:
+                            continue
+                        if not is_pdf:
+                            images[idx] = img.shape[:2]
+                        layers[idx] = pool.submit(OCRManager.text_layer_pdf, ImageProcessing.to_grayscale(img), lang)
+                        del img
+
+                    part = fitz.open()
+                    for idx in chunk:
+                        if is_pdf:
+                            part.insert_pdf(src, from_page=idx, to_page=idx)
+                            page = part[-1]
+                        else:
+                            h, w = images.get(idx, (792, 612))
+                            page = part.new_page(width=w * 72 / Exporter.IMAGE_DPI, height=h * 72 / Exporter.IMAGE_DPI)
+                            page.insert_image(page.rect, filename=source_path)
+
+                        layer_pdf = layers[idx].result() if idx in layers else None
+                        if layer_pdf:
+                            layer = fitz.open("pdf", layer_pdf)
+                            page.show_pdf_page(page.rect, layer, 0, keep_proportion=False, overlay=True)
+                            layer.close()
+
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(pages))
+
+                    part_path = os.path.join(tmp, f"parte_{len(parts) + 1}.pdf")
+                    part.save(part_path, garbage=3, deflate=True)
+                    part.close()
+                    parts.append(part_path)
+
+                if not parts:
+                    return False
+                return PDFTools.merge_pdfs(parts, path)
+        except Exception as e:
+            print(f"Erro ao gerar PDF pesquisável: {e}")
+            return False
+        finally:
+            if src is not None:
+                src.close()
@@ -0,0 +1,122 @@
+"""
+Strukturis Pro — Motor de Detecção de Modelos
+Uma única passada sobre o texto: autômato Aho-Corasick com as palavras-chave
+de todos os modelos mais um conjunto compartilhado de contagens por regex.
+Cada modelo pontua a partir desse vetor de características, então o custo
+da detecção não cresce com o número de variantes.
+"""
+
+import re
+from collections import OrderedDict, deque
+
+
+class KeywordAutomaton:
+    """Autômato Aho-Corasick (DFA completo) para busca simultânea de palavras-chave."""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        out = [set()]
+        for kw in keywords:
+            state = 0
+            for ch in kw:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].add(kw)
+
+        # Falhas em largura; cada estado herda as transições e saídas do seu
+        # estado de falha, de modo que a busca nunca precisa retroceder
+        root = self._goto[0]
+        fail = [0] * len(self._goto)
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    f = fail[state]
+                    fail[nxt] = self._goto[f].get(ch) or root.get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+            if state:
+                for ch, nxt in self._goto[fail[state]].items():
+                    self._goto[state].setdefault(ch, nxt)
+        self._out = [frozenset(o) for o in out]
+
+    def find(self, text: str) -> set:
+        """Conjunto das palavras-chave presentes em text (já em minúsculas)."""
+        goto, out, root = self._goto, self._out, self._goto[0]
+        found = set()
+        state = 0
+        for ch in text:
+            state = goto[state].get(ch) or root.get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class DetectionEngine:
+    """Vetor de características do texto, compartilhado por todos os modelos."""
+
+    _DIA = r'(?:Seg|Ter|Qua|Qui|Sex|Sáb|Dom)'
+
+    # Contagens por regex disponíveis a todos os modelos
+    FEATURES = {
+        'mm_yyyy': re.compile(r'\b\d{2}/\d{4}\b'),
+        'mon_yyyy': re.compile(r'\b(?:JAN|FEV|MAR|ABR|MAI|JUN|JUL|AGO|SET|OUT|NOV|DEZ)/\d{4}\b'),
+        'full_dates': re.compile(r'\d{2}/\d{2}/\d{4}\s+' + _DIA, re.IGNORECASE),
+        'short_dates': re.compile(r'^\d{2}/\d{2}\s+' + _DIA, re.IGNORECASE | re.MULTILINE),
+        'weekday_dates': re.compile(_DIA + r',?\s*\d{2}/\d{2}/\d{4}', re.IGNORECASE),
+        'date_range': re.compile(r'\d{2}/\d{2}/\d{4}\s+[àa]\s+\d{2}/\d{2}/\d{4}'),
+        'linha_digitavel': re.compile(r'\d{5}\.\d{5}\s+\d{5}\.\d{6}\s+\d{5}\.\d{6}\s+\d\s+\d{14}'),
+    }
+
+    MAX_COMPILED = 16
+    _compiled = OrderedDict()
+
+    @staticmethod
+    def keywords_of(model) -> list:
+        """Palavras-chave do modelo; uma entrada pode ser uma tupla de alternativas."""
+        words = []
+        for kw, _ in getattr(model, 'KEYWORDS', ()):
+            words.extend(kw if isinstance(kw, tuple) else (kw,))
+        return words
+
+    @staticmethod
+    def compile(models):
+        """Autômato e regexes para a lista de modelos (com cache por lista)."""
+        key = tuple(models)
+        compiled = DetectionEngine._compiled.get(key)
+        if compiled is None:
+            words = set()
+            features = dict(DetectionEngine.FEATURES)
+            for model in models:
+                words.update(w.lower() for w in DetectionEngine.keywords_of(model))
+                features.update(getattr(model, 'FEATURES', {}))
+            compiled = (KeywordAutomaton(sorted(words)), features)
+            DetectionEngine._compiled[key] = compiled
+            while len(DetectionEngine._compiled) > DetectionEngine.MAX_COMPILED:
+                DetectionEngine._compiled.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    def features(text: str, models) -> dict:
+        """
+        Características de text para os modelos: 'keywords' (conjunto das
+        palavras-chave encontradas), 'pipes' e uma contagem por regex de FEATURES.
+        """
+        automaton, regexes = DetectionEngine.compile(models)
+        text = text or ''
+        f = {'keywords': automaton.find(text.lower()), 'pipes': text.count('|')}
+        for name, regex in regexes.items():
+            f[name] = sum(1 for _ in regex.finditer(text))
+        return f
+
+    @staticmethod
+    def rank(text: str, models) -> list:
+        """[(modelo, score)] na ordem de models, todos pontuados com uma única passada."""
+        f = DetectionEngine.features(text, models)
+        return [(model, model.score(f)) for model in models]
@@ -4,8 +4,14 @@ Suporta múltiplas variantes por tipo (ex: contracheque-default, contracheque-be
 Auto-detecção inteligente com sub-variante matching.
 """
 
+import copy
+import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
 import pandas as pd
+from core.detection import DetectionEngine
 
 
 def _to_float_br(valor):
@@ -28,15 +34,81 @@ class BaseDocumentModel:
     DESCRIPTION = "Modelo genérico"
     CATEGORY = "Outros"
     VARIANT = "Padrão"
+    # OCR zonal opcional: {nome: {'box': (x0, y0, x1, y1) normalizado 0..1, 'config': opções do Tesseract}}
+    ZONES = {}
+    # Tabela com linhas de grade: OCR por célula (ver ImageProcessing.detect_table_grid)
+    TABLE_GRID = False
+    # Remover linhas de grade antes do OCR (None = padrão do pipeline)
+    REMOVE_LINES = None
+    # Caminhos rápidos (grade, zonas) só são aceitos com estes campos e ao
+    # menos uma linha em data[TABLE_KEY] (ver is_complete)
+    REQUIRED_FIELDS = ()
+    TABLE_KEY = None
+    # Detecção (ver core.detection): [(palavra-chave ou tupla de alternativas, peso)]
+    KEYWORDS = []
+    # Contagens por regex próprias do modelo, além de DetectionEngine.FEATURES
+    FEATURES = {}
 
-    @staticmethod
-    def detect(text: str) -> float:
-        return 0.0
+    @classmethod
+    def detect(cls, text: str) -> float:
+        """Score do modelo isolado; a auto-detecção pontua todos de uma vez."""
+        return cls.score(DetectionEngine.features(text, [cls]))
+
+    @classmethod
+    def keyword_score(cls, f: dict) -> float:
+        """Soma dos pesos das palavras-chave encontradas (alternativas contam uma vez)."""
+        found = f['keywords']
+        score = 0.0
+        for kw, weight in cls.KEYWORDS:
+            if any(k.lower() in found for k in (kw if isinstance(kw, tuple) else (kw,))):
+                score += weight
+        return score
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        """Score a partir das características do texto (DetectionEngine.features)."""
+        return min(max(cls.keyword_score(f), 0), 1.0)
 
     @staticmethod
     def extract(text: str) -> dict:
         return {}
 
+    @classmethod
+    def is_complete(cls, data: dict) -> bool:
+        """Resultado estruturado confiável: campos obrigatórios e linhas da tabela principal."""
+        if not data or any(not data.get(k) for k in cls.REQUIRED_FIELDS):
+            return False
+        if cls.TABLE_KEY:
+            return bool(data.get(cls.TABLE_KEY))
+        return any(v for k, v in data.items() if k != 'tipo_documento')
+
+    @classmethod
+    def extract_zones(cls, zone_texts: dict) -> dict:
+        """Extração a partir do texto de cada zona. Padrão: junta as zonas e usa extract()."""
+        return cls.extract('\n'.join(zone_texts.values()))
+
+    @classmethod
+    def grid_header(cls, rows: list):
+        """
+        Índice da linha de cabeçalho da grade cujas colunas o modelo sabe
+        mapear, ou None. Sem cabeçalho mapeado o caminho da grade é descartado.
+        """
+        return None
+
+    @classmethod
+    def extract_grid(cls, rows: list, header_text: str = '') -> dict:
+        """Extração a partir da matriz de células. Padrão: reconstrói as linhas e usa extract()."""
+        lines = ['  '.join(c for c in row if c) for row in rows]
+        return cls.extract('\n'.join([header_text] + lines))
+
+    @classmethod
+    def extract_layout(cls, layout: dict) -> dict:
+        """
+        Extração a partir da camada de texto de um PDF digital (ver
+        PDFLayout.extract_page). Padrão: texto em linhas e extract().
+        """
+        return cls.extract('\n'.join(line['text'] for line in layout['lines']))
+
     @classmethod
     def to_dataframe(cls, data: dict) -> pd.DataFrame:
         if not data:
@@ -72,22 +144,34 @@ class ContrachequeDefaultModel(BaseDocumentModel):
     DESCRIPTION = "Holerite com colunas separadas por espaço, data em MM/YYYY"
     CATEGORY = "Contracheque"
     VARIANT = "Padrão (espaço)"
+    # Layout estável: só as faixas com dados são lidas — competência/CNPJ,
+    # linhas de verbas (sem o cabeçalho das colunas) e a linha de totais;
+    # as bordas são ajustadas a linhas em branco (OCRManager.snap_rows)
+    ZONES = {
+        'header': {'box': (0.0, 0.0, 1.0, 0.16), 'config': '--psm 6'},
+        'table': {'box': (0.0, 0.24, 1.0, 0.76), 'config': '--psm 6'},
+        'totals': {'box': (0.0, 0.76, 1.0, 0.86), 'config': '--psm 6'},
+    }
+    REQUIRED_FIELDS = ('mes_ano',)
+    TABLE_KEY = 'verbas'
+    TABLE_GRID = True
+    REMOVE_LINES = True
+    # Cabeçalhos de coluna da tabela de verbas (ordem importa: DESCONTO antes de DESCRI)
+    GRID_COLUMNS = [('CÓD', 'codigo'), ('COD', 'codigo'), ('DESCONTO', 'desconto'),
+                    ('DESCRI', 'descricao'), ('REF', 'referencia'), ('VENC', 'vencimento')]
+
+    KEYWORDS = [('demonstrativo de pagamento', .35), ('contracheque', .35),
+                ('holerite', .30), ('salário base', .15), ('total de vencimentos', .15),
+                ('fgts', .08), ('inss', .08), ('vencimentos', .08), ('descontos', .08)]
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('demonstrativo de pagamento', .35), ('contracheque', .35),
-               ('holerite', .30), ('salário base', .15), ('total de vencimentos', .15),
-               ('fgts', .08), ('inss', .08), ('vencimentos', .08), ('descontos', .08)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
         # Padrão de MM/YYYY
-        if re.search(r'\b\d{2}/\d{4}\b', text):
+        if f['mm_yyyy']:
             score += 0.05
         # Se tem pipe => provavelmente é formato Belshop, penaliza
-        if '|' in text and text.count('|') > 5:
+        if f['pipes'] > 5:
             score -= 0.20
         return min(max(score, 0), 1.0)
 
@@ -120,36 +204,138 @@ class ContrachequeDefaultModel(BaseDocumentModel):
                 'vencimento': venc, 'desconto': desc}
 
     @staticmethod
-    def extract(text: str) -> dict:
-        lines = [l.strip() for l in text.split('\n') if l.strip()]
-        data = {'tipo_documento': 'Contracheque'}
+    def _extract_mes_ano(lines, data):
         for line in lines:
             m = re.search(r'(\d{2})/(\d{4})', line)
             if m:
                 data['mes_ano'] = f"{m.group(1)}/{m.group(2)}"
                 break
-        verbas, in_table = [], False
+
+    @staticmethod
+    def _extract_cnpj(text, data):
+        cnpj = re.search(r'\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}', text)
+        if cnpj:
+            data['cnpj'] = cnpj.group()
+
+    @staticmethod
+    def _extract_totais(line, data):
+        vals = re.findall(r'\d{1,3}(?:\.\d{3})*,\d{2}', line)
+        if 'TOTAL DE VENCIMENTOS' in line and vals:
+            data['total_vencimentos'] = vals[0]
+            data['total_descontos'] = vals[1] if len(vals) >= 2 else None
+
+    @staticmethod
+    def _scan_table(lines, data, in_table=False):
+        """Lê as verbas entre o cabeçalho da tabela e a linha de totais."""
+        verbas = []
         for line in lines:
             if 'CÓD' in line.upper() and 'DESCRIÇÃO' in line.upper():
                 in_table = True
                 continue
             if any(k in line for k in ['TOTAL DE VENCIMENTOS', 'TOTAIS', 'BASE CÁLC']):
-                vals = re.findall(r'\d{1,3}(?:\.\d{3})*,\d{2}', line)
-                if 'TOTAL DE VENCIMENTOS' in line and vals:
-                    data['total_vencimentos'] = vals[0] if vals else None
-                    data['total_descontos'] = vals[1] if len(vals) >= 2 else None
+                ContrachequeDefaultModel._extract_totais(line, data)
                 in_table = False
                 continue
             if in_table:
                 parsed = ContrachequeDefaultModel._parse_linha(line)
                 if parsed:
                     verbas.append(parsed)
+        return verbas
+
+    @staticmethod
+    def extract(text: str) -> dict:
+        lines = [l.strip() for l in text.split('\n') if l.strip()]
+        data = {'tipo_documento': 'Contracheque'}
+        ContrachequeDefaultModel._extract_mes_ano(lines, data)
+        data['verbas'] = ContrachequeDefaultModel._scan_table(lines, data)
+        ContrachequeDefaultModel._extract_cnpj(text, data)
+        return data
+
+    @staticmethod
+    def extract_zones(zone_texts: dict) -> dict:
+        def _lines(name):
+            return [l.strip() for l in zone_texts.get(name, '').split('\n') if l.strip()]
+
+        header = zone_texts.get('header', '')
+        data = {'tipo_documento': 'Contracheque'}
+        ContrachequeDefaultModel._extract_mes_ano(_lines('header'), data)
+        # A zona da tabela só tem linhas de verbas: cada uma vai direto ao
+        # parser de linha, sem procurar o cabeçalho das colunas
+        parsed = (ContrachequeDefaultModel._parse_linha(l) for l in _lines('table'))
+        data['verbas'] = [p for p in parsed if p]
+        for line in _lines('totals'):
+            ContrachequeDefaultModel._extract_totais(line, data)
+        ContrachequeDefaultModel._extract_cnpj(header, data)
+        return data
+
+    @staticmethod
+    def _map_grid_header(row):
+        mapping = {}
+        for i, cell in enumerate(row):
+            cell = cell.upper()
+            for label, key in ContrachequeDefaultModel.GRID_COLUMNS:
+                if label in cell and key not in mapping:
+                    mapping[key] = i
+                    break
+        return mapping if 'codigo' in mapping and 'descricao' in mapping else None
+
+    @classmethod
+    def grid_header(cls, rows: list):
+        return next((i for i, r in enumerate(rows) if cls._map_grid_header(r)), None)
+
+    @classmethod
+    def extract_grid(cls, rows: list, header_text: str = '') -> dict:
+        # Colunas vêm da posição na grade: sem adivinhar vencimento/desconto
+        header_idx = cls.grid_header(rows)
+        if header_idx is None:
+            return super().extract_grid(rows, header_text)
+        cols = cls._map_grid_header(rows[header_idx])
+
+        def cell(row, key):
+            i = cols.get(key)
+            return row[i].strip() if i is not None and i < len(row) and row[i].strip() else None
+
+        data = {'tipo_documento': 'Contracheque'}
+        header_lines = [l.strip() for l in header_text.split('\n') if l.strip()]
+        cls._extract_mes_ano(header_lines, data)
+        verbas = []
+        for row in rows[header_idx + 1:]:
+            joined = ' '.join(row)
+            if 'TOTAL DE VENCIMENTOS' in joined.upper():
+                vals = re.findall(r'\d{1,3}(?:\.\d{3})*,\d{2}', joined)
+                data['total_vencimentos'] = cell(row, 'vencimento') or (vals[0] if vals else None)
+                data['total_descontos'] = cell(row, 'desconto') or (vals[1] if len(vals) >= 2 else None)
+                break
+            codigo = cell(row, 'codigo')
+            if not codigo or not re.match(r'^\d{3,4}$', codigo):
+                continue
+            verbas.append({'codigo': codigo, 'descricao': cell(row, 'descricao') or '',
+                           'referencia': cell(row, 'referencia'),
+                           'vencimento': cell(row, 'vencimento'), 'desconto': cell(row, 'desconto')})
         data['verbas'] = verbas
-        cnpj = re.search(r'\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}', text)
-        if cnpj:
-            data['cnpj'] = cnpj.group()
+        cls._extract_cnpj(header_text, data)
         return data
 
+    @classmethod
+    def extract_layout(cls, layout: dict) -> dict:
+        # PDF digital: as colunas saem da posição das palavras sob o cabeçalho
+        # da tabela, em uma passada, e seguem o mesmo mapeamento da grade
+        from core.pdf_layout import PDFLayout
+
+        lines = layout['lines']
+        for i, line in enumerate(lines):
+            cells = PDFLayout.line_cells(line)
+            if cls._map_grid_header([c[2] for c in cells]):
+                rows = PDFLayout.to_grid(lines[i:], [(c[0], c[1]) for c in cells])
+                header_text = '\n'.join(l['text'] for l in lines[:i])
+                data = cls.extract_grid(rows, header_text)
+                if data.get('verbas'):
+                    if 'cnpj' not in data:
+                        cls._extract_cnpj('\n'.join(l['text'] for l in lines), data)
+                    return data
+                break
+        return super().extract_layout(layout)
+
     @classmethod
     def to_dataframe(cls, data):
         v = data.get('verbas', [])
@@ -166,20 +352,18 @@ class ContrachequeBelshopModel(BaseDocumentModel):
     DESCRIPTION = "Holerite com colunas separadas por '|', possível texto invertido"
     CATEGORY = "Contracheque"
     VARIANT = "Belshop (pipe)"
+    # Colunas separadas por '|': as linhas verticais fazem parte do texto
+    REMOVE_LINES = False
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        if '|' in text and text.count('|') > 5:
-            score += 0.30
-        kws = [('contracheque', .20), ('holerite', .20), ('total de vencimentos', .15),
-               ('base/outros', .20), ('mensalista', .15)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
+    KEYWORDS = [('contracheque', .20), ('holerite', .20), ('total de vencimentos', .15),
+                ('base/outros', .20), ('mensalista', .15)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = 0.30 if f['pipes'] > 5 else 0.0
+        score += cls.keyword_score(f)
         # Se NÃO tem pipe, penaliza muito
-        if text.count('|') < 3:
+        if f['pipes'] < 3:
             score -= 0.40
         return min(max(score, 0), 1.0)
 
@@ -248,19 +432,16 @@ class ContrachequeJanModel(BaseDocumentModel):
     CATEGORY = "Contracheque"
     VARIANT = "JAN/YYYY (textual)"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('contracheque', .20), ('holerite', .20), ('salário base', .10),
-               ('total de vencimentos', .10)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
+    KEYWORDS = [('contracheque', .20), ('holerite', .20), ('salário base', .10),
+                ('total de vencimentos', .10)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
         # Esse modelo usa JAN/2025
-        if re.search(r'\b(JAN|FEV|MAR|ABR|MAI|JUN|JUL|AGO|SET|OUT|NOV|DEZ)/\d{4}\b', text):
+        if f['mon_yyyy']:
             score += 0.35
-        if text.count('|') > 5:
+        if f['pipes'] > 5:
             score -= 0.20
         return min(max(score, 0), 1.0)
 
@@ -320,30 +501,26 @@ class CartaoPontoHorizontalModel(BaseDocumentModel):
     DATA_RE = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(Seg|Ter|Qua|Qui|Sex|Sáb|Dom)', re.IGNORECASE)
     HORA_RE = re.compile(r'\b(\d{2}:\d{2})\b')
     FOLGAS = ['folga', 'casa', 'ausente', 'falta', '(-)', 'feriado', 'n.admitido']
+    TABLE_GRID = True
+    REMOVE_LINES = True
+    TABLE_KEY = 'registros'
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('cartão ponto', .30), ('cartao ponto', .30), ('espelho de ponto', .30),
-               ('horário de trabalho', .15), ('banco de horas', .10), ('empregado:', .08),
-               ('período:', .08), ('função:', .08)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        dates = re.findall(r'\d{2}/\d{2}/\d{4}\s+(?:Seg|Ter|Qua|Qui|Sex|Sáb|Dom)', text, re.IGNORECASE)
-        if len(dates) > 5:
+    KEYWORDS = [('cartão ponto', .30), ('cartao ponto', .30), ('espelho de ponto', .30),
+                ('horário de trabalho', .15), ('banco de horas', .10), ('empregado:', .08),
+                ('período:', .08), ('função:', .08)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
+        if f['full_dates'] > 5:
             score += 0.30
-        # Check for DD/MM without year (CurtaModel territory)
-        short_dates = re.findall(r'^\d{2}/\d{2}\s+(?:seg|ter|qua|qui|sex|sáb|dom)', text, re.IGNORECASE | re.MULTILINE)
-        if len(short_dates) > len(dates):
+        # DD/MM sem ano é território do CurtaModel
+        if f['short_dates'] > f['full_dates']:
             score -= 0.15
         return min(max(score, 0), 1.0)
 
     @staticmethod
-    def extract(text: str) -> dict:
-        data = {'tipo_documento': 'Cartão Ponto (Horizontal)', 'registros': []}
-        lines = text.split('\n')
+    def _extract_header(lines, data):
         for line in lines:
             m = re.search(r'Empregado:\s*\d+-(.+?)(?:\s+Carteira|\s+Admissão|\s*$)', line)
             if m:
@@ -352,22 +529,67 @@ class CartaoPontoHorizontalModel(BaseDocumentModel):
             if m2:
                 data['periodo_inicio'], data['periodo_fim'] = m2.group(1), m2.group(2)
 
+    @staticmethod
+    def _registro(data_str, dia, line, horas):
+        reg = {'data': data_str, 'dia_semana': dia}
+        if any(w in line.lower() for w in CartaoPontoHorizontalModel.FOLGAS):
+            reg.update({'status': 'Folga', 'entrada1': '', 'saida1': '', 'entrada2': '', 'saida2': ''})
+        else:
+            marcacoes = horas[4:8] if len(horas) > 4 else horas[:4]
+            reg['status'] = 'Normal'
+            reg['entrada1'] = marcacoes[0] if len(marcacoes) >= 1 else ''
+            reg['saida1'] = marcacoes[1] if len(marcacoes) >= 2 else ''
+            reg['entrada2'] = marcacoes[2] if len(marcacoes) >= 3 else ''
+            reg['saida2'] = marcacoes[3] if len(marcacoes) >= 4 else ''
+        return reg
+
+    @staticmethod
+    def extract(text: str) -> dict:
+        data = {'tipo_documento': 'Cartão Ponto (Horizontal)', 'registros': []}
+        lines = text.split('\n')
+        CartaoPontoHorizontalModel._extract_header(lines, data)
+
         for line in lines:
             dm = CartaoPontoHorizontalModel.DATA_RE.search(line)
             if not dm:
                 continue
-            reg = {'data': dm.group(1), 'dia_semana': dm.group(2)}
-            if any(w in line.lower() for w in CartaoPontoHorizontalModel.FOLGAS):
-                reg.update({'status': 'Folga', 'entrada1': '', 'saida1': '', 'entrada2': '', 'saida2': ''})
+            horas = CartaoPontoHorizontalModel.HORA_RE.findall(line)
+            data['registros'].append(
+                CartaoPontoHorizontalModel._registro(dm.group(1), dm.group(2), line, horas))
+        return data
+
+    @staticmethod
+    def _marc_cols(row):
+        return [i for i, c in enumerate(row) if c.strip().lower().startswith(('ent', 'saí', 'sai'))]
+
+    @classmethod
+    def grid_header(cls, rows: list):
+        return next((i for i, r in enumerate(rows) if len(cls._marc_cols(r)) >= 2), None)
+
+    @classmethod
+    def extract_grid(cls, rows: list, header_text: str = '') -> dict:
+        data = {'tipo_documento': 'Cartão Ponto (Horizontal)', 'registros': []}
+        cls._extract_header(header_text.split('\n'), data)
+        # Colunas de marcação identificadas pelo cabeçalho da grade (Ent./Saí.)
+        header_idx = cls.grid_header(rows)
+        marc_cols = cls._marc_cols(rows[header_idx]) if header_idx is not None else None
+
+        for row in rows:
+            line = ' '.join(row)
+            dm = cls.DATA_RE.search(line)
+            if not dm:
+                continue
+            if marc_cols:
+                horas = [row[i].strip() if i < len(row) and cls.HORA_RE.fullmatch(row[i].strip()) else ''
+                         for i in marc_cols]
+                reg = cls._registro(dm.group(1), dm.group(2), line, horas)
             else:
-                horas = CartaoPontoHorizontalModel.HORA_RE.findall(line)
-                marcacoes = horas[4:8] if len(horas) > 4 else horas[:4]
-                reg['status'] = 'Normal'
-                reg['entrada1'] = marcacoes[0] if len(marcacoes) >= 1 else ''
-                reg['saida1'] = marcacoes[1] if len(marcacoes) >= 2 else ''
-                reg['entrada2'] = marcacoes[2] if len(marcacoes) >= 3 else ''
-                reg['saida2'] = marcacoes[3] if len(marcacoes) >= 4 else ''
+                # Sem cabeçalho: uma marcação por célula, na ordem das colunas
+                horas = [c.strip() for c in row if cls.HORA_RE.fullmatch(c.strip())]
+                reg = cls._registro(dm.group(1), dm.group(2), line, horas)
             data['registros'].append(reg)
+        if not data['registros']:
+            return super().extract_grid(rows, header_text)
         return data
 
     @classmethod
@@ -387,21 +609,16 @@ class CartaoPontoCurtaModel(BaseDocumentModel):
     CATEGORY = "Cartão Ponto"
     VARIANT = "Curta (DD/MM)"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('cartão ponto', .25), ('cartao ponto', .25), ('espelho de ponto', .25)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        short = re.findall(r'^\d{2}/\d{2}\s+(?:seg|ter|qua|qui|sex|sáb|dom)', text, re.IGNORECASE | re.MULTILINE)
-        if len(short) > 5:
+    KEYWORDS = [('cartão ponto', .25), ('cartao ponto', .25), ('espelho de ponto', .25)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
+        if f['short_dates'] > 5:
             score += 0.35
-        if re.search(r'\d{2}/\d{2}/\d{4}\s+[àa]\s+\d{2}/\d{2}/\d{4}', text):
+        if f['date_range']:
             score += 0.15
-        full = re.findall(r'\d{2}/\d{2}/\d{4}\s+(?:Seg|Ter|Qua|Qui|Sex|Sáb|Dom)', text, re.IGNORECASE)
-        if len(full) > len(short):
+        if f['full_dates'] > f['short_dates']:
             score -= 0.20
         return min(max(score, 0), 1.0)
 
@@ -462,17 +679,13 @@ class CartaoPontoPontoMaisModel(BaseDocumentModel):
     CATEGORY = "Cartão Ponto"
     VARIANT = "PontoMais"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        if 'pontomais' in t or 'ponto mais' in t:
-            score += 0.40
-        matches = re.findall(r'(?:Seg|Ter|Qua|Qui|Sex|Sáb|Dom),?\s*\d{2}/\d{2}/\d{4}', text, re.IGNORECASE)
-        if len(matches) > 5:
+    KEYWORDS = [(('pontomais', 'ponto mais'), .40), (('cartão', 'ponto'), .10)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
+        if f['weekday_dates'] > 5:
             score += 0.35
-        if 'cartão' in t or 'ponto' in t:
-            score += 0.10
         return min(max(score, 0), 1.0)
 
     @staticmethod
@@ -520,17 +733,9 @@ class NotaFiscalModel(BaseDocumentModel):
     CATEGORY = "Nota Fiscal"
     VARIANT = "NF-e / DANFE"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('nota fiscal', .30), ('danfe', .35), ('nf-e', .30), ('chave de acesso', .20),
-               ('icms', .10), ('destinatário', .10), ('emitente', .10), ('cfop', .10),
-               ('natureza da operação', .10)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        return min(score, 1.0)
+    KEYWORDS = [('nota fiscal', .30), ('danfe', .35), ('nf-e', .30), ('chave de acesso', .20),
+                ('icms', .10), ('destinatário', .10), ('emitente', .10), ('cfop', .10),
+                ('natureza da operação', .10)]
 
     @staticmethod
     def extract(text: str) -> dict:
@@ -566,16 +771,8 @@ class NFSeModel(BaseDocumentModel):
     CATEGORY = "Nota Fiscal"
     VARIANT = "NFS-e"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('nfs-e', .35), ('nota fiscal de serviço', .35), ('prestador', .15),
-               ('tomador', .15), ('iss', .10), ('issqn', .15)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        return min(score, 1.0)
+    KEYWORDS = [('nfs-e', .35), ('nota fiscal de serviço', .35), ('prestador', .15),
+                ('tomador', .15), ('iss', .10), ('issqn', .15)]
 
     @staticmethod
     def extract(text: str) -> dict:
@@ -609,16 +806,13 @@ class BoletoModel(BaseDocumentModel):
     CATEGORY = "Boleto"
     VARIANT = "Padrão"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('boleto', .30), ('linha digitável', .25), ('beneficiário', .15),
-               ('sacado', .15), ('nosso número', .15), ('cedente', .15)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        if re.search(r'\d{5}\.\d{5}\s+\d{5}\.\d{6}\s+\d{5}\.\d{6}\s+\d\s+\d{14}', text):
+    KEYWORDS = [('boleto', .30), ('linha digitável', .25), ('beneficiário', .15),
+                ('sacado', .15), ('nosso número', .15), ('cedente', .15)]
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
+        if f['linha_digitavel']:
             score += 0.30
         return min(score, 1.0)
 
@@ -648,16 +842,8 @@ class ReciboModel(BaseDocumentModel):
     CATEGORY = "Recibo"
     VARIANT = "Padrão"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('recibo', .35), ('recebi de', .25), ('importância de', .20),
-               ('quitação', .15), ('para devida comprovação', .20)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        return min(score, 1.0)
+    KEYWORDS = [('recibo', .35), ('recebi de', .25), ('importância de', .20),
+                ('quitação', .15), ('para devida comprovação', .20)]
 
     @staticmethod
     def extract(text: str) -> dict:
@@ -685,16 +871,8 @@ class ExtratoBancarioModel(BaseDocumentModel):
     CATEGORY = "Extrato"
     VARIANT = "Padrão"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('extrato', .25), ('saldo anterior', .25), ('saldo final', .20),
-               ('conta corrente', .15), ('lançamentos', .10), ('movimentação', .10)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        return min(score, 1.0)
+    KEYWORDS = [('extrato', .25), ('saldo anterior', .25), ('saldo final', .20),
+                ('conta corrente', .15), ('lançamentos', .10), ('movimentação', .10)]
 
     @staticmethod
     def extract(text: str) -> dict:
@@ -722,16 +900,8 @@ class ContratoModel(BaseDocumentModel):
     CATEGORY = "Contrato"
     VARIANT = "Padrão"
 
-    @staticmethod
-    def detect(text: str) -> float:
-        t = text.lower()
-        score = 0.0
-        kws = [('contrato', .25), ('contratante', .20), ('contratado', .20),
-               ('cláusula', .20), ('vigência', .10), ('testemunhas', .10)]
-        for kw, s in kws:
-            if kw in t:
-                score += s
-        return min(score, 1.0)
+    KEYWORDS = [('contrato', .25), ('contratante', .20), ('contratado', .20),
+                ('cláusula', .20), ('vigência', .10), ('testemunhas', .10)]
 
     @staticmethod
     def extract(text: str) -> dict:
@@ -752,7 +922,7 @@ class ContratoModel(BaseDocumentModel):
 # Model Manager
 # ═══════════════════════════════════════════════════════════════════════════
 
-ALL_MODELS = [
+BUILTIN_MODELS = [
     ContrachequeDefaultModel,
     ContrachequeBelshopModel,
     ContrachequeJanModel,
@@ -767,53 +937,185 @@ ALL_MODELS = [
     ContratoModel,
 ]
 
+# Modelos embutidos + declarativos (core.model_specs); atualizada no lugar
+# a cada recarga dos specs, para quem importou a lista
+ALL_MODELS = list(BUILTIN_MODELS)
+
 # Organize by category for library UI
 CATEGORIES = {}
-for _m in ALL_MODELS:
-    cat = _m.CATEGORY
-    if cat not in CATEGORIES:
-        CATEGORIES[cat] = []
-    CATEGORIES[cat].append(_m)
+
+
+def _group_categories():
+    CATEGORIES.clear()
+    for _m in ALL_MODELS:
+        cat = _m.CATEGORY
+        if cat not in CATEGORIES:
+            CATEGORIES[cat] = []
+        CATEGORIES[cat].append(_m)
+
+
+_group_categories()
 
 
 class ModelManager:
+    # Memo de detecção/extração por texto: o mesmo texto de página passa por
+    # SmartParser, process() e pela detecção ao carregar o arquivo
+    MEMO_SIZE = 256
+    _memo = OrderedDict()
+    _memo_lock = threading.Lock()
+    _memo_stats = {'detect_hits': 0, 'detect_misses': 0, 'extract_hits': 0, 'extract_misses': 0}
+
+    @staticmethod
+    def text_digest(text: str) -> bytes:
+        return hashlib.blake2b((text or '').encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    @staticmethod
+    def _memo_get(key, stat):
+        with ModelManager._memo_lock:
+            value = ModelManager._memo.get(key)
+            if value is None:
+                ModelManager._memo_stats[stat + '_misses'] += 1
+                return None
+            ModelManager._memo.move_to_end(key)
+            ModelManager._memo_stats[stat + '_hits'] += 1
+            return value
+
+    @staticmethod
+    def _memo_put(key, value):
+        with ModelManager._memo_lock:
+            ModelManager._memo[key] = value
+            while len(ModelManager._memo) > ModelManager.MEMO_SIZE:
+                ModelManager._memo.popitem(last=False)
+
+    @staticmethod
+    def memo_stats() -> dict:
+        """Acertos/faltas do memo de detecção e extração, e entradas em uso."""
+        with ModelManager._memo_lock:
+            return dict(ModelManager._memo_stats, size=len(ModelManager._memo), max_size=ModelManager.MEMO_SIZE)
+
+    @staticmethod
+    def clear_memo(stats: bool = True):
+        with ModelManager._memo_lock:
+            ModelManager._memo.clear()
+            if stats:
+                for k in ModelManager._memo_stats:
+                    ModelManager._memo_stats[k] = 0
+
+    # Modelos declarativos: verificados no máximo a cada SPEC_CHECK_INTERVAL s
+    SPEC_CHECK_INTERVAL = 2.0
+    _specs_signature = None
+    _specs_checked = 0.0
+
+    @staticmethod
+    def reload_specs(force: bool = False) -> bool:
+        """
+        Recompila os modelos declarativos se algum spec foi criado, editado
+        ou removido. Retorna True quando a lista de modelos mudou.
+        """
+        now = time.monotonic()
+        first = ModelManager._specs_signature is None
+        if not (force or first) and now - ModelManager._specs_checked < ModelManager.SPEC_CHECK_INTERVAL:
+            return False
+        ModelManager._specs_checked = now
+        from core.model_specs import ModelSpecs
+
+        signature = ModelSpecs.signature()
+        if signature == ModelManager._specs_signature:
+            return False
+        ModelManager._specs_signature = signature
+
+        names = {m.NAME for m in BUILTIN_MODELS}
+        loaded = []
+        for model in ModelSpecs.load_all():
+            if model.NAME in names:
+                print(f"Modelo declarativo ignorado (nome já existe): {model.NAME}")
+                continue
+            names.add(model.NAME)
+            loaded.append(model)
+        ALL_MODELS[:] = BUILTIN_MODELS + loaded
+        _group_categories()
+        # Resultados em memo podem ter vindo da versão anterior de um spec
+        ModelManager.clear_memo(stats=False)
+        return not first or bool(loaded)
+
     @staticmethod
     def get_all_models():
+        ModelManager.reload_specs()
         return ALL_MODELS
 
     @staticmethod
     def get_model_names():
-        return [m.NAME for m in ALL_MODELS]
+        return [m.NAME for m in ModelManager.get_all_models()]
 
     @staticmethod
     def get_categories():
+        ModelManager.reload_specs()
         return CATEGORIES
 
     @staticmethod
     def auto_detect(text: str):
+        ModelManager.reload_specs()
+        key = ('detect', ModelManager.text_digest(text))
+        cached = ModelManager._memo_get(key, 'detect')
+        if cached is not None:
+            return cached
+        # Uma única passada sobre o texto para todos os modelos
         best_model, best_score = None, 0.0
-        for model in ALL_MODELS:
-            score = model.detect(text)
+        for model, score in DetectionEngine.rank(text, ALL_MODELS):
             if score > best_score:
                 best_score = score
                 best_model = model
+        ModelManager._memo_put(key, (best_model, best_score))
         return best_model, best_score
 
     @staticmethod
     def get_model_by_name(name: str):
+        ModelManager.reload_specs()
         for m in ALL_MODELS:
             if m.NAME == name:
                 return m
         return None
 
     @staticmethod
-    def process(text: str, model_name: str = None):
+    def process_zones(zone_texts: dict, model):
+        """Aplica o modelo sobre textos de OCR zonal (ver BaseDocumentModel.ZONES)."""
+        data = model.extract_zones(zone_texts)
+        df = model.to_dataframe(data)
+        return model, data, df
+
+    @staticmethod
+    def process_grid(rows: list, header_text: str, model):
+        """Aplica o modelo sobre a matriz de células de uma tabela com grade."""
+        data = model.extract_grid(rows, header_text)
+        df = model.to_dataframe(data)
+        return model, data, df
+
+    @staticmethod
+    def process_layout(layout: dict, model_name: str = None):
+        """Aplica o modelo sobre o layout da camada de texto (ver PDFLayout.extract_page)."""
         if model_name and model_name != "Auto-Detectar":
             model = ModelManager.get_model_by_name(model_name)
         else:
-            model, _ = ModelManager.auto_detect(text)
+            model, _ = ModelManager.auto_detect('\n'.join(line['text'] for line in layout['lines']))
         if model is None:
             return None, {}, pd.DataFrame()
-        data = model.extract(text)
+        data = model.extract_layout(layout)
         df = model.to_dataframe(data)
         return model, data, df
+
+    @staticmethod
+    def process(text: str, model_name: str = None):
+        if model_name and model_name != "Auto-Detectar":
+            model = ModelManager.get_model_by_name(model_name)
+        else:
+            model, _ = ModelManager.auto_detect(text)
+        if model is None:
+            return None, {}, pd.DataFrame()
+        key = ('extract', ModelManager.text_digest(text), model.NAME)
+        cached = ModelManager._memo_get(key, 'extract')
+        if cached is None:
+            data = model.extract(text)
+            cached = (data, model.to_dataframe(data))
+            ModelManager._memo_put(key, cached)
+        # Cópias: quem chama pode alterar o resultado sem afetar o memo
+        return model, copy.deepcopy(cached[0]), cached[1].copy()
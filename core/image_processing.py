@@ -1,8 +1,34 @@
+import threading
 import cv2
 import numpy as np
 import fitz # PyMuPDF
 
 class ImageProcessing:
+    # Blank page detection (tuned on 300 DPI scans, measured on a thumbnail)
+    BLANK_INK_RATIO = 0.0025     # fraction of "ink" pixels below which a page is blank
+    BLANK_STD_THRESHOLD = 8.0    # grayscale std-dev below which a page is uniform
+    BLANK_THUMB_SIDE = 256
+    # Auto-crop: content box searched on a downscaled binary image
+    AUTOCROP_MAX_SIDE = 800
+    AUTOCROP_PAD = 0.01          # padding kept around the content (fraction of page size)
+    # Quality triage: pages failing any of these go through heavy preprocessing
+    QUALITY_THUMB_SIDE = 1000
+    QUALITY_BLUR_MIN = 100.0     # Laplacian variance (lower = blurrier)
+    QUALITY_CONTRAST_MIN = 80.0  # gray-level spread between 1st and 99th percentiles
+    QUALITY_NOISE_MAX = 8.0      # mean deviation from a 3x3 median (salt & pepper, grain)
+    SKEW_TOLERANCE = 0.5         # degrees; below this deskew is skipped
+    SKEW_MIN_CONFIDENCE = 0.5    # share of text-line blobs agreeing on the angle
+    SKEW_AGREEMENT = 1.0         # degrees around the dominant angle counted as agreeing
+    SKEW_MIN_BLOBS = 3
+    # Auto-scale: Tesseract reads best with ~20-30 px cap height, i.e. an
+    # x-height (what estimate_text_height measures) of roughly 14-21 px
+    TARGET_X_HEIGHT = 18
+    X_HEIGHT_RANGE = (14, 21)
+    PDF_ZOOM_RANGE = (1.0, 4.0)
+    # MuPDF is not thread-safe: every page render in the process (viewer and
+    # thumbnail workers alike) goes through this lock
+    RENDER_LOCK = threading.RLock()
+
     @staticmethod
     def load_image(path):
         """Loads image handling unicode paths correctly."""
@@ -14,16 +40,18 @@ class ImageProcessing:
         return img
 
     @staticmethod
-    def load_pdf_as_image(path, page_index=0):
+    def load_pdf_as_image(path, page_index=0, zoom=2):
         """Renders a PDF page as an OpenCV image."""
         try:
-            doc = fitz.open(path)
-            if page_index >= len(doc):
-                return None
-            
-            page = doc.load_page(page_index)
-            # Render at 300 DPI (approx zoom=4 for 72dpi base)
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2)) 
+            with ImageProcessing.RENDER_LOCK:
+                doc = fitz.open(path)
+                if page_index >= len(doc):
+                    return None
+
+                page = doc.load_page(page_index)
+                # Render at 300 DPI (approx zoom=4 for 72dpi base)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                doc.close()
             
             # Convert to numpy
             if pix.n < 3:
@@ -43,6 +71,71 @@ class ImageProcessing:
             print(f"Error loading PDF: {e}")
             return None
 
+    @staticmethod
+    def load_pdf_thumbnail(path, page_index=0, max_side=256, color=False):
+        """Renders a small preview of a PDF page (grayscale, or BGR if color=True)."""
+        try:
+            with ImageProcessing.RENDER_LOCK:
+                doc = fitz.open(path)
+                if page_index >= len(doc):
+                    return None
+                page = doc.load_page(page_index)
+                zoom = max_side / max(page.rect.width, page.rect.height, 1)
+                cs = fitz.csRGB if color else fitz.csGRAY
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=cs, alpha=False)
+                img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+                img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR) if color else img[:, :, 0].copy()
+                doc.close()
+                return img
+        except Exception as e:
+            print(f"Error rendering thumbnail: {e}")
+            return None
+
+    @staticmethod
+    def make_thumbnail(img, max_side=256):
+        """Downscales an image so its longest side is at most max_side."""
+        h, w = img.shape[:2]
+        scale = max_side / max(h, w)
+        if scale >= 1:
+            return img
+        return cv2.resize(img, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def dhash(img, size=8):
+        """Perceptual difference hash (size*size bits) as an int."""
+        gray = ImageProcessing.to_grayscale(img)
+        small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int(''.join('1' if b else '0' for b in bits), 2)
+
+    @staticmethod
+    def is_blank_page(img, ink_ratio=None, std_threshold=None):
+        """
+        Cheap blank/near-blank test on a thumbnail.
+        A page is blank when it is almost uniform (low std-dev) or when the
+        fraction of dark "ink" pixels is below ink_ratio.
+        """
+        if img is None:
+            return False
+        ink_ratio = ImageProcessing.BLANK_INK_RATIO if ink_ratio is None else ink_ratio
+        std_threshold = ImageProcessing.BLANK_STD_THRESHOLD if std_threshold is None else std_threshold
+
+        thumb = ImageProcessing.to_grayscale(ImageProcessing.make_thumbnail(img, ImageProcessing.BLANK_THUMB_SIDE))
+        # Ignore a thin frame: scanner edges and shadows are not content
+        h, w = thumb.shape[:2]
+        my, mx = max(1, h // 25), max(1, w // 25)
+        inner = thumb[my:h - my, mx:w - mx]
+        if inner.size == 0:
+            return True
+
+        if float(inner.std()) < std_threshold:
+            return True
+
+        # Ink = pixels clearly darker than the paper background
+        background = float(np.median(inner))
+        ink = np.count_nonzero(inner < background - 60)
+        return ink / inner.size < ink_ratio
+
     @staticmethod
     def get_pdf_page_count(path):
         try:
@@ -58,29 +151,174 @@ class ImageProcessing:
         return img
 
     @staticmethod
-    def deskew_image(img):
+    def estimate_skew(img):
         """
-        Detects text orientation and auto-rotates.
+        Estimates the text skew angle in degrees (correction to apply).
+        Characters are smeared into text-line blobs and each elongated blob
+        votes with the angle of its long side, weighted by length.
+        Returns (angle, confidence): confidence is the share of the votes
+        within SKEW_AGREEMENT of the dominant angle (0 with too few lines).
         """
         gray = ImageProcessing.to_grayscale(img)
         gray = cv2.bitwise_not(gray)
         thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
-        
-        coords = np.column_stack(np.where(thresh > 0))
-        angle = cv2.minAreaRect(coords)[-1]
-        
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
-            
-        # Rotate logic
+        w = thresh.shape[1]
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(5, w // 60), 1))
+        blobs = cv2.dilate(thresh, kernel)
+        contours = cv2.findContours(blobs, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+
+        angles, weights = [], []
+        for c in contours:
+            p0, p1, p2, _ = cv2.boxPoints(cv2.minAreaRect(c))
+            a, b = p1 - p0, p2 - p1
+            side, other = (a, b) if np.hypot(*a) >= np.hypot(*b) else (b, a)
+            length, thickness = np.hypot(*side), np.hypot(*other)
+            if length < w * 0.05 or length < 3 * thickness:
+                continue
+            # Long-side direction folded into [-90, 90), image y axis pointing
+            # down: a positive angle is a clockwise tilt, undone by rotating
+            # counter-clockwise by the same amount
+            angle = (np.degrees(np.arctan2(side[1], side[0])) + 90) % 180 - 90
+            if abs(angle) <= 45:
+                angles.append(angle)
+                weights.append(length)
+        if len(angles) < ImageProcessing.SKEW_MIN_BLOBS:
+            return 0.0, 0.0
+
+        angles, weights = np.array(angles), np.array(weights)
+        order = np.argsort(angles)
+        cum = np.cumsum(weights[order])
+        dominant = angles[order][np.searchsorted(cum, cum[-1] / 2)]
+        agree = np.abs(angles - dominant) <= ImageProcessing.SKEW_AGREEMENT
+        angle = float(np.average(angles[agree], weights=weights[agree]))
+        return angle, float(weights[agree].sum() / weights.sum())
+
+    @staticmethod
+    def _rotate_keep_size(img, angle):
         (h, w) = img.shape[:2]
         center = (w // 2, h // 2)
         M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-        
-        return rotated, angle
+        return cv2.warpAffine(img, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+    @staticmethod
+    def deskew_image(img, angle=None):
+        """
+        Detects text orientation and auto-rotates.
+        angle: skew already measured (e.g. assess_quality's), skips the estimate.
+        """
+        if angle is None:
+            angle, _ = ImageProcessing.estimate_skew(img)
+        return ImageProcessing._rotate_keep_size(img, angle), angle
+
+    @staticmethod
+    def assess_quality(img):
+        """
+        Quick scan-quality estimate on a downscaled copy.
+        Returns blur (Laplacian variance), contrast, noise, skew (with its
+        confidence) and the suggested route: 'fast' (straight to OCR) or
+        'heavy' (denoise + adaptive threshold). needs_deskew is independent
+        of the route and only set for a confident, non-negligible angle.
+        """
+        gray = ImageProcessing.to_grayscale(ImageProcessing.make_thumbnail(img, ImageProcessing.QUALITY_THUMB_SIDE))
+        blur = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        p1, p99 = np.percentile(gray, (1, 99))
+        contrast = float(p99 - p1)
+        noise = float(np.mean(cv2.absdiff(gray, cv2.medianBlur(gray, 3))))
+        skew, skew_confidence = ImageProcessing.estimate_skew(gray)
+
+        poor = (blur < ImageProcessing.QUALITY_BLUR_MIN
+                or contrast < ImageProcessing.QUALITY_CONTRAST_MIN
+                or noise > ImageProcessing.QUALITY_NOISE_MAX)
+        return {
+            'blur': blur,
+            'contrast': contrast,
+            'noise': noise,
+            'skew': skew,
+            'skew_confidence': skew_confidence,
+            'needs_deskew': (abs(skew) > ImageProcessing.SKEW_TOLERANCE
+                             and skew_confidence >= ImageProcessing.SKEW_MIN_CONFIDENCE),
+            'route': 'heavy' if poor else 'fast',
+        }
+
+    @staticmethod
+    def enhance_for_ocr(img):
+        """Heavy path for poor scans: denoise + adaptive thresholding."""
+        gray = ImageProcessing.to_grayscale(img)
+        gray = cv2.fastNlMeansDenoising(gray, None, h=10, templateWindowSize=7, searchWindowSize=21)
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY, 31, 15)
+
+    @staticmethod
+    def preprocess_for_ocr(img, quality=None, deskew=True):
+        """
+        Routes a page by scan quality: clean pages are returned untouched,
+        poor ones are enhanced; deskew only runs when the page is skewed.
+        deskew=False for pages the caller has already straightened.
+        Returns (image, quality).
+        """
+        quality = quality or ImageProcessing.assess_quality(img)
+        if quality['route'] == 'heavy':
+            img = ImageProcessing.enhance_for_ocr(img)
+        if deskew and quality['needs_deskew']:
+            img = ImageProcessing._rotate_keep_size(img, quality['skew'])
+        return img, quality
+
+    @staticmethod
+    def find_content_bbox(img, max_side=None, pad=None):
+        """
+        Finds the content bounding box on a downscaled binary image.
+        Ignores dark scanner borders (large components touching the edge),
+        punch holes (solid round blobs in the margins) and specks.
+        Returns (x, y, w, h) in full-resolution pixels, or None.
+        """
+        max_side = max_side or ImageProcessing.AUTOCROP_MAX_SIDE
+        pad = ImageProcessing.AUTOCROP_PAD if pad is None else pad
+
+        small = ImageProcessing.to_grayscale(ImageProcessing.make_thumbnail(img, max_side))
+        binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        h, w = binary.shape
+        n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+        boxes = []
+        for x, y, bw, bh, area in stats[1:]:
+            if area < 4:
+                continue
+            touches = x <= 1 or y <= 1 or x + bw >= w - 1 or y + bh >= h - 1
+            if touches and (bw > 0.5 * w or bh > 0.5 * h):
+                continue
+            in_margin = x + bw < 0.12 * w or x > 0.88 * w or y + bh < 0.12 * h or y > 0.88 * h
+            round_solid = 0.6 < bw / bh < 1.6 and area > 0.6 * bw * bh and bw > 0.015 * w
+            if in_margin and round_solid:
+                continue
+            boxes.append((x, y, x + bw, y + bh))
+
+        if not boxes:
+            return None
+        boxes = np.array(boxes)
+        x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+        x1, y1 = boxes[:, 2].max(), boxes[:, 3].max()
+
+        # Back to full resolution, with padding
+        full_h, full_w = img.shape[:2]
+        sx, sy = full_w / w, full_h / h
+        px, py = int(pad * full_w), int(pad * full_h)
+        fx0 = max(0, int(x0 * sx) - px)
+        fy0 = max(0, int(y0 * sy) - py)
+        fx1 = min(full_w, int(np.ceil(x1 * sx)) + px)
+        fy1 = min(full_h, int(np.ceil(y1 * sy)) + py)
+        return (fx0, fy0, fx1 - fx0, fy1 - fy0)
+
+    @staticmethod
+    def auto_crop(img):
+        """
+        Crops the page to its content box.
+        Returns (cropped, (x_offset, y_offset)) so boxes can be mapped back.
+        """
+        bbox = ImageProcessing.find_content_bbox(img)
+        if bbox is None:
+            return img, (0, 0)
+        x, y, w, h = bbox
+        return img[y:y + h, x:x + w], (x, y)
 
     @staticmethod
     def rotate_image(img, angle=90):
@@ -116,3 +354,195 @@ class ImageProcessing:
         Beta: Brightness control (0-100)
         """
         return cv2.convertScaleAbs(img, alpha=alpha, beta=beta)
+
+    @staticmethod
+    def ruling_masks(img, scale=30):
+        """
+        Morphological ruling-line detection.
+        Returns (horizontal, vertical) binary masks containing only long lines.
+        """
+        gray = ImageProcessing.to_grayscale(img)
+        binary = cv2.adaptiveThreshold(cv2.bitwise_not(gray), 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                       cv2.THRESH_BINARY, 15, -2)
+        h, w = binary.shape
+        h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(10, w // scale), 1))
+        v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(10, h // scale)))
+        horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, h_kernel)
+        vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, v_kernel)
+        return horizontal, vertical
+
+    @staticmethod
+    def _line_positions(mask, axis, min_coverage, gap=3):
+        """Projects a line mask and clusters the peaks into line coordinates."""
+        profile = np.count_nonzero(mask, axis=axis)
+        length = mask.shape[axis]
+        idx = np.where(profile >= min_coverage * length)[0]
+        if idx.size == 0:
+            return []
+        groups = np.split(idx, np.where(np.diff(idx) > gap)[0] + 1)
+        return [int(g.mean()) for g in groups]
+
+    @staticmethod
+    def detect_table_grid(img, min_coverage=0.25, min_cell=8, lines=None):
+        """
+        Detects a ruled table and returns its cell matrix:
+        {'rows': [y...], 'cols': [x...], 'cells': [[(x, y, w, h), ...], ...]}
+        or None when fewer than 2 rows/columns of lines are found.
+        lines: geometry from remove_ruling_lines, reused instead of re-detecting.
+        """
+        if lines is not None:
+            horizontal, vertical = ImageProcessing.lines_to_masks(lines)
+        else:
+            horizontal, vertical = ImageProcessing.ruling_masks(img)
+        rows = ImageProcessing._line_positions(horizontal, 1, min_coverage)
+        if len(rows) < 2:
+            return None
+        # Vertical lines only need to span the table, not the whole page
+        table_v = vertical[rows[0]:rows[-1] + 1]
+        cols = ImageProcessing._line_positions(table_v, 0, min_coverage)
+        if len(cols) < 2:
+            return None
+
+        cells = []
+        for y0, y1 in zip(rows, rows[1:]):
+            if y1 - y0 < min_cell:
+                continue
+            row = [(x0, y0, x1 - x0, y1 - y0) for x0, x1 in zip(cols, cols[1:]) if x1 - x0 >= min_cell]
+            if row:
+                cells.append(row)
+        if not cells:
+            return None
+        return {'rows': rows, 'cols': cols, 'cells': cells}
+
+    @staticmethod
+    def _line_segments(mask):
+        contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+        segments = []
+        for c in contours:
+            x, y, w, h = cv2.boundingRect(c)
+            segments.append((x, y, x + w, y + h))
+        return segments
+
+    @staticmethod
+    def remove_ruling_lines(img):
+        """
+        Erases table ruling lines before OCR (faster, no spurious '|').
+        Returns (clean, lines): lines keeps the geometry as boxes
+        {'horizontal': [(x0, y0, x1, y1)], 'vertical': [...], 'shape': (h, w)}
+        so the table can still be rebuilt (see detect_table_grid).
+        """
+        horizontal, vertical = ImageProcessing.ruling_masks(img)
+        mask = cv2.dilate(cv2.bitwise_or(horizontal, vertical), np.ones((3, 3), np.uint8))
+        clean = img.copy()
+        clean[mask > 0] = 255
+        lines = {
+            'horizontal': ImageProcessing._line_segments(horizontal),
+            'vertical': ImageProcessing._line_segments(vertical),
+            'shape': img.shape[:2],
+        }
+        return clean, lines
+
+    @staticmethod
+    def lines_to_masks(lines):
+        """Rasterizes line geometry back into (horizontal, vertical) masks."""
+        masks = []
+        for key in ('horizontal', 'vertical'):
+            mask = np.zeros(lines['shape'], dtype=np.uint8)
+            for x0, y0, x1, y1 in lines[key]:
+                cv2.rectangle(mask, (x0, y0), (x1 - 1, y1 - 1), 255, thickness=-1)
+            masks.append(mask)
+        return masks[0], masks[1]
+
+    @staticmethod
+    def estimate_orientation(img, max_side=1000):
+        """
+        Text-line orientation heuristic. Returns (angle, confidence): the
+        clockwise rotation (0/90/180/270) that makes the text upright.
+        Sideways pages are found by comparing row vs column profile variance
+        (text lines make the row profile strongly periodic); upside-down pages
+        by the ascender/descender asymmetry of each line (Latin text, with
+        capitals and accents, has more ink above the x-height band than below).
+        """
+        gray = ImageProcessing.to_grayscale(ImageProcessing.make_thumbnail(img, max_side))
+        binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        if binary.mean() < 0.002:
+            return 0, 0.0
+
+        row_var = binary.mean(axis=1).var()
+        col_var = binary.mean(axis=0).var()
+        sideways = col_var > row_var * 1.2
+        upright = cv2.rotate(binary, cv2.ROTATE_90_CLOCKWISE) if sideways else binary
+        base = 90 if sideways else 0
+
+        profile = upright.sum(axis=1).astype(np.float32)
+        on = profile > profile.max() * 0.05
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], on.astype(np.int8), [0]))))
+        above = below = 0.0
+        for r0, r1 in zip(edges[::2], edges[1::2]):
+            line = profile[r0:r1]
+            if line.size < 5:
+                continue
+            band = np.flatnonzero(line >= line.max() * 0.5)
+            above += line[:band[0]].sum()
+            below += line[band[-1] + 1:].sum()
+        if above + below == 0:
+            return base, 0.0
+        asymmetry = (above - below) / (above + below)
+        angle = base if asymmetry >= 0 else (base + 180) % 360
+        return angle, float(min(abs(asymmetry) * 2, 1.0))
+
+    @staticmethod
+    def estimate_text_height(img, max_side=1200):
+        """
+        Dominant glyph height in full-resolution pixels, from connected-component
+        statistics on a downscaled copy. Lower-case letters outnumber the rest,
+        so this is the x-height. Returns None when there is too little text.
+        """
+        small = ImageProcessing.to_grayscale(ImageProcessing.make_thumbnail(img, max_side))
+        scale = img.shape[0] / small.shape[0]
+        binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        w = stats[1:, cv2.CC_STAT_WIDTH]
+        h = stats[1:, cv2.CC_STAT_HEIGHT]
+        area = stats[1:, cv2.CC_STAT_AREA]
+
+        # Glyph-like components only: no specks, rules, images or table borders
+        glyph = (h >= 3) & (h <= small.shape[0] * 0.05) & (w <= h * 2) & (w * 10 >= h) & (area * 7 >= w * h)
+        heights = h[glyph]
+        if heights.size < 20:
+            return None
+        # Mode of the height histogram, lightly smoothed
+        hist = np.convolve(np.bincount(heights), [1, 2, 1], mode='same')
+        return float(np.argmax(hist)) * scale
+
+    @staticmethod
+    def scale_to_text_height(img, target=None):
+        """
+        Rescales the page so text lands in Tesseract's sweet spot.
+        Returns (image, factor); factor 1.0 when already in range.
+        """
+        height = ImageProcessing.estimate_text_height(img)
+        low, high = ImageProcessing.X_HEIGHT_RANGE
+        if height is None or low <= height <= high:
+            return img, 1.0
+        factor = float(np.clip((target or ImageProcessing.TARGET_X_HEIGHT) / height, 0.4, 3.0))
+        interp = cv2.INTER_AREA if factor < 1 else cv2.INTER_CUBIC
+        h, w = img.shape[:2]
+        return cv2.resize(img, (int(w * factor), int(h * factor)), interpolation=interp), factor
+
+    @staticmethod
+    def optimal_pdf_zoom(path, page_index=0, target=None, probe=None):
+        """
+        Render zoom that gives ~target px x-height, measured on a zoom-1 render.
+        probe: that render when the caller already has it (not rendered again).
+        Falls back to the default zoom (2) when no text is measurable.
+        """
+        if probe is None:
+            probe = ImageProcessing.load_pdf_as_image(path, page_index, zoom=1)
+        if probe is None:
+            return 2
+        height = ImageProcessing.estimate_text_height(probe)
+        if not height:
+            return 2
+        zoom = (target or ImageProcessing.TARGET_X_HEIGHT) / height
+        return float(np.clip(zoom, *ImageProcessing.PDF_ZOOM_RANGE))
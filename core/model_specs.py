@@ -0,0 +1,283 @@
+"""
+Strukturis Pro — Modelos Declarativos
+Modelos de documento descritos em JSON (ou YAML, se o PyYAML estiver
+instalado): palavras-chave e padrões de detecção, campos, marcadores de
+início/fim de tabela, padrões de linha e mapeamento de colunas. Cada spec é
+compilado uma vez em regexes pré-compiladas e uma máquina de estados que lê
+o texto em uma única passada por linhas.
+
+Specs ficam em model_specs/ (junto do programa) e em ~/.strukturis/models;
+arquivos novos ou editados são recarregados sem reiniciar o aplicativo.
+Chaves do spec: name, category, variant, description, icon, tipo_documento,
+remove_lines; detect.keywords ([palavra ou [alternativas], peso]) e
+detect.patterns (regex, flags, min_count, max_count, weight); fields
+({chave: {regex, flags, format, all}}); tables ([{key, start, end, skip,
+repeat, rows: [{regex, flags, columns, set, list}]}]). Ver o exemplo em
+model_specs/cartao_ponto_cocacola.json.
+"""
+
+import copyreg
+import hashlib
+import json
+import os
+import re
+import pandas as pd
+from core.document_models import BaseDocumentModel
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+_FLAGS = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL, 'x': re.VERBOSE}
+
+
+def _regex(value, flags=''):
+    """Compila "regex" ou {"regex": ..., "flags": "im"}; None passa direto."""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        value, flags = value['regex'], value.get('flags', flags)
+    f = 0
+    for ch in flags or '':
+        f |= _FLAGS[ch]
+    return re.compile(value, f)
+
+
+class _SpecModelMeta(type):
+    """Metaclasse dos modelos compilados (ver _reduce_spec_model)."""
+
+
+class SpecModel(BaseDocumentModel, metaclass=_SpecModelMeta):
+    """Base dos modelos compilados a partir de specs (ver ModelSpecs.build)."""
+
+    SPEC = None
+    SOURCE = None
+    TIPO = None
+    PATTERNS = []     # [(nome da característica, min_count, max_count, peso)]
+    FIELD_RULES = []  # [(chave, regex, format, all)]
+    TABLE_RULES = []  # ver ModelSpecs._compile_table
+
+    @classmethod
+    def score(cls, f: dict) -> float:
+        score = cls.keyword_score(f)
+        for name, lo, hi, weight in cls.PATTERNS:
+            n = f.get(name, 0)
+            if n >= lo and (hi is None or n <= hi):
+                score += weight
+        return min(max(score, 0), 1.0)
+
+    @staticmethod
+    def _field_value(m, fmt):
+        if fmt:
+            return fmt.format(m.group(0), *(g or '' for g in m.groups()),
+                              **{k: v or '' for k, v in m.groupdict().items()})
+        return (m.group(1) if m.groups() else m.group(0)).strip()
+
+    @staticmethod
+    def _row(m, rule, line):
+        row = dict(m.groupdict()) if rule['columns'] is None else \
+            {key: m.group(group) for key, group in rule['columns'].items()}
+        values = rule['list']
+        if values is not None:
+            found = values['regex'].findall(line[m.end():])
+            skip = values['skip']
+            found = found[skip:] if len(found) > skip else found
+            for i, key in enumerate(values['columns']):
+                row[key] = found[i] if i < len(found) else ''
+        row.update(rule['set'])
+        return row
+
+    @classmethod
+    def extract(cls, text: str) -> dict:
+        data = {'tipo_documento': cls.TIPO}
+        fields = list(cls.FIELD_RULES)
+        for key, _, _, many in fields:
+            if many:
+                data[key] = []
+        tables = [[rule, 0 if rule['start'] else 1] for rule in cls.TABLE_RULES]
+        for rule, _ in tables:
+            data[rule['key']] = []
+
+        # Uma passada: campos ainda não achados e o estado de cada tabela
+        # (0 = antes do início, 1 = dentro, 2 = encerrada)
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if fields:
+                for field in list(fields):
+                    key, regex, fmt, many = field
+                    if many:
+                        for m in regex.finditer(line):
+                            value = cls._field_value(m, fmt)
+                            if value not in data[key]:
+                                data[key].append(value)
+                        continue
+                    m = regex.search(line)
+                    if m:
+                        data[key] = cls._field_value(m, fmt)
+                        fields.remove(field)
+            for state in tables:
+                rule, st = state
+                if st == 2:
+                    continue
+                if st == 0:
+                    if rule['start'].search(line):
+                        state[1] = 1
+                    continue
+                if rule['end'] is not None and rule['end'].search(line):
+                    state[1] = 0 if rule['repeat'] and rule['start'] else 2
+                    continue
+                if rule['skip'] is not None and rule['skip'].search(line):
+                    continue
+                for row_rule in rule['rows']:
+                    m = row_rule['regex'].search(line)
+                    if m:
+                        data[rule['key']].append(cls._row(m, row_rule, line))
+                        break
+        return data
+
+    @classmethod
+    def to_dataframe(cls, data):
+        for rule in cls.TABLE_RULES:
+            rows = data.get(rule['key'])
+            if rows:
+                return pd.DataFrame(rows)
+        return super().to_dataframe(data)
+
+
+def _reduce_spec_model(cls):
+    # Classes criadas em tempo de execução não são importáveis pelo nome:
+    # o pickle (resultados do pool de processos) leva o spec e o outro lado
+    # recompila — ou reaproveita a mesma classe, pelo cache de ModelSpecs.build
+    if cls.SPEC is None:
+        return cls.__qualname__
+    return ModelSpecs.build, (cls.SPEC, cls.SOURCE)
+
+
+copyreg.pickle(_SpecModelMeta, _reduce_spec_model)
+
+
+class ModelSpecs:
+    """Carrega e compila specs de modelos em subclasses de SpecModel."""
+
+    BUNDLED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_specs')
+    USER_DIR = os.path.join(os.path.expanduser('~'), '.strukturis', 'models')
+    EXTENSIONS = ('.json', '.yaml', '.yml')
+
+    _built = {}
+
+    @staticmethod
+    def spec_dirs() -> list:
+        return [ModelSpecs.BUNDLED_DIR, ModelSpecs.USER_DIR]
+
+    @staticmethod
+    def spec_files() -> list:
+        files = []
+        for folder in ModelSpecs.spec_dirs():
+            if not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                ext = os.path.splitext(name)[1].lower()
+                if ext in ModelSpecs.EXTENSIONS and (ext == '.json' or yaml is not None):
+                    files.append(os.path.join(folder, name))
+        return files
+
+    @staticmethod
+    def signature() -> tuple:
+        """(arquivo, mtime, tamanho) de todos os specs: muda quando algo é editado."""
+        sig = []
+        for path in ModelSpecs.spec_files():
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                continue
+        return tuple(sig)
+
+    @staticmethod
+    def read(path: str):
+        """Um spec ou uma lista de specs do arquivo."""
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                return json.load(f)
+            return yaml.safe_load(f)
+
+    @staticmethod
+    def _compile_table(table: dict) -> dict:
+        rows = []
+        for row in table.get('rows', []):
+            values = row.get('list')
+            rows.append({
+                'regex': _regex(row),
+                'columns': row.get('columns'),
+                'set': dict(row.get('set', {})),
+                'list': None if values is None else {
+                    'regex': _regex(values),
+                    'columns': list(values['columns']),
+                    'skip': int(values.get('skip', 0)),
+                },
+            })
+        return {
+            'key': table.get('key', 'registros'),
+            'start': _regex(table.get('start'), table.get('flags', '')),
+            'end': _regex(table.get('end'), table.get('flags', '')),
+            'skip': _regex(table.get('skip'), table.get('flags', '')),
+            'repeat': bool(table.get('repeat', False)),
+            'rows': rows,
+        }
+
+    @staticmethod
+    def build(spec: dict, source: str = None):
+        """
+        Compila um spec em uma subclasse de SpecModel. Specs iguais devolvem
+        a mesma classe (identidade preservada entre recargas e no pickle).
+        """
+        digest = hashlib.sha1(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        cls = ModelSpecs._built.get(digest)
+        if cls is not None:
+            return cls
+
+        name = spec['name']
+        detect = spec.get('detect', {})
+        features, patterns = {}, []
+        for i, p in enumerate(detect.get('patterns', [])):
+            feature = f"{name}#{i}"
+            features[feature] = _regex(p)
+            patterns.append((feature, int(p.get('min_count', 1)), p.get('max_count'), float(p['weight'])))
+
+        attrs = {
+            'NAME': name,
+            'ICON': spec.get('icon', 'fa5s.file-alt'),
+            'DESCRIPTION': spec.get('description', 'Modelo declarativo'),
+            'CATEGORY': spec.get('category', 'Outros'),
+            'VARIANT': spec.get('variant', 'Personalizado'),
+            'REMOVE_LINES': spec.get('remove_lines'),
+            'KEYWORDS': [(tuple(k) if isinstance(k, list) else k, float(w)) for k, w in detect.get('keywords', [])],
+            'FEATURES': features,
+            'PATTERNS': patterns,
+            'FIELD_RULES': [(key, _regex(f), f.get('format'), bool(f.get('all', False)))
+                            for key, f in spec.get('fields', {}).items()],
+            'TABLE_RULES': [ModelSpecs._compile_table(t) for t in spec.get('tables', [])],
+            'SPEC': spec,
+            'SOURCE': source,
+            'TIPO': spec.get('tipo_documento', name),
+        }
+        cls = _SpecModelMeta(f"SpecModel_{digest[:10]}", (SpecModel,), attrs)
+        ModelSpecs._built[digest] = cls
+        return cls
+
+    @staticmethod
+    def load_all() -> list:
+        """Compila todos os specs das pastas; specs inválidos são ignorados com aviso."""
+        models = []
+        for path in ModelSpecs.spec_files():
+            try:
+                content = ModelSpecs.read(path)
+                for spec in content if isinstance(content, list) else [content]:
+                    models.append(ModelSpecs.build(spec, path))
+            except Exception as e:
+                print(f"Erro ao carregar modelo declarativo {os.path.basename(path)}: {e}")
+        return models
@@ -2,9 +2,14 @@ import pytesseract
 import shutil
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from core.image_processing import ImageProcessing
 
 class OCRManager:
     _configured = False
+    _languages = None
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
 
     @staticmethod
     def configure():
@@ -37,7 +42,10 @@ class OCRManager:
     def get_available_languages():
         if not OCRManager.configure():
             return []
-        return pytesseract.get_languages()
+        # Cached: each call spawns a tesseract process
+        if OCRManager._languages is None:
+            OCRManager._languages = pytesseract.get_languages()
+        return OCRManager._languages
 
     @staticmethod
     def check_language(lang='por'):
@@ -48,7 +56,7 @@ class OCRManager:
         return lang in langs
 
     @staticmethod
-    def extract_text(image, lang='por'):
+    def extract_text(image, lang='por', config=''):
         if not OCRManager.configure():
             return "Erro: Tesseract não encontrado. Instale o Tesseract-OCR."
         
@@ -57,13 +65,151 @@ class OCRManager:
              return f"Erro: Pacote de idioma '{lang}' não encontrado. Reinstale o Tesseract e selecione o idioma."
 
         try:
-            return pytesseract.image_to_string(image, lang=lang)
+            return pytesseract.image_to_string(image, lang=lang, config=config)
         except Exception as e:
             return f"Erro no OCR: {str(e)}"
     
+    @staticmethod
+    def detect_orientation(image, min_confidence=2.0):
+        """
+        Tesseract OSD. Returns the clockwise rotation (0/90/180/270) that makes
+        the page upright, or None when OSD is unavailable or not confident.
+        """
+        if not OCRManager.configure():
+            return None
+        try:
+            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        except Exception:
+            return None  # no osd.traineddata, or too little text
+        if float(osd.get('orientation_conf', 0)) < min_confidence:
+            return None
+        return int(osd.get('rotate', 0)) % 360
+
+    @staticmethod
+    def text_layer_pdf(image, lang='por'):
+        """
+        Runs Tesseract's PDF renderer in text-only mode: a one-page PDF holding
+        just the invisible text layer, to be overlaid on the original page.
+        Returns the PDF bytes, or None on failure.
+        """
+        if not OCRManager.configure() or not OCRManager.check_language(lang):
+            return None
+        try:
+            return pytesseract.image_to_pdf_or_hocr(image, lang=lang, extension='pdf',
+                                                    config='-c textonly_pdf=1')
+        except Exception as e:
+            print(f"Error rendering text layer: {e}")
+            return None
+
     @staticmethod
     def extract_data(image, lang='por'):
         """Returns detailed data (boxes, conf)."""
         if not OCRManager.configure():
             return None
         return pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    @staticmethod
+    def crop_normalized(image, box):
+        """Crops a region given as normalized (x0, y0, x1, y1) in 0..1."""
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = box
+        return image[int(y0 * h):int(y1 * h), int(x0 * w):int(x1 * w)]
+
+    @staticmethod
+    def snap_rows(image, ys, window=0.02):
+        """
+        Moves each normalized y to the row with the least ink within +/- window,
+        so zone edges fall between text lines instead of cutting through one.
+        Equal inputs snap to the same row, keeping adjacent zones seamless.
+        """
+        gray = ImageProcessing.to_grayscale(image)
+        h = gray.shape[0]
+        ink = np.count_nonzero(gray < 128, axis=1)
+        reach = max(1, int(window * h))
+        snapped = {}
+        for y in set(ys):
+            row = int(y * h)
+            if row <= 0 or row >= h:
+                snapped[y] = y
+                continue
+            lo, hi = max(0, row - reach), min(h, row + reach + 1)
+            # Least ink; ties go to the row closest to the declared edge
+            best = lo + int(np.argmin(ink[lo:hi] * (2 * reach + 1) + np.abs(np.arange(lo, hi) - row)))
+            snapped[y] = best / h
+        return snapped
+
+    @staticmethod
+    def extract_zones(image, zones, lang='por', max_workers=None):
+        """
+        Zonal OCR: only the declared regions are cropped and recognized, in parallel.
+        zones: {name: {'box': (x0, y0, x1, y1), 'config': '--psm 6'}}
+        Horizontal edges are snapped to blank rows (see snap_rows).
+        Returns {name: text} in the same order as zones.
+        """
+        snapped = OCRManager.snap_rows(image, [y for z in zones.values() for y in (z['box'][1], z['box'][3])])
+
+        def run(zone):
+            x0, y0, x1, y1 = zone['box']
+            crop = OCRManager.crop_normalized(image, (x0, snapped[y0], x1, snapped[y1]))
+            if crop.size == 0:
+                return ""
+            return OCRManager.extract_text(crop, lang=lang, config=zone.get('config', ''))
+
+        names = list(zones)
+        with ThreadPoolExecutor(max_workers=max_workers or OCRManager.MAX_WORKERS) as pool:
+            texts = list(pool.map(run, [zones[n] for n in names]))
+        return dict(zip(names, texts))
+
+    @staticmethod
+    def _row_strip_words(image, row, lang, config, pad):
+        """
+        OCRs one grid row as a single strip and distributes the words over its
+        cells by horizontal centre. Vertical rulings are painted out first.
+        """
+        x0, y0 = row[0][0], row[0][1]
+        x1, y1 = row[-1][0] + row[-1][2], row[0][1] + row[0][3]
+        strip = image[y0 + pad:y1 - pad, x0:x1]
+        if strip.size == 0:
+            return [""] * len(row)
+        gray = ImageProcessing.to_grayscale(strip)
+        # Empty rows (no ink) are skipped without calling Tesseract
+        if np.count_nonzero(gray < 128) < 0.005 * gray.size:
+            return [""] * len(row)
+
+        bounds = [x + w - x0 for x, _, w, _ in row[:-1]]
+        strip = strip.copy()
+        for b in bounds:
+            strip[:, max(0, b - pad):b + pad + 1] = 255
+        try:
+            data = pytesseract.image_to_data(strip, lang=lang, config=config,
+                                             output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            print(f"Error reading grid row: {e}")
+            return [""] * len(row)
+
+        words = [[] for _ in row]
+        centers = np.array(data['left']) + np.array(data['width']) / 2
+        cols = np.searchsorted(np.array(bounds), centers)
+        for word, col in zip(data['text'], cols):
+            word = word.strip()
+            if word and word.strip('|'):
+                words[col].append(word)
+        return [" ".join(w) for w in words]
+
+    @staticmethod
+    def extract_cells(image, cells, lang='por', config='--psm 6', max_workers=None, pad=3):
+        """
+        OCRs a table grid in row batches: each row is one Tesseract call on the
+        strip spanning its cells (rows run in parallel), and every word goes to
+        the cell holding its horizontal centre.
+        cells: matrix of (x, y, w, h) as returned by ImageProcessing.detect_table_grid.
+        Returns a matrix of strings with the same shape.
+        """
+        if not OCRManager.configure() or not OCRManager.check_language(lang):
+            return [["" for _ in row] for row in cells]
+
+        def run(row):
+            return OCRManager._row_strip_words(image, row, lang, config, pad)
+
+        with ThreadPoolExecutor(max_workers=max_workers or OCRManager.MAX_WORKERS) as pool:
+            return list(pool.map(run, cells))
@@ -0,0 +1,259 @@
+"""
+Strukturis Pro — Índice de Páginas
+Índice local (SQLite) de impressões digitais por página: hash exato do
+conteúdo (stream de conteúdo + imagens) e hash perceptual da página.
+Páginas já conhecidas reaproveitam o OCR e a extração armazenados, mesmo
+que o arquivo tenha sido renomeado ou remesclado.
+
+Uso em linha de comando:
+    python -m core.page_index --scan arquivo1.pdf arquivo2.pdf
+    python -m core.page_index --duplicates
+    python -m core.page_index --similar 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from io import StringIO
+import fitz  # PyMuPDF
+import numpy as np
+import pandas as pd
+from core.image_processing import ImageProcessing
+
+
+class PageIndex:
+    """Impressões digitais e resultados armazenados por página."""
+
+    DB_PATH = os.path.join(os.path.expanduser('~'), '.strukturis', 'page_index.sqlite')
+    PHASH_SIZE = 16     # dHash 16×16 = 256 bits
+    THUMB_SIDE = 256
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            fingerprint TEXT PRIMARY KEY,
+            phash TEXT,
+            model TEXT,
+            text TEXT,
+            data TEXT,
+            df TEXT,
+            updated REAL
+        );
+        CREATE TABLE IF NOT EXISTS occurrences (
+            path TEXT,
+            page INTEGER,
+            fingerprint TEXT,
+            PRIMARY KEY (path, page)
+        );
+        CREATE INDEX IF NOT EXISTS idx_occ_fp ON occurrences (fingerprint);
+        CREATE INDEX IF NOT EXISTS idx_pages_phash ON pages (phash);
+    """
+
+    @staticmethod
+    def _connect():
+        os.makedirs(os.path.dirname(PageIndex.DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(PageIndex.DB_PATH, timeout=30)
+        conn.executescript(PageIndex.SCHEMA)
+        return conn
+
+    # ── Impressões digitais ──
+    @staticmethod
+    def fingerprint(doc, page) -> str:
+        """
+        Hash exato da página: stream de conteúdo mais os streams brutos das
+        imagens. Páginas digitais são identificadas pelo conteúdo; em páginas
+        digitalizadas o conteúdo é só "desenhe a imagem", e o que distingue
+        é o stream da imagem.
+        """
+        h = hashlib.sha1(page.read_contents())
+        for img in page.get_images(full=True):
+            h.update(doc.xref_stream_raw(img[0]) or b'')
+        return h.hexdigest()
+
+    @staticmethod
+    def phash(page) -> str:
+        """Hash perceptual (dHash de 256 bits) de uma miniatura da página, em hex."""
+        zoom = PageIndex.THUMB_SIDE / max(page.rect.width, page.rect.height, 1)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w)
+        return format(ImageProcessing.dhash(img, PageIndex.PHASH_SIZE), '064x')
+
+    @staticmethod
+    def scan(path: str, pages: list = None, with_phash: bool = False) -> dict:
+        """{idx: (fingerprint, phash ou None)} das páginas, abrindo o PDF uma vez."""
+        result = {}
+        try:
+            doc = fitz.open(path)
+            for idx in (range(len(doc)) if pages is None else pages):
+                if 0 <= idx < len(doc):
+                    page = doc.load_page(idx)
+                    result[idx] = (PageIndex.fingerprint(doc, page),
+                                   PageIndex.phash(page) if with_phash else None)
+            doc.close()
+        except Exception as e:
+            print(f"Erro ao indexar páginas: {e}")
+        return result
+
+    # ── Consulta e gravação ──
+    @staticmethod
+    def lookup(path: str, pages: list = None, model_name: str = None) -> dict:
+        """
+        Resultados já armazenados para as páginas do arquivo:
+        {idx: {'text', 'model', 'data', 'df'}}. Com model_name definido (não
+        Auto-Detectar), só reaproveita extrações feitas com o mesmo modelo.
+        Registra também onde cada página conhecida apareceu.
+        """
+        from core.document_models import ModelManager
+
+        prints = PageIndex.scan(path, pages)
+        found = {}
+        if not prints:
+            return found
+        try:
+            conn = PageIndex._connect()
+            with conn:
+                for idx, (fp, _) in prints.items():
+                    row = conn.execute("SELECT model, text, data, df FROM pages WHERE fingerprint = ?", (fp,)).fetchone()
+                    if row is None:
+                        continue
+                    model_stored, text, data, df = row
+                    if model_name and model_name != "Auto-Detectar" and model_stored != model_name:
+                        continue
+                    found[idx] = {
+                        'text': text or '',
+                        'model': ModelManager.get_model_by_name(model_stored) if model_stored else None,
+                        'data': json.loads(data) if data else {},
+                        'df': pd.read_json(StringIO(df), orient='split') if df else pd.DataFrame(),
+                    }
+                    conn.execute("INSERT OR REPLACE INTO occurrences VALUES (?, ?, ?)",
+                                 (os.path.abspath(path), idx + 1, fp))
+            conn.close()
+        except Exception as e:
+            print(f"Erro ao consultar índice de páginas: {e}")
+        return found
+
+    @staticmethod
+    def store(path: str, results: dict):
+        """
+        Armazena resultados de páginas processadas: results = {idx: resultado
+        do PagePipeline (text, model, data, df)}.
+        """
+        if not results:
+            return
+        prints = PageIndex.scan(path, list(results), with_phash=True)
+        try:
+            conn = PageIndex._connect()
+            with conn:
+                for idx, (fp, ph) in prints.items():
+                    page = results[idx]
+                    model = page.get('model')
+                    df = page.get('df')
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (fp, ph, model.NAME if model else None, page.get('text', ''),
+                         json.dumps(page.get('data') or {}, ensure_ascii=False, default=str),
+                         df.to_json(orient='split', force_ascii=False) if df is not None and not df.empty else None,
+                         time.time()))
+                    conn.execute("INSERT OR REPLACE INTO occurrences VALUES (?, ?, ?)",
+                                 (os.path.abspath(path), idx + 1, fp))
+            conn.close()
+        except Exception as e:
+            print(f"Erro ao gravar índice de páginas: {e}")
+
+    @staticmethod
+    def register(path: str) -> int:
+        """Registra as ocorrências das páginas do arquivo; retorna quantas já eram conhecidas."""
+        prints = PageIndex.scan(path)
+        known = 0
+        try:
+            conn = PageIndex._connect()
+            with conn:
+                for idx, (fp, _) in prints.items():
+                    if conn.execute("SELECT 1 FROM occurrences WHERE fingerprint = ? AND NOT (path = ? AND page = ?)",
+                                    (fp, os.path.abspath(path), idx + 1)).fetchone():
+                        known += 1
+                    conn.execute("INSERT OR REPLACE INTO occurrences VALUES (?, ?, ?)",
+                                 (os.path.abspath(path), idx + 1, fp))
+            conn.close()
+        except Exception as e:
+            print(f"Erro ao registrar páginas: {e}")
+        return known
+
+    @staticmethod
+    def duplicates() -> list:
+        """Grupos de páginas idênticas no acervo: [(fingerprint, [(arquivo, página), ...])]."""
+        groups = []
+        try:
+            conn = PageIndex._connect()
+            rows = conn.execute("""
+                SELECT fingerprint, path, page FROM occurrences
+                WHERE fingerprint IN (SELECT fingerprint FROM occurrences
+                                      GROUP BY fingerprint HAVING COUNT(*) > 1)
+                ORDER BY fingerprint, path, page
+            """).fetchall()
+            conn.close()
+            for fp, path, page in rows:
+                if not groups or groups[-1][0] != fp:
+                    groups.append((fp, []))
+                groups[-1][1].append((path, page))
+        except Exception as e:
+            print(f"Erro ao consultar duplicatas: {e}")
+        return groups
+
+
+    @staticmethod
+    def similar(max_distance: int = 8) -> list:
+        """
+        Pares de páginas armazenadas quase idênticas pelo hash perceptual
+        (ex.: o mesmo documento digitalizado de novo ou recomprimido):
+        [(fingerprint_a, fingerprint_b, distância)].
+        """
+        try:
+            conn = PageIndex._connect()
+            rows = conn.execute("SELECT fingerprint, phash FROM pages WHERE phash IS NOT NULL").fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"Erro ao consultar índice de páginas: {e}")
+            return []
+        if len(rows) < 2:
+            return []
+        prints = [r[0] for r in rows]
+        bits = np.unpackbits(np.array([np.frombuffer(bytes.fromhex(r[1]), dtype=np.uint8) for r in rows]), axis=1)
+        pairs = []
+        for i in range(len(rows) - 1):
+            dist = np.count_nonzero(bits[i + 1:] != bits[i], axis=1)
+            for j in np.flatnonzero(dist <= max_distance):
+                pairs.append((prints[i], prints[i + 1 + j], int(dist[j])))
+        return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.page_index",
+                                     description="Índice de páginas do Strukturis Pro")
+    parser.add_argument('--scan', nargs='+', metavar='PDF', help="registra as páginas dos arquivos no índice")
+    parser.add_argument('--duplicates', action='store_true', help="lista páginas duplicadas no acervo")
+    parser.add_argument('--similar', type=int, metavar='BITS', help="lista páginas quase idênticas (distância máx. do hash perceptual)")
+    args = parser.parse_args(argv)
+
+    if args.scan:
+        for path in args.scan:
+            known = PageIndex.register(path)
+            print(f"{path}: {known} página(s) já vista(s) em outros arquivos")
+    if args.similar is not None:
+        pairs = PageIndex.similar(args.similar)
+        for fp_a, fp_b, dist in pairs:
+            print(f"{fp_a[:12]} ~ {fp_b[:12]}  (distância {dist})")
+        print(f"{len(pairs)} par(es) de páginas semelhantes")
+    if args.duplicates or not (args.scan or args.similar is not None):
+        groups = PageIndex.duplicates()
+        for fp, places in groups:
+            print(f"{fp[:12]}  ({len(places)} ocorrências)")
+            for path, page in places:
+                print(f"    {path}  página {page}")
+        print(f"{len(groups)} grupo(s) de páginas duplicadas")
+
+
+if __name__ == '__main__':
+    main()
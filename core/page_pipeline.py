@@ -0,0 +1,328 @@
+"""
+Strukturis Pro — Pipeline de Processamento de Páginas
+Etapas compartilhadas entre a interface e o processamento em lote:
+triagem (páginas em branco), OCR e aplicação do modelo de documento.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from core.image_processing import ImageProcessing
+from core.ocr_manager import OCRManager
+from core.document_models import ModelManager
+from core.visual_classifier import VisualClassifier
+from core.page_store import PackedPage
+from core.shm_transport import SharedPageRing
+from core.pdf_layout import PDFLayout
+from core.page_index import PageIndex
+
+
+class PagePipeline:
+    """Processa páginas individuais ou documentos inteiros (lote)."""
+
+    @staticmethod
+    def is_blank(img) -> bool:
+        """Teste barato de página em branco (delegado ao ImageProcessing)."""
+        return ImageProcessing.is_blank_page(img)
+
+    @staticmethod
+    def _empty_result() -> dict:
+        """Resultado de página sem conteúdo (mesmas chaves de process_page)."""
+        return {'blank': False, 'text': '', 'model': None, 'data': {}, 'df': pd.DataFrame(),
+                'offset': (0, 0), 'scale': 1.0, 'quality': None, 'lines': None}
+
+    @staticmethod
+    def has_data(data: dict) -> bool:
+        return any(v for k, v in data.items() if k != 'tipo_documento')
+
+    @staticmethod
+    def process_page(img, model_name: str = None, lang: str = 'por', skip_blank: bool = True,
+                     zonal: bool = True, model_hint: str = None, autocrop: bool = True,
+                     triage: bool = True, remove_lines: bool = None,
+                     autoscale: bool = True, quality: dict = None) -> dict:
+        """
+        Processa uma única imagem de página.
+        Com um modelo definido, tenta primeiro os caminhos rápidos que ele
+        declarar: TABLE_GRID (OCR por célula da grade detectada) e ZONES
+        (OCR zonal). Um caminho rápido só vale com resultado completo
+        (model.is_complete); senão volta ao OCR da página inteira.
+        model_hint: modelo provável (ex.: pré-classificação visual) usado só
+        nos caminhos rápidos, e só aceito se a detecção pelo texto lido
+        (ModelManager.auto_detect) confirmar; a extração completa continua
+        com model_name.
+        autocrop: recorta margens/bordas antes do OCR; o deslocamento do
+        recorte fica em 'offset' para mapear caixas de volta à página.
+        triage: estima a qualidade do scan; só páginas ruins passam por
+        denoise/limiarização adaptativa, e só páginas tortas por deskew.
+        quality: triagem já feita pelo chamador numa página já endireitada
+        (ex.: a GUI); só aplica a rota, sem reavaliar nem girar de novo.
+        remove_lines: apaga as linhas de grade antes do OCR e guarda a
+        geometria em 'lines' (None = decide pelo REMOVE_LINES do modelo).
+        autoscale: redimensiona para a altura de texto ideal do Tesseract;
+        o fator fica em 'scale' (página = offset + coordenada / scale).
+        Retorna dict com: blank, text, model, data, df, offset, scale, quality, lines.
+        """
+        result = PagePipeline._empty_result()
+        if img is None:
+            return result
+
+        if skip_blank and PagePipeline.is_blank(img):
+            result['blank'] = True
+            return result
+
+        if quality is not None:
+            img, result['quality'] = ImageProcessing.preprocess_for_ocr(img, quality, deskew=False)
+        elif triage:
+            img, result['quality'] = ImageProcessing.preprocess_for_ocr(img)
+
+        if autocrop:
+            img, result['offset'] = ImageProcessing.auto_crop(img)
+
+        if autoscale:
+            img, result['scale'] = ImageProcessing.scale_to_text_height(img)
+
+        model = None
+        hinted = False
+        if model_name and model_name != "Auto-Detectar":
+            model = ModelManager.get_model_by_name(model_name)
+        elif model_hint:
+            model = ModelManager.get_model_by_name(model_hint)
+            hinted = model is not None
+
+        def accept(model, data, text):
+            # Dica visual nunca substitui a detecção: o texto tem que confirmar
+            return model.is_complete(data) and (not hinted or ModelManager.auto_detect(text)[0] is model)
+
+        if remove_lines is None:
+            remove_lines = bool(model is not None and model.REMOVE_LINES)
+        lines = None
+        if remove_lines:
+            img, lines = ImageProcessing.remove_ruling_lines(img)
+            result['lines'] = lines
+
+        if model is not None and model.TABLE_GRID:
+            grid = ImageProcessing.detect_table_grid(img, lines=lines)
+            rows = OCRManager.extract_cells(img, grid['cells'], lang=lang) if grid else None
+            # Só grades cujo cabeçalho de colunas o modelo reconhece; o resto
+            # da página (fora da grade) não é lido, então o resultado precisa
+            # estar completo para dispensar o OCR da página inteira
+            if rows and model.grid_header(rows) is not None:
+                top = grid['rows'][0]
+                header_text = OCRManager.extract_text(img[:top], lang=lang) if top > 20 else ''
+                model, data, df = ModelManager.process_grid(rows, header_text, model)
+                table_text = '\n'.join('  '.join(row) for row in rows)
+                text = f"{header_text}\n{table_text}"
+                if accept(model, data, text):
+                    result.update({'text': text, 'model': model, 'data': data, 'df': df})
+                    return result
+
+        if zonal and model is not None and model.ZONES:
+            zone_texts = OCRManager.extract_zones(img, model.ZONES, lang=lang)
+            model, data, df = ModelManager.process_zones(zone_texts, model)
+            text = '\n'.join(zone_texts.values())
+            if accept(model, data, text):
+                result.update({'text': text, 'model': model, 'data': data, 'df': df})
+                return result
+
+        text = OCRManager.extract_text(img, lang=lang)
+        model, data, df = ModelManager.process(text, model_name)
+        result.update({'text': text, 'model': model, 'data': data, 'df': df})
+        return result
+
+    @staticmethod
+    def process_text(text: str, model_name: str = None) -> dict:
+        """Aplica o modelo a um texto já extraído (ex.: camada de texto do PDF), sem OCR."""
+        model, data, df = ModelManager.process(text, model_name)
+        result = PagePipeline._empty_result()
+        result.update({'text': text, 'model': model, 'data': data, 'df': df})
+        return result
+
+    @staticmethod
+    def process_layout(layout: dict, model_name: str = None) -> dict:
+        """Aplica o modelo ao layout da camada de texto de uma página digital, sem OCR."""
+        model, data, df = ModelManager.process_layout(layout, model_name)
+        result = PagePipeline._empty_result()
+        result.update({'text': PDFLayout.layout_text(layout), 'model': model, 'data': data, 'df': df})
+        return result
+
+    @staticmethod
+    def _iter_pages(path: str, pages: list, skip_blank: bool, want_thumb: bool, autoscale: bool = True):
+        """
+        Gera (idx, img, thumb, blank) por página. Páginas de PDF em branco
+        são descartadas pela miniatura, antes do render completo (img=None).
+        Com autoscale, cada página de PDF é renderizada no zoom que deixa o
+        texto na altura ideal para o OCR, em vez do zoom fixo: a altura é
+        medida num render em zoom 1, que também dá a miniatura.
+        """
+        is_pdf = path.lower().endswith('.pdf')
+        for idx in pages:
+            thumb = probe = None
+            if is_pdf:
+                if autoscale:
+                    probe = ImageProcessing.load_pdf_as_image(path, idx, zoom=1)
+                    if probe is not None and (skip_blank or want_thumb):
+                        thumb = ImageProcessing.make_thumbnail(probe)
+                elif skip_blank or want_thumb:
+                    thumb = ImageProcessing.load_pdf_thumbnail(path, idx, color=True)
+                if skip_blank and thumb is not None and PagePipeline.is_blank(thumb):
+                    yield idx, None, thumb, True
+                    continue
+                zoom = ImageProcessing.optimal_pdf_zoom(path, idx, probe=probe) if autoscale else 2
+                img = ImageProcessing.load_pdf_as_image(path, idx, zoom=zoom)
+            else:
+                img = ImageProcessing.load_image(path)
+            blank = skip_blank and not is_pdf and img is not None and PagePipeline.is_blank(img)
+            yield idx, img, thumb, blank
+
+    @staticmethod
+    def process_document(path: str, pages: list = None, model_name: str = None,
+                         lang: str = 'por', skip_blank: bool = True, visual: bool = True,
+                         workers: int = 1, page_options: dict = None,
+                         text_layer: bool = True, index: bool = True,
+                         progress_callback=None) -> dict:
+        """
+        Processa várias páginas de um PDF (ou uma imagem) em lote.
+        pages: lista 0-based, None = todas.
+        visual: com Auto-Detectar, usa a pré-classificação visual da miniatura
+        para escolher o modelo antes do OCR.
+        workers: > 1 processa as páginas em um pool de processos; as páginas
+        renderizadas trafegam por memória compartilhada (SharedPageRing).
+        page_options: opções extras repassadas a process_page (ex.: remove_lines).
+        text_layer: páginas digitais (com camada de texto) são lidas pelo
+        PDFLayout, sem render nem OCR.
+        index: páginas já vistas (PageIndex) reaproveitam o resultado
+        armazenado; as novas são gravadas no índice ao final.
+        progress_callback(done, total) é chamado após cada página.
+        Retorna dict com: pages (resultados por página), skipped_blank
+        (lista 1-based), text (texto concatenado) e df (tabelas concatenadas).
+        """
+        is_pdf = path.lower().endswith('.pdf')
+        total_pages = ImageProcessing.get_pdf_page_count(path) if is_pdf else 1
+        if pages is None:
+            pages = list(range(total_pages))
+
+        page_options = dict(page_options or {})
+        auto = not model_name or model_name == "Auto-Detectar"
+        use_visual = visual and auto
+        by_page, skipped = {}, []
+        done = 0
+
+        def tick():
+            nonlocal done
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(pages))
+
+        # Páginas já conhecidas: resultado armazenado no índice
+        known = PageIndex.lookup(path, pages, model_name) if is_pdf and index else {}
+        for idx, stored in known.items():
+            by_page[idx] = dict(PagePipeline._empty_result(), **stored)
+            tick()
+        pending_pages = [idx for idx in pages if idx not in known]
+
+        # Páginas digitais: layout direto da camada de texto do PDF
+        layouts = PDFLayout.extract(path, pending_pages) if is_pdf and text_layer and pending_pages else {}
+        digital = {idx: layout for idx, layout in layouts.items() if layout['word_count'] >= PDFLayout.MIN_WORDS}
+        for idx, layout in digital.items():
+            by_page[idx] = PagePipeline.process_layout(layout, model_name)
+            tick()
+        scanned = [idx for idx in pending_pages if idx not in digital]
+
+        render_scaled = is_pdf and page_options.get('autoscale', True)
+        page_iter = PagePipeline._iter_pages(path, scanned, skip_blank, use_visual, render_scaled)
+        if render_scaled:
+            # O zoom do render já deixou o texto na altura ideal
+            page_options['autoscale'] = False
+
+        if workers <= 1:
+            for idx, img, thumb, blank in page_iter:
+                if blank:
+                    skipped.append(idx + 1)
+                elif img is not None:
+                    hint = VisualClassifier.match(thumb if thumb is not None else img)[0] if use_visual else None
+                    by_page[idx] = PagePipeline.process_page(img, model_name, lang, skip_blank=False,
+                                                             model_hint=hint, **page_options)
+                tick()
+        else:
+            lock = multiprocessing.Lock()
+            ring, pool, pending = None, None, {}
+
+            def drain(block=False):
+                finished = [f for f in pending if f.done()]
+                if block and not finished and pending:
+                    finished = list(wait(pending, return_when=FIRST_COMPLETED).done)
+                for fut in finished:
+                    by_page[pending.pop(fut)] = fut.result()
+                    tick()
+
+            try:
+                for idx, img, thumb, blank in page_iter:
+                    if blank or img is None:
+                        if blank:
+                            skipped.append(idx + 1)
+                        tick()
+                        continue
+                    hint = VisualClassifier.match(thumb if thumb is not None else img)[0] if use_visual else None
+                    if ring is None:
+                        # Slots dimensionados pela primeira página (com folga)
+                        ring = SharedPageRing.create(slots=workers * 2, slot_bytes=int(img.nbytes * 1.5),
+                                                     lock=lock)
+                        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                   initargs=(ring.spec, lock))
+                    while ring.in_use() >= ring.slots and pending:
+                        drain(block=True)
+                    # Páginas maiores que o slot seguem compactadas pela fila
+                    payload = ('shm', ring.put(img)) if ring.fits(img) else ('packed', PackedPage.from_image(img))
+                    pending[pool.submit(_process_in_worker, payload, model_name, lang, hint, page_options)] = idx
+                    drain()
+                while pending:
+                    drain(block=True)
+            finally:
+                if pool is not None:
+                    pool.shutdown(wait=True)
+                if ring is not None:
+                    ring.close()
+
+        if is_pdf and index:
+            PageIndex.store(path, {idx: page for idx, page in by_page.items()
+                                   if idx not in known and PagePipeline.has_data(page['data'])})
+
+        results, texts, frames = [], [], []
+        for idx in sorted(by_page):
+            page = by_page[idx]
+            page['page'] = idx + 1
+            results.append(page)
+            texts.append(f"--- Página {idx + 1} ---\n{page['text']}")
+            if not page['df'].empty:
+                df = page['df'].copy()
+                df.insert(0, 'pagina', idx + 1)
+                frames.append(df)
+
+        return {
+            'pages': results,
+            'skipped_blank': skipped,
+            'text': '\n\n'.join(texts),
+            'df': pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(),
+        }
+
+
+# ── Workers do pool de processos ──
+_worker_ring = None
+
+
+def _init_worker(spec, lock):
+    global _worker_ring
+    _worker_ring = SharedPageRing.attach(spec, lock)
+
+
+def _process_in_worker(payload, model_name, lang, hint, options):
+    kind, obj = payload
+    if kind == 'packed':
+        return PagePipeline.process_page(obj.to_image(), model_name, lang, skip_blank=False,
+                                         model_hint=hint, **options)
+    try:
+        img = _worker_ring.get(obj)
+        return PagePipeline.process_page(img, model_name, lang, skip_blank=False,
+                                         model_hint=hint, **options)
+    finally:
+        _worker_ring.release(obj)
@@ -0,0 +1,101 @@
+"""
+Strukturis Pro — Armazenamento Compacto de Páginas
+Formato sem perdas mais compacto para cada página — 1 bit/pixel
+(np.packbits) só para imagens que já são preto e branco puro (scans bitonais,
+páginas binarizadas), 8 bits para tons de cinza e BGR para o resto — e cache
+LRU limitado por memória. Nada é binarizado aqui: a página renderizada da GUI,
+com antialiasing, normalmente fica em 8 ou 24 bits.
+"""
+
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+class PackedPage:
+    """
+    Representação compacta e sem perdas de uma página.
+    mode: 'bits' (preto e branco, 1 bit/pixel), 'gray' (8 bits) ou 'bgr' (24 bits).
+    """
+
+    __slots__ = ('mode', 'shape', 'data')
+
+    def __init__(self, mode, shape, data):
+        self.mode = mode
+        self.shape = shape
+        self.data = data
+
+    @staticmethod
+    def from_image(img) -> 'PackedPage':
+        """Escolhe o formato mais compacto que preserva a imagem exatamente."""
+        gray = None
+        if img.ndim == 2:
+            gray = img
+        elif img.shape[2] == 3 and np.array_equal(img[:, :, 0], img[:, :, 1]) \
+                and np.array_equal(img[:, :, 1], img[:, :, 2]):
+            gray = img[:, :, 0]
+
+        if gray is None:
+            return PackedPage('bgr', img.shape, np.ascontiguousarray(img).copy())
+        if np.all((gray == 0) | (gray == 255)):
+            return PackedPage('bits', img.shape, np.packbits(gray > 127, axis=None))
+        return PackedPage('gray', img.shape, np.ascontiguousarray(gray).copy())
+
+    def to_image(self):
+        """Desempacota sob demanda, no mesmo formato (shape) da imagem original."""
+        h, w = self.shape[:2]
+        if self.mode == 'bgr':
+            return self.data.copy()
+        if self.mode == 'bits':
+            gray = np.unpackbits(self.data, count=h * w).reshape(h, w) * np.uint8(255)
+        else:
+            gray = self.data.copy()
+        if len(self.shape) == 3:
+            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        return gray
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes)
+
+
+class PageCache:
+    """
+    Cache LRU de páginas compactadas, limitado pelo total de bytes.
+    Guarda a imagem como recebida (ver PackedPage.from_image).
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        """Retorna (imagem, meta) ou None."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        packed, meta = item
+        return packed.to_image(), dict(meta)
+
+    def put(self, key, img, meta=None):
+        packed = PackedPage.from_image(img)
+        if key in self._items:
+            self._bytes -= self._items.pop(key)[0].nbytes
+        self._items[key] = (packed, dict(meta or {}))
+        self._bytes += packed.nbytes
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, (old, _) = self._items.popitem(last=False)
+            self._bytes -= old.nbytes
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
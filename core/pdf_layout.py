@@ -0,0 +1,158 @@
+"""
+Strukturis Pro — Layout da Camada de Texto de PDFs
+Palavras extraídas pelo PyMuPDF (get_text("words")) agrupadas em linhas por
+agrupamento vetorizado (NumPy) do centro vertical, sem OCR. As células de uma
+linha saem dos espaços entre palavras (line_cells) e as colunas de uma tabela
+são as células da linha de cabeçalho (to_grid).
+"""
+
+import fitz  # PyMuPDF
+import numpy as np
+
+
+class PDFLayout:
+    """Linhas e colunas da camada de texto de páginas digitais."""
+
+    Y_TOLERANCE = 3       # pt; mesma tolerância dos scripts de referência
+    MIN_WORDS = 10        # abaixo disso a página é tratada como digitalizada
+
+    @staticmethod
+    def page_words(page):
+        """
+        Palavras da página como (boxes, texts): boxes é um array float32 N×4
+        (x0, y0, x1, y1) em pontos e texts a lista de strings correspondente.
+        """
+        raw = page.get_text("words", sort=False)
+        if not raw:
+            return np.zeros((0, 4), dtype=np.float32), []
+        boxes = np.array([w[:4] for w in raw], dtype=np.float32)
+        return boxes, [w[4] for w in raw]
+
+    @staticmethod
+    def cluster_1d(values, tolerance):
+        """
+        Agrupa valores 1D: ordena e abre um novo grupo onde o salto entre
+        vizinhos passa da tolerância. Retorna o rótulo de cada valor.
+        """
+        values = np.asarray(values, dtype=np.float32)
+        if values.size == 0:
+            return np.zeros(0, dtype=np.int32)
+        order = np.argsort(values, kind='stable')
+        breaks = np.diff(values[order]) > tolerance
+        labels_sorted = np.concatenate(([0], np.cumsum(breaks))).astype(np.int32)
+        labels = np.empty_like(labels_sorted)
+        labels[order] = labels_sorted
+        return labels
+
+    @staticmethod
+    def group_lines(boxes, texts, y_tolerance=None):
+        """
+        Agrupa palavras em linhas pelo centro vertical e ordena cada linha
+        por x0. Retorna lista de dicts: top, bottom, text e words
+        (lista de (x0, x1, texto)).
+        """
+        if len(texts) == 0:
+            return []
+        tol = PDFLayout.Y_TOLERANCE if y_tolerance is None else y_tolerance
+        yc = (boxes[:, 1] + boxes[:, 3]) / 2
+        line_ids = PDFLayout.cluster_1d(yc, tol)
+
+        # Ordem final: linha, depois x0 — uma única ordenação para a página
+        order = np.lexsort((boxes[:, 0], line_ids))
+        ids = line_ids[order]
+        starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+        ends = np.append(starts[1:], len(order))
+
+        lines = []
+        for s, e in zip(starts, ends):
+            idx = order[s:e]
+            words = [(float(boxes[i, 0]), float(boxes[i, 2]), texts[i]) for i in idx]
+            lines.append({
+                'top': float(boxes[idx, 1].min()),
+                'bottom': float(boxes[idx, 3].max()),
+                'text': " ".join(w[2] for w in words),
+                'words': words,
+            })
+        return lines
+
+    @staticmethod
+    def line_cells(line, gap=6.0):
+        """Células de uma linha como (x0, x1, texto), cortando onde o espaço entre palavras passa de gap (pt)."""
+        words = line['words']
+        if not words:
+            return []
+        x0 = np.array([w[0] for w in words], dtype=np.float32)
+        x1 = np.array([w[1] for w in words], dtype=np.float32)
+        cuts = np.flatnonzero(x0[1:] - x1[:-1] > gap) + 1
+        bounds = np.concatenate(([0], cuts, [len(words)]))
+        return [(float(x0[a]), float(x1[b - 1]), " ".join(w[2] for w in words[a:b]))
+                for a, b in zip(bounds[:-1], bounds[1:])]
+
+    @staticmethod
+    def to_grid(lines, columns) -> list:
+        """
+        Matriz de células das linhas, com uma coluna por span (x0, x1) de
+        columns (ex.: as células da linha de cabeçalho). Cada palavra vai
+        para a coluna pelo centro, com fronteiras no meio do espaço entre
+        spans vizinhos — números alinhados à direita caem na coluna certa.
+        """
+        if not columns:
+            return []
+        spans = sorted(columns)
+        bounds = np.array([(a[1] + b[0]) / 2 for a, b in zip(spans[:-1], spans[1:])], dtype=np.float32)
+        rows = []
+        for line in lines:
+            row = [[] for _ in spans]
+            words = line['words']
+            if words:
+                centers = np.array([(w[0] + w[1]) / 2 for w in words], dtype=np.float32)
+                for word, col in zip(words, np.searchsorted(bounds, centers)):
+                    row[col].append(word[2])
+            rows.append([" ".join(cell) for cell in row])
+        return rows
+
+    @staticmethod
+    def layout_text(layout: dict) -> str:
+        """Texto da página em linhas (mesma forma do texto de OCR)."""
+        return "\n".join(line['text'] for line in layout['lines'])
+
+    @staticmethod
+    def extract_page(page, y_tolerance=None) -> dict:
+        """Estrutura compacta de uma página: width, height, lines."""
+        boxes, texts = PDFLayout.page_words(page)
+        return {
+            'width': float(page.rect.width),
+            'height': float(page.rect.height),
+            'word_count': len(texts),
+            'lines': PDFLayout.group_lines(boxes, texts, y_tolerance),
+        }
+
+    @staticmethod
+    def extract(path: str, pages: list = None, y_tolerance=None) -> dict:
+        """
+        Layout de várias páginas abrindo o PDF uma única vez.
+        pages: lista 0-based, None = todas. Retorna {idx: extract_page(...)}.
+        """
+        result = {}
+        try:
+            doc = fitz.open(path)
+            for idx in (range(len(doc)) if pages is None else pages):
+                if 0 <= idx < len(doc):
+                    result[idx] = PDFLayout.extract_page(doc.load_page(idx), y_tolerance)
+            doc.close()
+        except Exception as e:
+            print(f"Erro ao ler camada de texto: {e}")
+        return result
+
+    @staticmethod
+    def text_pages(path: str, pages: list = None, min_words: int = None) -> dict:
+        """
+        Páginas com camada de texto utilizável: {idx: texto em linhas}.
+        Páginas digitalizadas (poucas palavras) ficam de fora e seguem para OCR.
+        """
+        min_words = PDFLayout.MIN_WORDS if min_words is None else min_words
+        return {
+            idx: PDFLayout.layout_text(layout)
+            for idx, layout in PDFLayout.extract(path, pages).items()
+            if layout['word_count'] >= min_words
+        }
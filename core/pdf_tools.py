@@ -5,11 +5,30 @@ Dividir, mesclar, extrair páginas usando PyMuPDF (fitz).
 
 import fitz  # PyMuPDF
 import os
+import re
+import queue
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from core.image_processing import ImageProcessing
+from core.ocr_manager import OCRManager
 
 
 class PDFTools:
     """Utilitários para manipulação de arquivos PDF."""
 
+    @staticmethod
+    def plan(input_path: str) -> 'PDFPlan':
+        """
+        Inicia um plano de operações encadeadas sobre input_path, executado
+        com uma única leitura do arquivo. Ex.:
+            PDFTools.plan(p).rotate(90, [3, 4, 5]).delete([7]).split_every(50, pasta).execute()
+        """
+        return PDFPlan(input_path)
+
     @staticmethod
     def get_page_count(path: str) -> int:
         """Retorna o número de páginas de um PDF."""
@@ -43,28 +62,86 @@ class PDFTools:
             print(f"Erro ao dividir PDF: {e}")
             return False
 
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
+    SPLIT_NAME = "{base}_pagina_{pagina}"
+
+    @staticmethod
+    def _safe_filename(name: str) -> str:
+        name = re.sub(r'[\\/:*?"<>|\r\n\t]+', '_', str(name)).strip(' ._')
+        return name[:150] or "pagina"
+
     @staticmethod
-    def split_each_page(input_path: str, output_dir: str) -> list:
+    def output_names(input_path: str, total: int, name_template: str = None, fields: dict = None) -> list:
+        """
+        Nome de arquivo de cada página (sem diretório) para split_each_page.
+        name_template usa {base}, {pagina} e qualquer campo de fields[pagina]
+        (ex.: "{funcionario}_{mes_ano}"); campos ausentes ficam vazios.
+        Nomes repetidos recebem o número da página como sufixo.
+        """
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        template = name_template or PDFTools.SPLIT_NAME
+        names, seen = [], set()
+        for i in range(total):
+            values = {k: v for k, v in ((fields or {}).get(i + 1) or {}).items() if isinstance(v, (str, int, float))}
+            values.update(base=base, pagina=i + 1)
+            try:
+                name = PDFTools._safe_filename(template.format_map(_BlankFields(values)))
+            except (ValueError, IndexError):
+                name = PDFTools._safe_filename(PDFTools.SPLIT_NAME.format(**values))
+            if name.lower() in seen:
+                name = f"{name}_{i + 1}"
+            seen.add(name.lower())
+            names.append(name + ".pdf")
+        return names
+
+    @staticmethod
+    def split_each_page(input_path: str, output_dir: str, name_template: str = None,
+                        fields: dict = None, workers: int = None, compress: bool = False,
+                        progress_callback=None) -> list:
         """
         Divide um PDF em arquivos individuais (1 página cada).
-        Retorna lista de caminhos dos arquivos gerados.
+        As páginas são repartidas em faixas contíguas entre processos; cada
+        processo abre a origem por conta própria e grava uma página por vez
+        (memória limitada a uma página por processo).
+        name_template/fields: nomes a partir de campos extraídos (ver output_names).
+        compress: grava com garbage collection e deflate.
+        progress_callback(feitos, total, caminho) é chamado a cada arquivo gravado.
+        Retorna lista de caminhos dos arquivos gerados, na ordem das páginas.
         """
         results = []
         try:
-            doc = fitz.open(input_path)
-            base = os.path.splitext(os.path.basename(input_path))[0]
-
+            total = PDFTools.get_page_count(input_path)
+            if total == 0:
+                return results
             os.makedirs(output_dir, exist_ok=True)
+            names = PDFTools.output_names(input_path, total, name_template, fields)
+            jobs = [(i, os.path.join(output_dir, names[i])) for i in range(total)]
+            save_options = {'garbage': 3, 'deflate': True} if compress else {}
 
-            for i in range(len(doc)):
-                out = fitz.open()
-                out.insert_pdf(doc, from_page=i, to_page=i)
-                out_path = os.path.join(output_dir, f"{base}_pagina_{i + 1}.pdf")
-                out.save(out_path)
-                out.close()
-                results.append(out_path)
+            workers = max(1, min(workers or PDFTools.MAX_WORKERS, total // 20 or 1))
+            if workers == 1:
+                return _split_pages(input_path, jobs, save_options, None, progress_callback)
 
-            doc.close()
+            size = -(-total // workers)
+            chunks = [jobs[k:k + size] for k in range(0, total, size)]
+            with multiprocessing.Manager() as manager:
+                progress_q = manager.Queue()
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_split_pages, input_path, chunk, save_options, progress_q)
+                               for chunk in chunks]
+                    done = 0
+                    while done < total:
+                        try:
+                            path = progress_q.get(timeout=0.1)
+                        except queue.Empty:
+                            if all(f.done() for f in futures):
+                                break
+                            continue
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, total, path)
+                    for fut in futures:
+                        results.extend(fut.result())
         except Exception as e:
             print(f"Erro ao dividir páginas: {e}")
         return results
@@ -92,26 +169,273 @@ class PDFTools:
             print(f"Erro ao extrair páginas: {e}")
             return False
 
+    MERGE_CHUNK = 50
+
     @staticmethod
-    def merge_pdfs(input_paths: list, output_path: str) -> bool:
+    def merge_pdfs(input_paths: list, output_path: str, chunk_size: int = None,
+                   progress_callback=None) -> bool:
         """
-        Mescla múltiplos PDFs em um único arquivo.
+        Mescla múltiplos PDFs em um único arquivo, com memória limitada.
+        As entradas são agrupadas em partes de chunk_size arquivos, cada parte
+        gravada em disco com deduplicação de objetos (fontes, imagens) e
+        deflate; as partes são então anexadas ao arquivo final por gravação
+        incremental. A deduplicação vale dentro de cada parte: um recurso
+        repetido entre partes é gravado uma vez por parte, em troca de memória
+        constante qualquer que seja o número de entradas. Uma entrada com erro
+        é ignorada sem perder as demais.
+        progress_callback(feitos, total) é chamado a cada entrada.
         """
+        paths = [p for p in input_paths if os.path.exists(p)]
+        chunk_size = chunk_size or PDFTools.MERGE_CHUNK
+        done = 0
         try:
-            out = fitz.open()
-            for path in input_paths:
-                if os.path.exists(path):
-                    doc = fitz.open(path)
-                    out.insert_pdf(doc)
-                    doc.close()
+            out_dir = os.path.dirname(os.path.abspath(output_path))
+            with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+                parts = []
+                for start in range(0, len(paths), chunk_size):
+                    part = fitz.open()
+                    for path in paths[start:start + chunk_size]:
+                        try:
+                            doc = fitz.open(path)
+                            part.insert_pdf(doc)
+                            doc.close()
+                        except Exception as e:
+                            print(f"Erro ao mesclar {path}: {e}")
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(paths))
+                    if len(part):
+                        part_path = os.path.join(tmp, f"parte_{len(parts) + 1}.pdf")
+                        part.save(part_path, garbage=4, deflate=True)
+                        parts.append(part_path)
+                    part.close()
 
-            out.save(output_path)
-            out.close()
+                if not parts:
+                    return False
+
+                # A primeira parte vira o arquivo final; as demais são anexadas
+                # incrementalmente (só os objetos novos são gravados). Uma
+                # gravação completa com garbage=4 aqui carregaria e compararia
+                # todos os objetos do arquivo inteiro de uma vez
+                os.replace(parts[0], output_path)
+                for part_path in parts[1:]:
+                    out = fitz.open(output_path)
+                    part = fitz.open(part_path)
+                    out.insert_pdf(part)
+                    part.close()
+                    out.save(output_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                    out.close()
             return True
         except Exception as e:
             print(f"Erro ao mesclar PDFs: {e}")
             return False
 
+    # ── Otimização ──
+    OPT_MAX_DPI = 200
+    OPT_JPEG_QUALITY = 75
+    BILEVEL_MID_RATIO = 0.02   # fração máx. de tons intermediários p/ tratar como P&B
+
+    @staticmethod
+    def _image_dpi(page, xref, width_px) -> float:
+        """Maior resolução efetiva com que a imagem aparece na página (0 se não aparece)."""
+        dpi = 0.0
+        for rect in page.get_image_rects(xref):
+            if rect.width > 0:
+                dpi = max(dpi, width_px / (rect.width / 72))
+        return dpi
+
+    @staticmethod
+    def _recompress(pix, dpi: float, max_dpi: int, jpeg_quality: int, bilevel: bool):
+        """
+        Reamostra e recodifica uma imagem. Páginas P&B viram PNG de 1 bit
+        (flate); as demais, JPEG. Retorna os bytes ou None se não aplicável.
+        """
+        if pix.alpha or pix.colorspace is None:
+            return None
+        if pix.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+        img = img[:, :, 0].copy() if pix.n == 1 else cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+        if dpi > max_dpi:
+            factor = max_dpi / dpi
+            size = (max(1, int(pix.w * factor)), max(1, int(pix.h * factor)))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+        gray = img if img.ndim == 2 else None
+        if gray is None and np.abs(img.astype(np.int16) - img[:, :, :1]).max() <= 8:
+            gray = img[:, :, 0]
+        if bilevel and gray is not None:
+            mid = np.count_nonzero((gray > 32) & (gray < 224)) / gray.size
+            if mid <= PDFTools.BILEVEL_MID_RATIO:
+                binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+                ok, buf = cv2.imencode('.png', binary, [cv2.IMWRITE_PNG_BILEVEL, 1])
+                return buf.tobytes() if ok else None
+        ok, buf = cv2.imencode('.jpg', gray if gray is not None else img,
+                               [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        return buf.tobytes() if ok else None
+
+    @staticmethod
+    def _stored_size(stream: bytes) -> int:
+        """
+        Tamanho com que o PyMuPDF grava a imagem: PNGs são decodificados e
+        recomprimidos em flate, então o tamanho codificado não serve de medida.
+        """
+        scratch = fitz.open()
+        try:
+            page = scratch.new_page()
+            xref = page.insert_image(page.rect, stream=stream)
+            return len(scratch.xref_stream_raw(xref) or b'')
+        finally:
+            scratch.close()
+
+    @staticmethod
+    def optimize_pdf(input_path: str, output_path: str, max_dpi: int = None,
+                     jpeg_quality: int = None, bilevel: bool = True) -> dict:
+        """
+        Reduz o tamanho de um PDF para arquivamento:
+        - imagens acima de max_dpi são reamostradas;
+        - páginas P&B são gravadas como imagens de 1 bit, as demais em JPEG;
+        - objetos não usados/duplicados são removidos e os streams comprimidos.
+        Uma imagem só é substituída se o stream gravado ficar menor, e se o
+        arquivo final não ficar menor que o original, o original é copiado.
+        Imagens com transparência e imagens já em 1 bit (CCITT/JBIG2) são
+        mantidas.
+        Retorna dict com: before, after (bytes) e images (imagens recodificadas).
+        """
+        max_dpi = max_dpi or PDFTools.OPT_MAX_DPI
+        jpeg_quality = jpeg_quality or PDFTools.OPT_JPEG_QUALITY
+        stats = {'before': os.path.getsize(input_path), 'after': 0, 'images': 0}
+        try:
+            doc = fitz.open(input_path)
+            seen = set()
+            for page in doc:
+                for xref, smask, width, height, bpc, *_ in page.get_images(full=True):
+                    if xref in seen:
+                        continue
+                    seen.add(xref)
+                    if smask or bpc == 1:
+                        continue
+                    dpi = PDFTools._image_dpi(page, xref, width)
+                    new = PDFTools._recompress(fitz.Pixmap(doc, xref), dpi, max_dpi, jpeg_quality, bilevel)
+                    if new and PDFTools._stored_size(new) < len(doc.xref_stream_raw(xref) or b''):
+                        page.replace_image(xref, stream=new)
+                        stats['images'] += 1
+
+            doc.save(output_path, garbage=4, deflate=True)
+            doc.close()
+            stats['after'] = os.path.getsize(output_path)
+            if stats['after'] >= stats['before']:
+                shutil.copyfile(input_path, output_path)
+                stats['after'], stats['images'] = stats['before'], 0
+        except Exception as e:
+            print(f"Erro ao otimizar PDF: {e}")
+        return stats
+
+    @staticmethod
+    def output_paths(input_paths: list, output_dir: str) -> list:
+        """
+        [(entrada, saída)] em output_dir com o nome original; nomes repetidos
+        (arquivos de pastas diferentes) ou iguais a uma entrada ganham sufixo
+        _2, _3... Entradas repetidas aparecem uma vez.
+        """
+        sources = list(dict.fromkeys(os.path.abspath(p) for p in input_paths))
+        taken = {os.path.normcase(p) for p in sources}
+        jobs = []
+        for src in sources:
+            stem, ext = os.path.splitext(os.path.basename(src))
+            dst, n = os.path.join(output_dir, stem + ext), 1
+            while os.path.normcase(os.path.abspath(dst)) in taken:
+                n += 1
+                dst = os.path.join(output_dir, f"{stem}_{n}{ext}")
+            taken.add(os.path.normcase(os.path.abspath(dst)))
+            jobs.append((src, dst))
+        return jobs
+
+    @staticmethod
+    def optimize_batch(input_paths: list, output_dir: str, workers: int = None,
+                       progress_callback=None, **options) -> dict:
+        """
+        Otimiza vários PDFs em paralelo (um processo por arquivo).
+        Saídas com o mesmo nome recebem sufixo (ver output_paths).
+        options são repassadas a optimize_pdf. progress_callback(feitos, total).
+        Retorna {caminho_entrada: estatísticas}.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        results = {}
+        jobs = PDFTools.output_paths(input_paths, output_dir)
+        workers = max(1, min(workers or PDFTools.MAX_WORKERS, len(jobs)))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(PDFTools.optimize_pdf, src, dst, **options): src for src, dst in jobs}
+                for fut in as_completed(futures):
+                    results[futures[fut]] = fut.result()
+                    if progress_callback:
+                        progress_callback(len(results), len(jobs))
+        except Exception as e:
+            print(f"Erro ao otimizar PDFs: {e}")
+        return results
+
+    # ── Orientação automática ──
+    ORIENT_ZOOM = 100 / 72     # ~100 DPI basta para OSD e para a heurística
+    ORIENT_CHUNK = 8
+
+    @staticmethod
+    def detect_orientations(input_path: str, pages: list = None, workers: int = None,
+                            use_osd: bool = True, progress_callback=None) -> dict:
+        """
+        Detecta a orientação das páginas em paralelo (renders em baixa
+        resolução; OSD do Tesseract e, na falta dele, heurística de linhas).
+        Retorna {índice 0-based: rotação horária necessária} só das páginas
+        que precisam de correção. progress_callback(feitas, total).
+        """
+        total = PDFTools.get_page_count(input_path)
+        pages = list(range(total)) if pages is None else [p for p in pages if 0 <= p < total]
+        chunks = [pages[k:k + PDFTools.ORIENT_CHUNK] for k in range(0, len(pages), PDFTools.ORIENT_CHUNK)]
+        found, done = {}, 0
+        if not chunks:
+            return found
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, min(workers or PDFTools.MAX_WORKERS, len(chunks)))) as pool:
+                futures = [pool.submit(_detect_orientation_pages, input_path, chunk, use_osd) for chunk in chunks]
+                for fut in as_completed(futures):
+                    for idx, angle in fut.result():
+                        done += 1
+                        if angle:
+                            found[idx] = angle
+                    if progress_callback:
+                        progress_callback(done, len(pages))
+        except Exception as e:
+            print(f"Erro ao detectar orientação: {e}")
+        return found
+
+    @staticmethod
+    def auto_rotate(input_path: str, output_path: str, pages: list = None, workers: int = None,
+                    use_osd: bool = True, progress_callback=None) -> list:
+        """
+        Corrige páginas de cabeça para baixo ou deitadas gravando apenas o
+        atributo /Rotate (sem rasterizar de novo). Se output_path for o
+        próprio arquivo, grava incrementalmente.
+        Retorna [(página 1-based, rotação aplicada)].
+        """
+        corrections = PDFTools.detect_orientations(input_path, pages, workers, use_osd, progress_callback)
+        applied = []
+        try:
+            doc = fitz.open(input_path)
+            for idx, angle in sorted(corrections.items()):
+                page = doc.load_page(idx)
+                page.set_rotation((page.rotation + angle) % 360)
+                applied.append((idx + 1, angle))
+            if os.path.abspath(output_path) == os.path.abspath(input_path):
+                if applied:
+                    doc.save(input_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+            else:
+                doc.save(output_path, garbage=1)
+            doc.close()
+        except Exception as e:
+            print(f"Erro ao rotacionar automaticamente: {e}")
+        return applied
+
     @staticmethod
     def rotate_pages(input_path: str, output_path: str, angle: int, pages: list = None) -> bool:
         """
@@ -134,3 +458,188 @@ class PDFTools:
         except Exception as e:
             print(f"Erro ao rotacionar: {e}")
             return False
+
+
+class _BlankFields(dict):
+    """format_map que deixa vazios os campos ausentes do template."""
+
+    def __missing__(self, key):
+        return ''
+
+
+def _split_pages(input_path: str, jobs: list, save_options: dict, progress_q=None,
+                 progress_callback=None) -> list:
+    """Grava cada (índice, caminho) de jobs como um PDF de uma página (roda em worker)."""
+    written = []
+    doc = fitz.open(input_path)
+    try:
+        for i, out_path in jobs:
+            out = fitz.open()
+            out.insert_pdf(doc, from_page=i, to_page=i)
+            out.save(out_path, **save_options)
+            out.close()
+            written.append(out_path)
+            if progress_q is not None:
+                progress_q.put(out_path)
+            if progress_callback:
+                progress_callback(len(written), len(jobs), out_path)
+    finally:
+        doc.close()
+    return written
+
+
+def _detect_orientation_pages(input_path: str, pages: list, use_osd: bool) -> list:
+    """Renderiza cada página em baixa resolução e estima a correção de rotação (roda em worker)."""
+    results = []
+    doc = fitz.open(input_path)
+    try:
+        for idx in pages:
+            page = doc.load_page(idx)
+            pix = page.get_pixmap(matrix=fitz.Matrix(PDFTools.ORIENT_ZOOM, PDFTools.ORIENT_ZOOM),
+                                  colorspace=fitz.csGRAY, alpha=False)
+            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w)
+            angle = OCRManager.detect_orientation(img) if use_osd else None
+            if angle is None:
+                angle, confidence = ImageProcessing.estimate_orientation(img)
+                if confidence < 0.15:
+                    angle = 0
+            results.append((idx, angle))
+    finally:
+        doc.close()
+    return results
+
+
+class PDFPlan:
+    """
+    Plano de operações sobre um PDF. As operações só manipulam referências
+    de página em memória (arquivo de origem, índice, rotação extra); os
+    arquivos de origem são abertos uma vez e todas as saídas são gravadas
+    em uma única passada por execute().
+
+    Os números de página de cada operação são 1-based e se referem ao
+    documento como está naquele ponto do plano (após as operações anteriores).
+    """
+
+    def __init__(self, input_path: str):
+        self.input_path = input_path
+        self._ops = []
+
+    # ── Operações (encadeáveis) ──
+    def rotate(self, angle: int, pages: list = None) -> 'PDFPlan':
+        """Rotaciona páginas (90, 180 ou 270); pages None = todas."""
+        self._ops.append(('rotate', angle, pages))
+        return self
+
+    def delete(self, pages: list) -> 'PDFPlan':
+        """Remove páginas."""
+        self._ops.append(('delete', pages))
+        return self
+
+    def extract(self, pages: list) -> 'PDFPlan':
+        """Mantém apenas as páginas indicadas, na ordem crescente."""
+        self._ops.append(('extract', pages))
+        return self
+
+    def append(self, path: str, pages: list = None) -> 'PDFPlan':
+        """Acrescenta páginas de outro PDF ao final (mescla)."""
+        self._ops.append(('append', path, pages))
+        return self
+
+    def save(self, output_path: str) -> 'PDFPlan':
+        """Grava o documento no estado atual do plano."""
+        self._ops.append(('save', output_path))
+        return self
+
+    def split_range(self, output_path: str, start: int, end: int) -> 'PDFPlan':
+        """Grava as páginas start..end (inclusive) do estado atual."""
+        self._ops.append(('split_range', output_path, start, end))
+        return self
+
+    def split_every(self, size: int, output_dir: str, name: str = "{base}_parte_{n}.pdf") -> 'PDFPlan':
+        """Grava o estado atual em blocos de size páginas (name: {base}, {n}, {start}, {end})."""
+        self._ops.append(('split_every', size, output_dir, name))
+        return self
+
+    # ── Execução ──
+    @staticmethod
+    def _select(refs: list, pages: list) -> set:
+        return {p - 1 for p in pages if 0 < p <= len(refs)} if pages else set(range(len(refs)))
+
+    def _resolve(self, docs: dict) -> list:
+        """Aplica as operações às referências e retorna [(caminho_saída, refs)]."""
+        refs = [(self.input_path, i, 0) for i in range(len(docs[self.input_path]))]
+        base = os.path.splitext(os.path.basename(self.input_path))[0]
+        outputs = []
+
+        for op in self._ops:
+            kind = op[0]
+            if kind == 'rotate':
+                chosen = self._select(refs, op[2])
+                refs = [(src, i, (rot + op[1]) % 360 if n in chosen else rot)
+                        for n, (src, i, rot) in enumerate(refs)]
+            elif kind == 'delete':
+                dropped = self._select(refs, op[1])
+                refs = [r for n, r in enumerate(refs) if n not in dropped]
+            elif kind == 'extract':
+                kept = self._select(refs, op[1])
+                refs = [r for n, r in enumerate(refs) if n in kept]
+            elif kind == 'append':
+                path = op[1]
+                if path not in docs:
+                    docs[path] = fitz.open(path)
+                other = [(path, i, 0) for i in range(len(docs[path]))]
+                kept = self._select(other, op[2])
+                refs = refs + [r for n, r in enumerate(other) if n in kept]
+            elif kind == 'save':
+                outputs.append((op[1], list(refs)))
+            elif kind == 'split_range':
+                start, end = max(1, op[2]), min(len(refs), op[3])
+                outputs.append((op[1], refs[start - 1:end]))
+            elif kind == 'split_every':
+                size, output_dir, name = op[1], op[2], op[3]
+                os.makedirs(output_dir, exist_ok=True)
+                for n, start in enumerate(range(0, len(refs), size), 1):
+                    chunk = refs[start:start + size]
+                    fname = name.format(base=base, n=n, start=start + 1, end=start + len(chunk))
+                    outputs.append((os.path.join(output_dir, fname), chunk))
+        return outputs
+
+    @staticmethod
+    def _write(docs: dict, refs: list, output_path: str, save_options: dict):
+        out = fitz.open()
+        # Páginas consecutivas da mesma origem entram em um único insert_pdf
+        run_start = 0
+        for n in range(1, len(refs) + 1):
+            if n < len(refs) and refs[n][0] == refs[n - 1][0] and refs[n][1] == refs[n - 1][1] + 1:
+                continue
+            src, first = refs[run_start][0], refs[run_start][1]
+            out.insert_pdf(docs[src], from_page=first, to_page=refs[n - 1][1])
+            run_start = n
+
+        for n, (_, _, rot) in enumerate(refs):
+            if rot:
+                page = out.load_page(n)
+                page.set_rotation((page.rotation + rot) % 360)
+
+        out.save(output_path, **save_options)
+        out.close()
+
+    def execute(self, **save_options) -> list:
+        """
+        Executa o plano. save_options são repassadas ao save do PyMuPDF
+        (ex.: garbage=3, deflate=True). Retorna a lista de arquivos gerados.
+        """
+        docs, written = {}, []
+        try:
+            docs[self.input_path] = fitz.open(self.input_path)
+            for output_path, refs in self._resolve(docs):
+                if not refs:
+                    continue
+                self._write(docs, refs, output_path, save_options)
+                written.append(output_path)
+        except Exception as e:
+            print(f"Erro ao executar plano de PDF: {e}")
+        finally:
+            for doc in docs.values():
+                doc.close()
+        return written
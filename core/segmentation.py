@@ -0,0 +1,190 @@
+"""
+Strukturis Pro — Segmentação de Documentos Combinados
+Localiza o início de cada documento (contracheque, cartão de ponto...) em
+PDFs com centenas de documentos em sequência, olhando só a faixa do
+cabeçalho de cada página: texto (camada de texto ou OCR da faixa), hash
+visual, identificação do funcionário e período.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from core.image_processing import ImageProcessing
+from core.ocr_manager import OCRManager
+from core.pdf_layout import PDFLayout
+from core.pdf_tools import PDFTools
+
+
+class DocumentSegmenter:
+    """Divide um PDF combinado em intervalos de páginas, um por documento."""
+
+    HEADER_BAND = 0.25        # fração superior da página analisada
+    HASH_DISTANCE = 10        # bits; cabeçalhos "iguais" abaixo disso
+
+    RE_CPF = re.compile(r'\d{3}\.\d{3}\.\d{3}-\d{2}')
+    RE_MATRICULA = re.compile(r'(?:matr[íi]cula|registro|c[óo]d\.?\s*func\w*)\s*[:.]?\s*(\d{2,})', re.IGNORECASE)
+    # Valor após o rótulo completo ("Nome do funcionário:" inclusive), em
+    # qualquer caixa; termina em dois espaços ou no próximo "Rótulo:"
+    _PALAVRA = r"(?![\w.'\-]+\s*:)[\w.'\-]+"
+    RE_NOME = re.compile(
+        r'\b(?:nome(?:\s+d[oa]\s+(?:funcion[áa]ri[oa]|empregad[oa]|colaborador[a]?))?'
+        r'|funcion[áa]ri[oa]|empregad[oa]|colaborador[a]?)\s*[:.]\s*'
+        r'(' + _PALAVRA + r'(?: ' + _PALAVRA + r')*)',
+        re.IGNORECASE)
+    # Período rotulado (competência, referência...): aceita mm/aaaa, dd/mm/aaaa
+    # (início de um intervalo) ou o mês por extenso
+    RE_PERIODO_ROTULO = re.compile(
+        r'(?:compet[êe]ncia|refer[êe]ncia|per[íi]odo|m[êe]s(?:/ano)?)\s*[:.]?\s*(?:de\s+)?'
+        r'(?:(?:\d{2}/)?(0[1-9]|1[0-2])/(\d{4})\b'
+        r'|(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)[a-zç]*\s*(?:/|de)?\s*(\d{4})\b)',
+        re.IGNORECASE)
+    # mm/aaaa solto, mas não o mm/aaaa final de uma data completa
+    RE_PERIODO = re.compile(r'(?<!\d/)\b(0[1-9]|1[0-2])/(\d{4})\b')
+    RE_PERIODO_MES = re.compile(r'\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)[a-zç]*\s*(?:/|de)?\s*(\d{4})\b',
+                                re.IGNORECASE)
+    RE_PAGINA = re.compile(r'(?:p[áa]g(?:ina)?|folha)\.?\s*(\d+)\s*(?:de|/)\s*(\d+)', re.IGNORECASE)
+
+    # ── Assinatura da página ──
+    @staticmethod
+    def page_signature(header_text: str, header_hash: int = None) -> dict:
+        """Campos do cabeçalho usados para decidir onde começa um documento."""
+        text = header_text or ''
+        key = None
+        for regex in (DocumentSegmenter.RE_CPF, DocumentSegmenter.RE_MATRICULA, DocumentSegmenter.RE_NOME):
+            m = regex.search(text)
+            if m:
+                key = re.sub(r'\s+', ' ', (m.group(1) if m.groups() else m.group(0))).strip().upper()
+                break
+
+        # Primeiro o período rotulado, depois o primeiro mm/aaaa, depois o mês por extenso
+        period = None
+        labelled = DocumentSegmenter.RE_PERIODO_ROTULO.search(text)
+        plain = DocumentSegmenter.RE_PERIODO.search(text)
+        if labelled and labelled.group(1):
+            period = f"{labelled.group(1)}/{labelled.group(2)}"
+        elif labelled:
+            period = f"{labelled.group(3).lower()}/{labelled.group(4)}"
+        elif plain:
+            period = f"{plain.group(1)}/{plain.group(2)}"
+        else:
+            m = DocumentSegmenter.RE_PERIODO_MES.search(text)
+            if m:
+                period = f"{m.group(1).lower()}/{m.group(2)}"
+
+        sheet = None
+        m = DocumentSegmenter.RE_PAGINA.search(text)
+        if m:
+            sheet = (int(m.group(1)), int(m.group(2)))
+
+        return {'key': key, 'period': period, 'sheet': sheet, 'hash': header_hash}
+
+    @staticmethod
+    def _header_signatures(path: str, ocr: bool, lang: str, progress_callback=None) -> list:
+        total = PDFTools.get_page_count(path)
+        layouts = PDFLayout.extract(path)
+        signatures = [None] * total
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=OCRManager.MAX_WORKERS) as pool:
+            for idx in range(total):
+                thumb = ImageProcessing.load_pdf_thumbnail(path, idx)
+                band_hash = None
+                if thumb is not None:
+                    band_hash = ImageProcessing.dhash(thumb[:max(8, int(thumb.shape[0] * DocumentSegmenter.HEADER_BAND))])
+
+                layout = layouts.get(idx)
+                if layout and layout['word_count'] >= PDFLayout.MIN_WORDS:
+                    limit = layout['height'] * DocumentSegmenter.HEADER_BAND
+                    text = "\n".join(l['text'] for l in layout['lines'] if l['top'] < limit)
+                    signatures[idx] = DocumentSegmenter.page_signature(text, band_hash)
+                elif ocr:
+                    # Página digitalizada: OCR só da faixa do cabeçalho, em baixa resolução
+                    img = ImageProcessing.load_pdf_as_image(path, idx, zoom=1.5)
+                    if img is not None:
+                        band = ImageProcessing.to_grayscale(img[:int(img.shape[0] * DocumentSegmenter.HEADER_BAND)])
+                        pending[idx] = (pool.submit(OCRManager.extract_text, band, lang, '--psm 6'), band_hash)
+                    else:
+                        signatures[idx] = DocumentSegmenter.page_signature('', band_hash)
+                else:
+                    signatures[idx] = DocumentSegmenter.page_signature('', band_hash)
+                # Poucas faixas em voo: a memória não cresce com o número de páginas
+                while len(pending) > OCRManager.MAX_WORKERS * 2:
+                    done_idx = next(iter(pending))
+                    fut, done_hash = pending.pop(done_idx)
+                    signatures[done_idx] = DocumentSegmenter.page_signature(fut.result(), done_hash)
+                if progress_callback:
+                    progress_callback(idx + 1, total)
+
+            for idx, (fut, band_hash) in pending.items():
+                signatures[idx] = DocumentSegmenter.page_signature(fut.result(), band_hash)
+        return signatures
+
+    # ── Segmentação ──
+    @staticmethod
+    def is_start(sig: dict, first: dict, prev: dict) -> bool:
+        """
+        Decide se a página (sig) abre um novo documento, dado o primeiro
+        cabeçalho do documento atual (first) e a página anterior (prev).
+        """
+        if sig['sheet']:
+            return sig['sheet'][0] == 1
+        if sig['key'] and first['key']:
+            if sig['key'] != first['key']:
+                return True
+            return bool(sig['period'] and first['period'] and sig['period'] != first['period'])
+        if sig['period'] and first['period'] and sig['period'] != first['period']:
+            return True
+        if sig['key'] or sig['period']:
+            # Campos só nesta página: cabeçalho completo, típico da 1ª página
+            return not (prev['key'] or prev['period']) or sig['key'] != prev['key']
+        if sig['hash'] is not None and first['hash'] is not None:
+            # Sem campos: cabeçalho igual ao da abertura indica um novo documento
+            return bin(sig['hash'] ^ first['hash']).count('1') <= DocumentSegmenter.HASH_DISTANCE
+        return False
+
+    @staticmethod
+    def segment(path: str, ocr: bool = True, lang: str = 'por', progress_callback=None) -> list:
+        """
+        Lista de segmentos do PDF: dicts com start, end (1-based, inclusivo),
+        key (CPF/matrícula/nome, se achado) e period.
+        """
+        try:
+            signatures = DocumentSegmenter._header_signatures(path, ocr, lang, progress_callback)
+        except Exception as e:
+            print(f"Erro ao segmentar PDF: {e}")
+            return []
+        if not signatures:
+            return []
+
+        segments = []
+        first = prev = signatures[0]
+        start = 0
+        for idx in range(1, len(signatures)):
+            sig = signatures[idx]
+            if DocumentSegmenter.is_start(sig, first, prev):
+                segments.append(DocumentSegmenter._segment(start, idx - 1, first))
+                first, start = sig, idx
+            prev = sig
+        segments.append(DocumentSegmenter._segment(start, len(signatures) - 1, first))
+        return segments
+
+    @staticmethod
+    def _segment(start: int, end: int, first: dict) -> dict:
+        return {'start': start + 1, 'end': end + 1, 'key': first['key'], 'period': first['period']}
+
+    @staticmethod
+    def split(path: str, output_dir: str, segments: list, name: str = "{base}_doc_{n:03d}") -> list:
+        """
+        Grava cada segmento em um PDF próprio, lendo a origem uma única vez.
+        name aceita {base}, {n}, {start}, {end}, {key} e {period}.
+        Retorna a lista de arquivos gerados.
+        """
+        base = os.path.splitext(os.path.basename(path))[0]
+        os.makedirs(output_dir, exist_ok=True)
+        plan = PDFTools.plan(path)
+        for n, seg in enumerate(segments, 1):
+            fname = name.format(base=base, n=n, start=seg['start'], end=seg['end'],
+                                key=seg['key'] or '', period=seg['period'] or '')
+            plan.split_range(os.path.join(output_dir, PDFTools._safe_filename(fname) + ".pdf"),
+                             seg['start'], seg['end'])
+        return plan.execute()
@@ -0,0 +1,115 @@
+"""
+Strukturis Pro — Transporte de Páginas em Memória Compartilhada
+Anel de slots de tamanho fixo (multiprocessing.shared_memory) com contagem
+de referências: o renderizador escreve a página uma vez e os workers a leem
+sem cópia, recebendo pela fila apenas o identificador do slot e o shape.
+"""
+
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+
+class SharedPageRing:
+    """
+    Layout do bloco compartilhado:
+    [refcount int32 × slots][slot 0][slot 1]...[slot N-1]
+    Um slot com refcount 0 está livre.
+    """
+
+    def __init__(self, shm, slots: int, slot_bytes: int, lock, owner: bool):
+        self._shm = shm
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._lock = lock
+        self._owner = owner
+        self._refcounts = np.ndarray((slots,), dtype=np.int32, buffer=shm.buf[:slots * 4])
+        self._next = 0
+
+    @classmethod
+    def create(cls, slots: int, slot_bytes: int, lock) -> 'SharedPageRing':
+        """Cria o anel (processo principal). lock: multiprocessing.Lock compartilhado."""
+        shm = shared_memory.SharedMemory(create=True, size=slots * 4 + slots * slot_bytes)
+        ring = cls(shm, slots, slot_bytes, lock, owner=True)
+        ring._refcounts[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: tuple, lock) -> 'SharedPageRing':
+        """Conecta-se a um anel existente (workers). spec vem de ring.spec."""
+        name, slots, slot_bytes = spec
+        try:
+            # Python 3.13+: workers não registram o bloco no resource tracker
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Antes do 3.13 o attach registra o bloco como se o worker fosse
+            # dono. O registro é suprimido (o mesmo que track=False): um
+            # unregister depois do attach apagaria também o registro do dono,
+            # porque os workers herdam o resource tracker do processo principal
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, slots, slot_bytes, lock, owner=False)
+
+    @property
+    def spec(self) -> tuple:
+        return (self._shm.name, self.slots, self.slot_bytes)
+
+    def _slot_view(self, slot: int, shape, dtype):
+        offset = self.slots * 4 + slot * self.slot_bytes
+        return np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+
+    def fits(self, img) -> bool:
+        return img.nbytes <= self.slot_bytes
+
+    def put(self, img, timeout: float = 60.0) -> tuple:
+        """
+        Copia a página para um slot livre (bloqueia até haver um).
+        Retorna o handle (slot, shape, dtype) com refcount 1, a ser liberado
+        pelo consumidor com release().
+        """
+        if not self.fits(img):
+            raise ValueError(f"Página de {img.nbytes} bytes excede o slot de {self.slot_bytes} bytes")
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                for i in range(self.slots):
+                    slot = (self._next + i) % self.slots
+                    if self._refcounts[slot] == 0:
+                        self._refcounts[slot] = 1
+                        self._next = slot + 1
+                        break
+                else:
+                    slot = None
+            if slot is not None:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError("Nenhum slot livre no anel de páginas")
+            time.sleep(0.005)
+
+        self._slot_view(slot, img.shape, img.dtype)[...] = img
+        return (slot, tuple(img.shape), img.dtype.str)
+
+    def get(self, handle: tuple):
+        """View sem cópia da página (válida enquanto a referência estiver retida)."""
+        slot, shape, dtype = handle
+        return self._slot_view(slot, shape, np.dtype(dtype))
+
+    def release(self, handle: tuple):
+        with self._lock:
+            if self._refcounts[handle[0]] > 0:
+                self._refcounts[handle[0]] -= 1
+
+    def in_use(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._refcounts))
+
+    def close(self):
+        """Fecha o anel; o dono também remove o bloco compartilhado."""
+        self._refcounts = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,157 @@
+"""
+Strukturis Pro — Pré-classificação Visual de Layouts
+Impressão digital visual de uma miniatura (cor, linhas de grade, hash do
+cabeçalho) comparada com variantes conhecidas, antes de qualquer OCR.
+"""
+
+import json
+import os
+import cv2
+import numpy as np
+from core.image_processing import ImageProcessing
+
+
+class VisualClassifier:
+    """Identifica o modelo provável de uma página em milissegundos."""
+
+    STORE_PATH = os.path.join(os.path.expanduser('~'), '.strukturis', 'fingerprints.json')
+    THUMB_SIDE = 256
+    MATCH_THRESHOLD = 0.82
+    HEADER_MAX_DISTANCE = 8     # bits de 64; o cabeçalho precisa bater sozinho
+    MIN_SATURATION = 0.01       # abaixo disso a página não tem cor
+    MIN_LINE_COVERAGE = 0.05    # abaixo disso a página não tem linhas de grade
+    MAX_PER_MODEL = 12
+    HUE_BINS = 12
+    PROFILE_BINS = 16
+    HEADER_BAND = 0.20
+
+    _store = None
+
+    # ── Fingerprint ──
+    @staticmethod
+    def fingerprint(img) -> dict:
+        """Calcula a impressão digital visual de uma página (BGR ou cinza)."""
+        thumb = ImageProcessing.make_thumbnail(img, VisualClassifier.THUMB_SIDE)
+
+        # Cor: histograma de matiz dos pixels saturados (layouts blue-* x black-*)
+        if thumb.ndim == 3:
+            hsv = cv2.cvtColor(thumb, cv2.COLOR_BGR2HSV)
+            mask = ((hsv[:, :, 1] > 60) & (hsv[:, :, 2] > 50)).astype(np.uint8)
+            hist = cv2.calcHist([hsv], [0], mask, [VisualClassifier.HUE_BINS], [0, 180]).flatten()
+            saturation = float(mask.mean())
+        else:
+            hist = np.zeros(VisualClassifier.HUE_BINS, dtype=np.float32)
+            saturation = 0.0
+        total = hist.sum()
+        hist = hist / total if total > 0 else hist
+
+        # Linhas de grade: perfil de cobertura em faixas horizontais/verticais
+        horizontal, vertical = ImageProcessing.ruling_masks(thumb, scale=15)
+        h_profile = VisualClassifier._profile(np.count_nonzero(horizontal, axis=1) / horizontal.shape[1])
+        v_profile = VisualClassifier._profile(np.count_nonzero(vertical, axis=0) / vertical.shape[0])
+
+        # Cabeçalho: hash perceptual da faixa superior
+        band = thumb[:max(8, int(thumb.shape[0] * VisualClassifier.HEADER_BAND))]
+
+        return {
+            'hue': [round(float(v), 4) for v in hist],
+            'saturation': round(saturation, 4),
+            'h_lines': h_profile,
+            'v_lines': v_profile,
+            'header_hash': ImageProcessing.dhash(band),
+        }
+
+    @staticmethod
+    def _profile(values):
+        chunks = np.array_split(np.asarray(values, dtype=np.float32), VisualClassifier.PROFILE_BINS)
+        return [round(float(c.max()) if c.size else 0.0, 4) for c in chunks]
+
+    @staticmethod
+    def header_distance(a: dict, b: dict) -> int:
+        return bin(a['header_hash'] ^ b['header_hash']).count('1')
+
+    @staticmethod
+    def similarity(a: dict, b: dict) -> float:
+        """
+        Similaridade 0..1 entre duas impressões digitais. Cor e linhas só
+        contam quando ao menos uma das páginas as tem: duas páginas P&B sem
+        grade não são parecidas por isso, e o score fica só no cabeçalho.
+        """
+        total = weight = 0.0
+
+        if max(a['saturation'], b['saturation']) >= VisualClassifier.MIN_SATURATION:
+            color = float(np.minimum(a['hue'], b['hue']).sum())
+            color *= 1.0 - min(abs(a['saturation'] - b['saturation']) * 5, 1.0)
+            total += 0.30 * color
+            weight += 0.30
+
+        lines_a = np.array(a['h_lines'] + a['v_lines'])
+        lines_b = np.array(b['h_lines'] + b['v_lines'])
+        if max(lines_a.max(), lines_b.max()) >= VisualClassifier.MIN_LINE_COVERAGE:
+            total += 0.40 * (1.0 - float(np.abs(lines_a - lines_b).mean()))
+            weight += 0.40
+
+        total += 0.30 * (1.0 - VisualClassifier.header_distance(a, b) / 64)
+        weight += 0.30
+        return total / weight
+
+    # ── Store ──
+    @staticmethod
+    def _load():
+        if VisualClassifier._store is None:
+            try:
+                with open(VisualClassifier.STORE_PATH, 'r', encoding='utf-8') as f:
+                    VisualClassifier._store = json.load(f)
+            except Exception:
+                VisualClassifier._store = []
+        return VisualClassifier._store
+
+    @staticmethod
+    def _save():
+        try:
+            os.makedirs(os.path.dirname(VisualClassifier.STORE_PATH), exist_ok=True)
+            with open(VisualClassifier.STORE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(VisualClassifier._store or [], f)
+        except Exception as e:
+            print(f"Erro ao salvar impressões digitais: {e}")
+
+    @staticmethod
+    def register(model_name: str, img, label: str = None) -> bool:
+        """
+        Memoriza a impressão digital de uma página já identificada.
+        Ignora páginas idênticas a uma variante já conhecida do mesmo modelo.
+        """
+        store = VisualClassifier._load()
+        fp = VisualClassifier.fingerprint(img)
+        known = [e for e in store if e['model'] == model_name]
+        if any(VisualClassifier.similarity(fp, e['fp']) >= 0.97 for e in known):
+            return False
+        if len(known) >= VisualClassifier.MAX_PER_MODEL:
+            store.remove(known[0])
+        store.append({'model': model_name, 'label': label or model_name, 'fp': fp})
+        VisualClassifier._save()
+        return True
+
+    @staticmethod
+    def match(img):
+        """
+        Retorna (nome_do_modelo, score, rótulo) da variante mais parecida,
+        ou (None, score, None) se nenhuma passar de MATCH_THRESHOLD. Só
+        variantes com o cabeçalho próximo (HEADER_MAX_DISTANCE) concorrem.
+        O resultado é uma dica: quem usa confirma o modelo pelo texto
+        (ModelManager.auto_detect).
+        """
+        store = VisualClassifier._load()
+        if img is None or not store:
+            return None, 0.0, None
+        fp = VisualClassifier.fingerprint(img)
+        best, best_score = None, 0.0
+        for entry in store:
+            if VisualClassifier.header_distance(fp, entry['fp']) > VisualClassifier.HEADER_MAX_DISTANCE:
+                continue
+            score = VisualClassifier.similarity(fp, entry['fp'])
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < VisualClassifier.MATCH_THRESHOLD:
+            return None, best_score, None
+        return best['model'], best_score, best['label']
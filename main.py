@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 # from ui.main_window import MainWindow # Legacy
@@ -6,6 +7,8 @@ from ui.modern_main_window import ModernMainWindow
 import qtawesome as qta 
 
 if __name__ == "__main__":
+    # Required for process pools in the PyInstaller (.exe) build
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     # Modern Dark Theme Setup
@@ -0,0 +1,211 @@
+"""Autômato de palavras-chave e pontuação em passada única (core.detection)."""
+
+import random
+import re
+
+import pytest
+
+from core.detection import DetectionEngine, KeywordAutomaton
+from core.document_models import BUILTIN_MODELS
+
+
+# ── Autômato x busca ingênua ──
+
+def test_automaton_empty_text_and_no_keywords():
+    assert KeywordAutomaton(['abc']).find('') == set()
+    assert KeywordAutomaton([]).find('qualquer texto') == set()
+
+
+def test_automaton_overlaps_and_prefixes():
+    words = ['he', 'she', 'his', 'hers', 'ponto', 'cartão ponto', 'ponto mais']
+    found = KeywordAutomaton(words).find('ushers no cartão ponto mais')
+    assert found == {'he', 'she', 'hers', 'ponto', 'cartão ponto', 'ponto mais'}
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_automaton_matches_naive_search(seed):
+    rng = random.Random(seed)
+    alphabet = 'abcãç /'
+    words = {''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+             for _ in range(rng.randint(1, 30))}
+    automaton = KeywordAutomaton(sorted(words))
+    for _ in range(50):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        assert automaton.find(text) == {w for w in words if w in text}
+
+
+# ── Pontuação x detect() anterior de cada modelo ──
+# Cópia das implementações de detect() anteriores à passada única
+
+_DIAS = r'(?:Seg|Ter|Qua|Qui|Sex|Sáb|Dom)'
+_SHORT = re.compile(r'^\d{2}/\d{2}\s+(?:seg|ter|qua|qui|sex|sáb|dom)', re.IGNORECASE | re.MULTILINE)
+_FULL = re.compile(r'\d{2}/\d{2}/\d{4}\s+' + _DIAS, re.IGNORECASE)
+
+
+def _kw(text, kws):
+    t = text.lower()
+    return sum(s for kw, s in kws if kw in t)
+
+
+def _clamp(score):
+    return min(max(score, 0), 1.0)
+
+
+def _contracheque_padrao(text):
+    score = _kw(text, [('demonstrativo de pagamento', .35), ('contracheque', .35),
+                       ('holerite', .30), ('salário base', .15), ('total de vencimentos', .15),
+                       ('fgts', .08), ('inss', .08), ('vencimentos', .08), ('descontos', .08)])
+    if re.search(r'\b\d{2}/\d{4}\b', text):
+        score += 0.05
+    if text.count('|') > 5:
+        score -= 0.20
+    return _clamp(score)
+
+
+def _contracheque_belshop(text):
+    score = 0.30 if text.count('|') > 5 else 0.0
+    score += _kw(text, [('contracheque', .20), ('holerite', .20), ('total de vencimentos', .15),
+                        ('base/outros', .20), ('mensalista', .15)])
+    if text.count('|') < 3:
+        score -= 0.40
+    return _clamp(score)
+
+
+def _contracheque_jan(text):
+    score = _kw(text, [('contracheque', .20), ('holerite', .20), ('salário base', .10),
+                       ('total de vencimentos', .10)])
+    if re.search(r'\b(JAN|FEV|MAR|ABR|MAI|JUN|JUL|AGO|SET|OUT|NOV|DEZ)/\d{4}\b', text):
+        score += 0.35
+    if text.count('|') > 5:
+        score -= 0.20
+    return _clamp(score)
+
+
+def _cartao_horizontal(text):
+    score = _kw(text, [('cartão ponto', .30), ('cartao ponto', .30), ('espelho de ponto', .30),
+                       ('horário de trabalho', .15), ('banco de horas', .10), ('empregado:', .08),
+                       ('período:', .08), ('função:', .08)])
+    dates = _FULL.findall(text)
+    if len(dates) > 5:
+        score += 0.30
+    if len(_SHORT.findall(text)) > len(dates):
+        score -= 0.15
+    return _clamp(score)
+
+
+def _cartao_curta(text):
+    score = _kw(text, [('cartão ponto', .25), ('cartao ponto', .25), ('espelho de ponto', .25)])
+    short = _SHORT.findall(text)
+    if len(short) > 5:
+        score += 0.35
+    if re.search(r'\d{2}/\d{2}/\d{4}\s+[àa]\s+\d{2}/\d{2}/\d{4}', text):
+        score += 0.15
+    if len(_FULL.findall(text)) > len(short):
+        score -= 0.20
+    return _clamp(score)
+
+
+def _cartao_pontomais(text):
+    t = text.lower()
+    score = 0.40 if 'pontomais' in t or 'ponto mais' in t else 0.0
+    if len(re.findall(_DIAS + r',?\s*\d{2}/\d{2}/\d{4}', text, re.IGNORECASE)) > 5:
+        score += 0.35
+    if 'cartão' in t or 'ponto' in t:
+        score += 0.10
+    return _clamp(score)
+
+
+def _nota_fiscal(text):
+    return min(_kw(text, [('nota fiscal', .30), ('danfe', .35), ('nf-e', .30), ('chave de acesso', .20),
+                          ('icms', .10), ('destinatário', .10), ('emitente', .10), ('cfop', .10),
+                          ('natureza da operação', .10)]), 1.0)
+
+
+def _nfse(text):
+    return min(_kw(text, [('nfs-e', .35), ('nota fiscal de serviço', .35), ('prestador', .15),
+                          ('tomador', .15), ('iss', .10), ('issqn', .15)]), 1.0)
+
+
+def _boleto(text):
+    score = _kw(text, [('boleto', .30), ('linha digitável', .25), ('beneficiário', .15),
+                       ('sacado', .15), ('nosso número', .15), ('cedente', .15)])
+    if re.search(r'\d{5}\.\d{5}\s+\d{5}\.\d{6}\s+\d{5}\.\d{6}\s+\d\s+\d{14}', text):
+        score += 0.30
+    return min(score, 1.0)
+
+
+def _recibo(text):
+    return min(_kw(text, [('recibo', .35), ('recebi de', .25), ('importância de', .20),
+                          ('quitação', .15), ('para devida comprovação', .20)]), 1.0)
+
+
+def _extrato(text):
+    return min(_kw(text, [('extrato', .25), ('saldo anterior', .25), ('saldo final', .20),
+                          ('conta corrente', .15), ('lançamentos', .10), ('movimentação', .10)]), 1.0)
+
+
+def _contrato(text):
+    return min(_kw(text, [('contrato', .25), ('contratante', .20), ('contratado', .20),
+                          ('cláusula', .20), ('vigência', .10), ('testemunhas', .10)]), 1.0)
+
+
+LEGACY = {
+    'ContrachequeDefaultModel': _contracheque_padrao,
+    'ContrachequeBelshopModel': _contracheque_belshop,
+    'ContrachequeJanModel': _contracheque_jan,
+    'CartaoPontoHorizontalModel': _cartao_horizontal,
+    'CartaoPontoCurtaModel': _cartao_curta,
+    'CartaoPontoPontoMaisModel': _cartao_pontomais,
+    'NotaFiscalModel': _nota_fiscal,
+    'NFSeModel': _nfse,
+    'BoletoModel': _boleto,
+    'ReciboModel': _recibo,
+    'ExtratoBancarioModel': _extrato,
+    'ContratoModel': _contrato,
+}
+
+_FRAGMENTS = [
+    'Demonstrativo de Pagamento', 'CONTRACHEQUE', 'Holerite', 'Salário Base', 'TOTAL DE VENCIMENTOS',
+    'FGTS', 'INSS', 'Descontos', 'Base/Outros', 'Mensalista', '03/2024', 'MAR/2025', '| 001 | SALARIO |',
+    'Cartão Ponto', 'cartao ponto', 'Espelho de Ponto', 'Horário de Trabalho', 'Banco de Horas',
+    'Empregado:', 'Período:', 'Função:', '01/03/2024 Seg 08:00 12:00', '\n02/03 ter 08:00 17:00',
+    'Qua, 03/04/2024 08:00', '01/03/2024 a 31/03/2024', 'PontoMais', 'ponto mais',
+    'Nota Fiscal', 'DANFE', 'NF-e', 'Chave de Acesso', 'ICMS', 'Destinatário', 'Emitente', 'CFOP',
+    'Natureza da Operação', 'NFS-e', 'Nota Fiscal de Serviço', 'Prestador', 'Tomador', 'ISSQN',
+    'Boleto', 'Linha Digitável', 'Beneficiário', 'Sacado', 'Nosso Número', 'Cedente',
+    '23790.12345 60000.000003 00000.000009 1 96120000010000',
+    'RECIBO', 'Recebi de', 'importância de', 'quitação', 'para devida comprovação',
+    'Extrato', 'Saldo Anterior', 'Saldo Final', 'Conta Corrente', 'Lançamentos', 'Movimentação',
+    'Contrato', 'Contratante', 'Contratado', 'Cláusula', 'Vigência', 'Testemunhas', 'texto livre',
+]
+
+
+def _random_texts(n=300, seed=7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        parts = [rng.choice(_FRAGMENTS) for _ in range(rng.randint(0, 25))]
+        yield rng.choice([' ', '\n']).join(parts)
+
+
+def test_every_builtin_model_has_a_reference():
+    assert {m.__name__ for m in BUILTIN_MODELS} <= set(LEGACY)
+
+
+@pytest.mark.parametrize('text', list(_random_texts()))
+def test_scores_and_ranking_match_previous_detect(text):
+    ranked = DetectionEngine.rank(text, BUILTIN_MODELS)
+    for model, score in ranked:
+        assert score == pytest.approx(LEGACY[model.__name__](text)), model.__name__
+        assert model.detect(text) == pytest.approx(score)
+
+    # Mesmo vencedor que o laço antigo (primeiro com o maior score > 0)
+    best_new, best_old = None, 0.0
+    for model, score in ranked:
+        if score > best_old:
+            best_new, best_old = model, score
+    best_ref, best_ref_score = None, 0.0
+    for model in BUILTIN_MODELS:
+        score = LEGACY[model.__name__](text)
+        if score > best_ref_score:
+            best_ref, best_ref_score = model, score
+    assert best_new is best_ref
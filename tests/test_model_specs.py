@@ -0,0 +1,81 @@
+"""Modelos declarativos: carga do spec, máquina de estados e pickle (core.model_specs)."""
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from core.document_models import ModelManager
+from core.model_specs import ModelSpecs, SpecModel
+
+SPEC_PATH = os.path.join(ModelSpecs.BUNDLED_DIR, 'cartao_ponto_cocacola.json')
+
+TEXT = """ESPELHO DE PONTO
+Funcionário: JOSE DA SILVA Matrícula: 1234
+Período: 01/03/2024 a 31/03/2024
+01/03 - Sex 08:00 12:00 13:00 17:00
+02/03 - Sáb FOLGA
+03/03 - Dom Folga
+04/03 - Seg 08:01 12:00 13:02 17:05
+05/03 - Ter 08:00 12:00
+06/03 - Qua 07:58 12:00 13:00 17:00
+Total de horas 32:06"""
+
+
+@pytest.fixture(scope='module')
+def model():
+    return ModelSpecs.build(ModelSpecs.read(SPEC_PATH), SPEC_PATH)
+
+
+def test_build_is_cached_per_spec(model):
+    assert issubclass(model, SpecModel)
+    assert model.NAME == "Cartão Ponto — Coca-Cola"
+    assert ModelSpecs.build(ModelSpecs.read(SPEC_PATH), SPEC_PATH) is model
+
+
+def test_bundled_spec_is_loaded_and_detected(model):
+    ModelManager.reload_specs(force=True)
+    assert model in ModelManager.get_all_models()
+    detected, score = ModelManager.auto_detect(TEXT)
+    assert detected is model
+    assert score >= 0.7
+
+
+def test_fields_and_records(model):
+    data = model.extract(TEXT)
+    assert data['tipo_documento'] == "Cartão Ponto (Coca-Cola)"
+    assert data['funcionario'] == 'JOSE DA SILVA'
+    assert (data['periodo_inicio'], data['periodo_fim']) == ('01/03/2024', '31/03/2024')
+
+    rows = data['registros']
+    assert [r['data'] for r in rows] == ['01/03', '02/03', '03/03', '04/03', '05/03', '06/03']
+    assert [r['status'] for r in rows] == ['Normal', 'Folga', 'Folga', 'Normal', 'Normal', 'Normal']
+    assert (rows[0]['entrada1'], rows[0]['saida1'], rows[0]['entrada2'], rows[0]['saida2']) == \
+        ('08:00', '12:00', '13:00', '17:00')
+    assert rows[1]['entrada1'] == ''
+    assert (rows[4]['entrada2'], rows[4]['saida2']) == ('', '')
+    assert model.is_complete(data)
+    assert len(model.to_dataframe(data)) == 6
+
+
+def test_pickle_round_trip_keeps_identity(model):
+    assert pickle.loads(pickle.dumps(model)) is model
+    result = {'model': model, 'data': model.extract(TEXT)}
+    assert pickle.loads(pickle.dumps(result))['model'] is model
+
+
+def _extract_in_worker(model, text):
+    return model, model.extract(text)
+
+
+def test_model_crosses_process_pool(model):
+    # O que os workers de PagePipeline.process_document fazem: recebem e
+    # devolvem a classe gerada dentro dos resultados. Com spawn o worker não
+    # herda a classe: ela chega só pelo pickle (copyreg) e é recompilada
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        returned, data = pool.submit(_extract_in_worker, model, TEXT).result()
+    assert returned is model
+    assert data == model.extract(TEXT)
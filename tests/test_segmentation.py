@@ -0,0 +1,71 @@
+"""Assinatura do cabeçalho e decisão de início de documento (DocumentSegmenter)."""
+
+import pytest
+from core.segmentation import DocumentSegmenter
+
+
+def sig(text):
+    return DocumentSegmenter.page_signature(text)
+
+
+@pytest.mark.parametrize('text, key', [
+    ("Nome: JOÃO DA SILVA  Competência: 03/2024", 'JOÃO DA SILVA'),
+    ("Nome: JOÃO DA SILVA Competência: 03/2024", 'JOÃO DA SILVA'),
+    ("NOME DO FUNCIONÁRIO: JOSE CARLOS", 'JOSE CARLOS'),
+    ("Nome do Empregado: Ana Paula Lima", 'ANA PAULA LIMA'),
+    ("Funcionário: maria souza", 'MARIA SOUZA'),
+    ("Empregado: 123-JOSE", '123-JOSE'),
+    ("Colaborador: PEDRO ALVES   Cargo: MOTORISTA", 'PEDRO ALVES'),
+])
+def test_key_from_name_label(text, key):
+    assert sig(text)['key'] == key
+
+
+@pytest.mark.parametrize('text', [
+    "Nome do funcionário em branco",
+    "Sobrenome: SILVA",
+    "Nome:  Cargo: MOTORISTA",
+])
+def test_no_key_without_value(text):
+    assert sig(text)['key'] is None
+
+
+def test_cpf_and_matricula_win_over_name():
+    assert sig("Nome: JOSE CARLOS  CPF: 123.456.789-09")['key'] == '123.456.789-09'
+    assert sig("Nome: JOSE CARLOS  Matrícula: 4521")['key'] == '4521'
+
+
+@pytest.mark.parametrize('text, period', [
+    ("Emissão: 15/03/2024  Competência: 02/2024", '02/2024'),
+    ("Período: 01/03/2024 a 31/03/2024", '03/2024'),
+    ("Referência: março de 2024", 'mar/2024'),
+    ("Emitido em 05/04/2024 — folha de 03/2024", '03/2024'),
+    ("Emitido em 05/04/2024", None),
+])
+def test_period(text, period):
+    assert sig(text)['period'] == period
+
+
+def test_different_employees_same_period_split():
+    first = sig("NOME DO FUNCIONÁRIO: JOSE CARLOS  Competência: 03/2024")
+    other = sig("NOME DO FUNCIONÁRIO: MARIA SOUZA  Competência: 03/2024")
+    assert DocumentSegmenter.is_start(other, first, first)
+
+
+def test_same_employee_layout_change_does_not_split():
+    first = sig("Nome: JOÃO DA SILVA  Competência: 03/2024")
+    again = sig("Nome: JOÃO DA SILVA Competência: 03/2024")
+    assert not DocumentSegmenter.is_start(again, first, first)
+
+
+def test_same_employee_new_period_splits():
+    first = sig("Funcionário: maria souza  Competência: 03/2024")
+    nxt = sig("Funcionário: MARIA SOUZA  Competência: 04/2024")
+    assert DocumentSegmenter.is_start(nxt, first, first)
+
+
+def test_sheet_number_decides():
+    first = sig("Funcionário: maria souza  Folha 1 de 2")
+    cont = sig("Funcionário: maria souza  Folha 2 de 2")
+    assert not DocumentSegmenter.is_start(cont, first, first)
+    assert DocumentSegmenter.is_start(sig("Folha 1 de 3"), first, cont)
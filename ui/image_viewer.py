@@ -1,7 +1,87 @@
-from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
-from PySide6.QtCore import Qt, Signal
+from collections import OrderedDict
+from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem, QStyleOptionGraphicsItem
+from PySide6.QtCore import Qt, Signal, QRectF
 from PySide6.QtGui import QPixmap, QImage, QPainter, QWheelEvent
 import cv2
+import numpy as np
+
+
+class TiledImageItem(QGraphicsItem):
+    """
+    Image item backed by a resolution pyramid split into tiles.
+    Only tiles intersecting the exposed area are converted/uploaded, from the
+    pyramid level matching the current zoom. Item coordinates are always
+    full-resolution pixels.
+    """
+
+    TILE = 512
+    MIN_LEVEL_SIDE = 512
+    MAX_CACHED_TILES = 96  # ~96 MB worst case (512x512 RGB32)
+
+    def __init__(self, cv_image):
+        super().__init__()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.height, self.width = cv_image.shape[:2]
+
+        # Level 0 is the original; each next level halves the resolution
+        self.levels = [cv_image]
+        while max(self.levels[-1].shape[:2]) > self.MIN_LEVEL_SIDE:
+            prev = self.levels[-1]
+            size = (max(1, prev.shape[1] // 2), max(1, prev.shape[0] // 2))
+            self.levels.append(cv2.resize(prev, size, interpolation=cv2.INTER_AREA))
+
+        self._tiles = OrderedDict()
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.width, self.height)
+
+    def _level_for(self, lod):
+        """Coarsest level that still has at least one source pixel per screen pixel."""
+        level = 0
+        while level + 1 < len(self.levels) and 1 / 2 ** (level + 1) >= lod:
+            level += 1
+        return level
+
+    def _tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+
+        img = self.levels[level]
+        block = np.ascontiguousarray(img[ty * self.TILE:(ty + 1) * self.TILE, tx * self.TILE:(tx + 1) * self.TILE])
+        h, w = block.shape[:2]
+        if block.ndim == 2:
+            q_img = QImage(block.data, w, h, w, QImage.Format_Grayscale8)
+        else:
+            q_img = QImage(block.data, w, h, 3 * w, QImage.Format_RGB888).rgbSwapped()
+        pixmap = QPixmap.fromImage(q_img)
+
+        self._tiles[key] = pixmap
+        while len(self._tiles) > self.MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+        return pixmap
+
+    def paint(self, painter, option, widget=None):
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self._level_for(lod)
+        lh, lw = self.levels[level].shape[:2]
+        sx, sy = self.width / lw, self.height / lh  # full-res pixels per level pixel
+
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        if exposed.isEmpty():
+            return
+        tx0, tx1 = int(exposed.left() / sx) // self.TILE, int(min(exposed.right() / sx, lw - 1)) // self.TILE
+        ty0, ty1 = int(exposed.top() / sy) // self.TILE, int(min(exposed.bottom() / sy, lh - 1)) // self.TILE
+
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                pixmap = self._tile(level, tx, ty)
+                target = QRectF(tx * self.TILE * sx, ty * self.TILE * sy,
+                                pixmap.width() * sx, pixmap.height() * sy)
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
 
 class ImageViewer(QGraphicsView):
     def __init__(self, parent=None):
@@ -29,20 +109,10 @@ class ImageViewer(QGraphicsView):
         self.crop_rect_item = None
         self.image_item = None
 
-        # Handle Grayscale vs Color
-        if len(cv_image.shape) == 2:
-            height, width = cv_image.shape
-            bytes_per_line = width
-            q_img = QImage(cv_image.data, width, height, bytes_per_line, QImage.Format_Grayscale8)
-        else:
-            height, width, channel = cv_image.shape
-            bytes_per_line = 3 * width
-            q_img = QImage(cv_image.data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
-        
-        pixmap = QPixmap.fromImage(q_img)
-        
-        self.item = QGraphicsPixmapItem(pixmap)
+        # Tiled pyramid: only visible tiles at the current zoom get uploaded
+        self.item = TiledImageItem(cv_image)
         self.scene.addItem(self.item)
+        self.scene.setSceneRect(self.item.boundingRect())
         self.fitInView(self.item, Qt.KeepAspectRatio)
 
     def wheelEvent(self, event: QWheelEvent):
@@ -106,15 +176,12 @@ class ImageViewer(QGraphicsView):
         # Check integrity
         if r.width() < 5 or r.height() < 5: return None
         
-        # Map scene coords to item coords is usually 1:1 if item is at 0,0 and not scaled independent of scene
-        # But image item might be transformed? Usually QGraphicsPixmapItem is just added.
-        # Let's map rect to item local coords just in case.
-        
-        # Simple assumption: Item is at 0,0.
+        # The tiled item sits at 0,0 and its coordinates are full-resolution
+        # pixels regardless of the pyramid level being displayed.
         # Need to clamp to image bounds
         
-        img_w = self.item.pixmap().width()
-        img_h = self.item.pixmap().height()
+        img_w = self.item.width
+        img_h = self.item.height
         
         x = max(0, int(r.x()))
         y = max(0, int(r.y()))
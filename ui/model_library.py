@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QColor
 import qtawesome as qta
-from core.document_models import ALL_MODELS, CATEGORIES
+from core.document_models import ModelManager
 
 
 class ModelCard(QFrame):
@@ -159,10 +159,10 @@ class ModelLibraryDialog(QDialog):
         layout.addWidget(tabs, 1)
 
         # "Todos" tab
-        self._add_category_tab(tabs, "Todos", ALL_MODELS, detected_model, confidence)
+        self._add_category_tab(tabs, "Todos", ModelManager.get_all_models(), detected_model, confidence)
 
         # Category tabs
-        for cat_name, models in CATEGORIES.items():
+        for cat_name, models in ModelManager.get_categories().items():
             self._add_category_tab(tabs, cat_name, models, detected_model, confidence)
 
         # Footer
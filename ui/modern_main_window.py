@@ -1,7 +1,7 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
                                QListWidget, QPushButton, QLabel, QFrame, QSplitter,
                                QTabWidget, QToolBox, QScrollArea, QSlider, QSpinBox, QGroupBox, QLineEdit, QApplication, QMessageBox, QFileDialog, QInputDialog, QComboBox, QProgressBar, QDialog, QDialogButtonBox, QCheckBox, QRadioButton, QButtonGroup)
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QFileSystemWatcher
 from PySide6.QtGui import QIcon, QFont, QAction
 import qtawesome as qta
 import json
@@ -12,9 +12,16 @@ from core.ocr_manager import OCRManager
 from core.file_handler import FileHandler
 from core.smart_parser import SmartParser
 from core.data_parser import Exporter, DataParser
-from core.document_models import ModelManager, ALL_MODELS
+from core.document_models import ModelManager
 from core.pdf_tools import PDFTools
+from core.page_pipeline import PagePipeline
+from core.visual_classifier import VisualClassifier
+from core.page_store import PageCache
+from core.segmentation import DocumentSegmenter
+from core.page_index import PageIndex
+from core.model_specs import ModelSpecs
 from ui.model_library import ModelLibraryDialog
+from ui.thumbnail_strip import ThumbnailStrip
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -41,8 +48,9 @@ class PDFSplitDialog(QDialog):
         self.radio_range.setChecked(True)
         self.radio_each = QRadioButton("Dividir cada página individualmente")
         self.radio_extract = QRadioButton("Extrair páginas específicas")
+        self.radio_segment = QRadioButton("Separar por documento (detecção automática)")
 
-        for r in [self.radio_range, self.radio_each, self.radio_extract]:
+        for r in [self.radio_range, self.radio_each, self.radio_extract, self.radio_segment]:
             r.setStyleSheet("color: white; padding: 4px;")
             layout.addWidget(r)
 
@@ -74,10 +82,27 @@ class PDFSplitDialog(QDialog):
         self.extract_widget.setVisible(False)
         layout.addWidget(self.extract_widget)
 
+        # Split-each options: file name template (extracted fields) and compression
+        self.each_widget = QWidget()
+        nbox = QVBoxLayout(self.each_widget)
+        nbox.setContentsMargins(0, 0, 0, 0)
+        nbox.addWidget(QLabel("Nome dos arquivos:"))
+        self.txt_name_template = QLineEdit(PDFTools.SPLIT_NAME)
+        self.txt_name_template.setToolTip("Campos: {base}, {pagina} e campos extraídos no lote, ex.: {funcionario}, {mes_ano}")
+        self.txt_name_template.setStyleSheet("background: #1e1e1e; color: white; border: 1px solid #555; padding: 4px;")
+        nbox.addWidget(self.txt_name_template)
+        self.chk_compress = QCheckBox("Compactar arquivos (garbage/deflate)")
+        self.chk_compress.setStyleSheet("color: white;")
+        nbox.addWidget(self.chk_compress)
+        self.each_widget.setVisible(False)
+        layout.addWidget(self.each_widget)
+
         # Toggle visibility
         self.radio_range.toggled.connect(lambda c: self.range_widget.setVisible(c))
+        self.radio_each.toggled.connect(lambda c: self.each_widget.setVisible(c))
         self.radio_each.toggled.connect(lambda c: (self.range_widget.setVisible(False), self.extract_widget.setVisible(False)) if c else None)
         self.radio_extract.toggled.connect(lambda c: (self.extract_widget.setVisible(c), self.range_widget.setVisible(False)) if c else None)
+        self.radio_segment.toggled.connect(lambda c: (self.range_widget.setVisible(False), self.extract_widget.setVisible(False)) if c else None)
 
         # Buttons
         btns = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -91,6 +116,8 @@ class PDFSplitDialog(QDialog):
             return 'range'
         elif self.radio_each.isChecked():
             return 'each'
+        elif self.radio_segment.isChecked():
+            return 'segment'
         else:
             return 'extract'
 
@@ -147,10 +174,17 @@ class ExportDialog(QDialog):
         self.btn_txt.setStyleSheet(btn_style)
         self.btn_txt.clicked.connect(lambda: self.done(4))
 
+        self.btn_searchable = QPushButton("  PDF Pesquisável — Camada de texto sobre a imagem original")
+        self.btn_searchable.setIcon(qta.icon('fa5s.search', color='#4ec9b0'))
+        self.btn_searchable.setIconSize(QSize(24, 24))
+        self.btn_searchable.setStyleSheet(btn_style)
+        self.btn_searchable.clicked.connect(lambda: self.done(5))
+
         layout.addWidget(self.btn_excel)
         layout.addWidget(self.btn_csv)
         layout.addWidget(self.btn_pdf)
         layout.addWidget(self.btn_txt)
+        layout.addWidget(self.btn_searchable)
 
         # Cancel
         btn_cancel = QPushButton("Cancelar")
@@ -334,7 +368,7 @@ class PropertiesPanel(QWidget):
 
         self.combo_model = QComboBox()
         self.combo_model.addItem("Auto-Detectar")
-        for m in ALL_MODELS:
+        for m in ModelManager.get_all_models():
             self.combo_model.addItem(m.NAME)
         self.combo_model.setStyleSheet("background: #1e1e1e; color: white; border: 1px solid #555; border-radius: 4px; padding: 6px;")
         vbox_m.addWidget(self.combo_model)
@@ -473,6 +507,12 @@ class PropertiesPanel(QWidget):
         self.txt_pages.setStyleSheet("background: #1e1e1e; color: white; border: 1px solid #555; border-radius: 4px; padding: 6px;")
         hbox_p.addWidget(self.txt_pages)
         vbox_p.addLayout(hbox_p)
+
+        self.btn_batch = QPushButton(" Processar Páginas (Lote)")
+        self.btn_batch.setIcon(qta.icon('fa5s.layer-group', color='white'))
+        self.btn_batch.setToolTip("Extrai todas as páginas do filtro (vazio = todas), ignorando páginas em branco")
+        self.btn_batch.setStyleSheet(btn_style)
+        vbox_p.addWidget(self.btn_batch)
         grp_pages.setLayout(vbox_p)
         layout.addWidget(grp_pages)
 
@@ -485,6 +525,11 @@ class PropertiesPanel(QWidget):
         self.btn_bw.setCheckable(True)
         self.btn_bw.setStyleSheet(btn_style)
         vbox_f.addWidget(self.btn_bw)
+        self.chk_remove_lines = QCheckBox("Remover linhas de tabela antes do OCR")
+        self.chk_remove_lines.setToolTip("Apaga as linhas de grade (mais rápido e sem '|' espúrios). "
+                                         "Desmarcado: decide pelo modelo.")
+        self.chk_remove_lines.setStyleSheet("color: #ccc; padding: 4px;")
+        vbox_f.addWidget(self.chk_remove_lines)
         grp_filter.setLayout(vbox_f)
         layout.addWidget(grp_filter)
 
@@ -501,8 +546,18 @@ class PropertiesPanel(QWidget):
         self.btn_merge_pdf.setIcon(qta.icon('fa5s.object-group', color='#55aaff'))
         self.btn_merge_pdf.setStyleSheet(btn_style)
 
+        self.btn_optimize_pdf = QPushButton(" Otimizar PDFs")
+        self.btn_optimize_pdf.setIcon(qta.icon('fa5s.compress-arrows-alt', color='#6a9955'))
+        self.btn_optimize_pdf.setStyleSheet(btn_style)
+
         vbox_pdf.addWidget(self.btn_split_pdf)
         vbox_pdf.addWidget(self.btn_merge_pdf)
+        self.btn_auto_rotate = QPushButton(" Auto-Rotacionar Páginas")
+        self.btn_auto_rotate.setIcon(qta.icon('fa5s.sync-alt', color='#c586c0'))
+        self.btn_auto_rotate.setStyleSheet(btn_style)
+
+        vbox_pdf.addWidget(self.btn_optimize_pdf)
+        vbox_pdf.addWidget(self.btn_auto_rotate)
         grp_pdf.setLayout(vbox_pdf)
         layout.addWidget(grp_pdf)
 
@@ -630,6 +685,11 @@ class ModernMainWindow(QMainWindow):
         self.viewer.setStyleSheet("background-color: #1e1e1e; border: none;")
         center_layout.addWidget(self.viewer, 1)
 
+        # Thumbnail strip (PDF navigation)
+        self.thumb_strip = ThumbnailStrip()
+        self.thumb_strip.setVisible(False)
+        center_layout.addWidget(self.thumb_strip)
+
         # Status Bar
         self.status_bar = QFrame()
         self.status_bar.setStyleSheet("background-color: #007acc; padding: 2px 10px;")
@@ -674,9 +734,11 @@ class ModernMainWindow(QMainWindow):
         self.props_panel.btn_prev_page.clicked.connect(lambda: self.navigate_page(-1))
         self.props_panel.btn_next_page.clicked.connect(lambda: self.navigate_page(1))
         self.props_panel.btn_goto_page.clicked.connect(self.jump_to_page)
+        self.thumb_strip.page_selected.connect(self.on_thumbnail_selected)
 
         # Process
         self.props_panel.btn_process.clicked.connect(self.manual_process_trigger)
+        self.props_panel.btn_batch.clicked.connect(self.batch_process_pages)
 
         # Selection/Crop
         self.props_panel.btn_toggle_sel.clicked.connect(self.toggle_selection_mode)
@@ -698,6 +760,8 @@ class ModernMainWindow(QMainWindow):
         # PDF Tools
         self.props_panel.btn_split_pdf.clicked.connect(self.split_pdf)
         self.props_panel.btn_merge_pdf.clicked.connect(self.merge_pdfs)
+        self.props_panel.btn_optimize_pdf.clicked.connect(self.optimize_pdfs)
+        self.props_panel.btn_auto_rotate.clicked.connect(self.auto_rotate_pdf)
 
         # Model change
         self.props_panel.combo_model.currentTextChanged.connect(self.on_model_changed)
@@ -706,6 +770,12 @@ class ModernMainWindow(QMainWindow):
         self.props_panel.btn_model_library.clicked.connect(self.open_model_library)
         self.props_panel.btn_apply_detected.clicked.connect(self.apply_detected_model)
 
+        # Declarative models: reload when a spec file is added or edited
+        self.spec_watcher = QFileSystemWatcher(self)
+        self.spec_watcher.directoryChanged.connect(self.reload_model_specs)
+        self.spec_watcher.fileChanged.connect(self.reload_model_specs)
+        self._watch_model_specs()
+
         # Drag & Drop
         self.setAcceptDrops(True)
 
@@ -715,11 +785,17 @@ class ModernMainWindow(QMainWindow):
         self.total_pages = 0
         self.current_img = None
         self.original_img = None
+        self.current_page_blank = False
+        self.current_quality = None
+        self._quality_img = None
+        self.page_cache = PageCache()
         self._detected_model = None
         self._detected_confidence = 0.0
         self.current_df = pd.DataFrame()
         self.current_text = ""
         self.current_model_data = {}
+        self.batch_fields = {}
+        self.batch_fields_path = None
 
     # ── Status ──
     def set_status(self, msg, doc_info=""):
@@ -745,23 +821,36 @@ class ModernMainWindow(QMainWindow):
         else:
             self.run_ocr_and_update("Processando página completa...")
 
-    def run_ocr_and_update(self, status_msg="Processando..."):
+    def run_ocr_and_update(self, status_msg="Processando...", check_blank=True):
+        # An explicit selection is always read: a faint stamp or total may look blank
+        if check_blank and PagePipeline.is_blank(self.current_img):
+            self.current_text = ""
+            self.current_df = pd.DataFrame()
+            self.current_model_data = {}
+            self.props_panel.txt_output.setText("Página em branco — OCR e extração ignorados.\n"
+                                                "Para ler uma marca fraca (carimbo, total), selecione a área "
+                                                "com a Ferramenta de Seleção: áreas selecionadas são sempre lidas.")
+            self.set_status("Página em branco ignorada — selecione uma área para forçar a leitura")
+            return
+
         self.props_panel.txt_output.setText(status_msg)
         self.set_status("Processando OCR...")
         self.progress.setVisible(True)
         QApplication.processEvents()
 
-        text = OCRManager.extract_text(self.current_img, lang='por')
+        # Apply document model
+        model_name = self.props_panel.combo_model.currentText()
+        remove_lines = True if self.props_panel.chk_remove_lines.isChecked() else None
+        page = PagePipeline.process_page(self.current_img, model_name, lang='por', skip_blank=False,
+                                         remove_lines=remove_lines, quality=self._page_quality())
+        text = page['text']
+        model, model_data, model_df = page['model'], page['data'], page['df']
         self.current_text = text
 
         entities = SmartParser.extract_entities(text)
         df = SmartParser.preview_structure(text)
         self.current_df = df
 
-        # Apply document model
-        model_name = self.props_panel.combo_model.currentText()
-        model, model_data, model_df = ModelManager.process(text, model_name)
-
         if model and model_data:
             self.current_model_data = model_data
             if not model_df.empty:
@@ -774,6 +863,13 @@ class ModernMainWindow(QMainWindow):
             # Rich HTML model output
             self.props_panel.txt_model_output.setHtml(self._render_model_html(model, model_data))
 
+            # Learn this layout so the next page/file is recognized before OCR
+            if PagePipeline.has_data(model_data) and self.original_img is not None:
+                try:
+                    VisualClassifier.register(model.NAME, self.original_img)
+                except Exception:
+                    pass
+
         self.display_results(text, entities, self.current_df)
         self.progress.setVisible(False)
         self.set_status("Extração completa", f"{len(text)} caracteres extraídos")
@@ -794,8 +890,13 @@ class ModernMainWindow(QMainWindow):
         if 0 <= target < self.total_pages:
             self.load_page(target)
 
+    def on_thumbnail_selected(self, page_idx):
+        if self.current_file_path and page_idx != self.current_page_idx:
+            self.load_page(page_idx)
+
     def load_page(self, page_idx):
         self.current_page_idx = page_idx
+        self.thumb_strip.set_current(page_idx)
         self.props_panel.lbl_page_info.setText(f"Página {self.current_page_idx + 1} / {self.total_pages}")
         self.props_panel.btn_prev_page.setEnabled(self.current_page_idx > 0)
         self.props_panel.btn_next_page.setEnabled(self.current_page_idx < self.total_pages - 1)
@@ -804,18 +905,41 @@ class ModernMainWindow(QMainWindow):
         self.props_panel.spin_page.setValue(self.current_page_idx + 1)
         self.props_panel.spin_page.blockSignals(False)
 
-        if self.current_file_path.lower().endswith('.pdf'):
-            img = ImageProcessing.load_pdf_as_image(self.current_file_path, self.current_page_idx)
+        # Revisited pages come from the packed cache (no re-render / re-triage)
+        cache_key = (self.current_file_path, page_idx)
+        cached = self.page_cache.get(cache_key)
+        if cached is not None:
+            img, meta = cached
+            self.current_page_blank, quality = meta['blank'], meta['quality']
         else:
-            img = ImageProcessing.load_image(self.current_file_path)
+            if self.current_file_path.lower().endswith('.pdf'):
+                img = ImageProcessing.load_pdf_as_image(self.current_file_path, self.current_page_idx)
+            else:
+                img = ImageProcessing.load_image(self.current_file_path)
+
+            if img is not None:
+                self.current_page_blank = PagePipeline.is_blank(img)
+                quality = None
+                if not self.current_page_blank:
+                    # Triage: only confidently skewed pages pay for the rotation,
+                    # by the angle already measured
+                    quality = ImageProcessing.assess_quality(img)
+                    if quality['needs_deskew']:
+                        img, _ = ImageProcessing.deskew_image(img, quality['skew'])
+                self.page_cache.put(cache_key, img, {'blank': self.current_page_blank, 'quality': quality})
 
         if img is not None:
-            img, _ = ImageProcessing.deskew_image(img)
             self.original_img = img.copy()
             self.current_img = img
+            self.current_quality, self._quality_img = quality, img
             self.viewer.set_image(self.current_img)
-            self.props_panel.txt_output.setText(f"Página {page_idx + 1} carregada. Clique em 'EXTRAIR DADOS' para processar.")
-            self.set_status(f"Página {page_idx + 1} de {self.total_pages}")
+            if self.current_page_blank:
+                self.props_panel.txt_output.setText(f"Página {page_idx + 1} em branco — será ignorada na extração.")
+                self.set_status(f"Página {page_idx + 1} de {self.total_pages} (em branco)")
+            else:
+                self.props_panel.txt_output.setText(f"Página {page_idx + 1} carregada. Clique em 'EXTRAIR DADOS' para processar.")
+                quality_lbl = "boa" if quality['route'] == 'fast' else "baixa (pré-processamento reforçado)"
+                self.set_status(f"Página {page_idx + 1} de {self.total_pages} — qualidade {quality_lbl}")
 
             self.props_panel.slider_rot.blockSignals(True)
             self.props_panel.slider_rot.setValue(0)
@@ -833,6 +957,17 @@ class ModernMainWindow(QMainWindow):
             self.props_panel.btn_toggle_sel.setText(" Ferramenta de Seleção")
             self.props_panel.btn_toggle_sel.setIcon(qta.icon('fa5s.mouse-pointer', color='white'))
 
+    def _page_quality(self):
+        """
+        Triage of the image about to be OCR'd. Crop, rotation and the BW filter
+        replace current_img, so a stale assessment is redone on the new image
+        (the page is never auto-rotated again over a manual rotation).
+        """
+        if self.current_img is not self._quality_img:
+            self.current_quality = ImageProcessing.assess_quality(self.current_img)
+            self._quality_img = self.current_img
+        return self.current_quality
+
     def perform_crop(self):
         rect = self.viewer.get_crop_rect_coords()
         if rect:
@@ -846,7 +981,7 @@ class ModernMainWindow(QMainWindow):
                 self.viewer.set_image(self.current_img)
                 self.props_panel.btn_toggle_sel.setChecked(False)
                 self.toggle_selection_mode(False)
-                self.run_ocr_and_update("Recorte aplicado. Lendo novo texto...")
+                self.run_ocr_and_update("Recorte aplicado. Lendo novo texto...", check_blank=False)
 
     def read_selection(self):
         rect = self.viewer.get_crop_rect_coords()
@@ -931,17 +1066,29 @@ class ModernMainWindow(QMainWindow):
             if ftype == 'pdf':
                 self.total_pages = ImageProcessing.get_pdf_page_count(file_path)
                 self.props_panel.grp_nav.setVisible(True)
+                self.thumb_strip.set_document(file_path, self.total_pages)
+                self.thumb_strip.setVisible(self.total_pages > 1)
                 self.load_page(0)
             elif ftype == 'image':
                 self.total_pages = 1
                 self.props_panel.grp_nav.setVisible(False)
+                self.thumb_strip.set_document(None, 0)
+                self.thumb_strip.setVisible(False)
                 self.load_page(0)
             else:
                 QMessageBox.warning(self, "Formato não suportado", f"O arquivo '{filename}' não é um formato suportado.")
                 return
 
-            # Auto-detect model on file load
-            self._auto_detect_on_load()
+            # Auto-detect model on file load: the text decides, the visual
+            # fingerprint only confirms it
+            self._auto_detect_on_load(self._visual_hint())
+
+            # Pages already seen in other files (renamed / re-merged resends)
+            if ftype == 'pdf':
+                known = PageIndex.register(file_path)
+                if known:
+                    self.set_status(f"{known} de {self.total_pages} páginas já processadas em outros arquivos "
+                                    f"— o lote reaproveitará os resultados", filename)
 
         except Exception as e:
             print(f"Erro: {e}")
@@ -949,9 +1096,33 @@ class ModernMainWindow(QMainWindow):
         finally:
             self.progress.setVisible(False)
 
-    def _auto_detect_on_load(self):
+    def _show_detected_model(self, model, score, source=""):
+        """Show the detection banner and preselect the model in the combo."""
+        self.props_panel.lbl_detect_icon.setPixmap(
+            qta.icon(model.ICON, color='#4ec9b0').pixmap(20, 20))
+        self.props_panel.lbl_detect_result.setText(
+            f"Detectado{source}: {model.NAME} ({score:.0%})")
+        self.props_panel.btn_apply_detected.setVisible(True)
+        self.props_panel.auto_detect_banner.setVisible(True)
+        self.props_panel.combo_model.blockSignals(True)
+        idx = self.props_panel.combo_model.findText(model.NAME)
+        if idx >= 0:
+            self.props_panel.combo_model.setCurrentIndex(idx)
+        self.props_panel.combo_model.blockSignals(False)
+
+    def _visual_hint(self):
+        """Model suggested by the layout fingerprint (no OCR); a hint only."""
+        if self.current_img is None or self.current_page_blank:
+            return None
+        try:
+            name, _, _ = VisualClassifier.match(self.current_img)
+            return ModelManager.get_model_by_name(name) if name else None
+        except Exception:
+            return None
+
+    def _auto_detect_on_load(self, hint=None):
         """Quick OCR on first page to auto-detect document model."""
-        if self.current_img is None:
+        if self.current_img is None or self.current_page_blank:
             return
         try:
             text = OCRManager.extract_text(self.current_img, lang='por')
@@ -961,22 +1132,59 @@ class ModernMainWindow(QMainWindow):
             self._detected_model = model
             self._detected_confidence = score
             if model and score > 0.25:
-                self.props_panel.lbl_detect_icon.setPixmap(
-                    qta.icon(model.ICON, color='#4ec9b0').pixmap(20, 20))
-                self.props_panel.lbl_detect_result.setText(
-                    f"Detectado: {model.NAME} ({score:.0%})")
-                self.props_panel.btn_apply_detected.setVisible(True)
-                self.props_panel.auto_detect_banner.setVisible(True)
-                self.props_panel.combo_model.blockSignals(True)
-                idx = self.props_panel.combo_model.findText(model.NAME)
-                if idx >= 0:
-                    self.props_panel.combo_model.setCurrentIndex(idx)
-                self.props_panel.combo_model.blockSignals(False)
+                self._show_detected_model(model, score, " (visual + texto)" if model is hint else "")
             else:
                 self.props_panel.auto_detect_banner.setVisible(False)
         except Exception:
             pass
 
+    def batch_process_pages(self):
+        """Extrai todas as páginas do filtro em lote, ignorando páginas em branco."""
+        if not self.current_file_path:
+            QMessageBox.warning(self, "Aviso", "Carregue um documento primeiro.")
+            return
+
+        pages = self.parse_page_range(self.props_panel.txt_pages.text(), self.total_pages)
+        model_name = self.props_panel.combo_model.currentText()
+
+        self.progress.setRange(0, len(pages))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.set_status(f"Processando {len(pages)} páginas em lote...")
+        QApplication.processEvents()
+
+        def on_progress(done, total):
+            self.progress.setValue(done)
+            self.set_status(f"Processando página {done} de {total}...")
+            QApplication.processEvents()
+
+        try:
+            workers = OCRManager.MAX_WORKERS if len(pages) > 4 else 1
+            remove_lines = True if self.props_panel.chk_remove_lines.isChecked() else None
+            result = PagePipeline.process_document(self.current_file_path, pages, model_name,
+                                                   lang='por', workers=workers,
+                                                   page_options={'remove_lines': remove_lines},
+                                                   progress_callback=on_progress)
+        finally:
+            self.progress.setVisible(False)
+            self.progress.setRange(0, 0)
+
+        text = result['text']
+        self.current_text = text
+        self.current_df = result['df'] if not result['df'].empty else SmartParser.preview_structure(text)
+        self.current_model_data = next((p['data'] for p in result['pages'] if p['data']), {})
+        # Extracted fields per page, available to the split name template
+        self.batch_fields = {p['page']: p['data'] for p in result['pages'] if p['data']}
+        self.batch_fields_path = self.current_file_path
+
+        entities = SmartParser.extract_entities(text)
+        skipped = result['skipped_blank']
+        if skipped:
+            entities['PAGINAS_EM_BRANCO'] = [', '.join(str(p) for p in skipped)]
+        self.display_results(text, entities, self.current_df)
+        self.set_status("Lote concluído",
+                        f"{len(result['pages'])} páginas processadas, {len(skipped)} em branco ignoradas")
+
     def apply_detected_model(self):
         """Apply the auto-detected model and run full extraction."""
         if self._detected_model:
@@ -987,6 +1195,36 @@ class ModernMainWindow(QMainWindow):
             self.props_panel.combo_model.blockSignals(False)
             self.run_ocr_and_update("Aplicando modelo detectado...")
 
+    def _watch_model_specs(self):
+        try:
+            os.makedirs(ModelSpecs.USER_DIR, exist_ok=True)
+        except Exception as e:
+            print(f"Erro ao criar pasta de modelos: {e}")
+        paths = [d for d in ModelSpecs.spec_dirs() if os.path.isdir(d)] + ModelSpecs.spec_files()
+        watched = set(self.spec_watcher.directories() + self.spec_watcher.files())
+        new = [p for p in paths if p not in watched]
+        if new:
+            self.spec_watcher.addPaths(new)
+
+    def reload_model_specs(self, _path=None):
+        """Recompile declarative models and refresh the model combo, keeping the selection."""
+        self._watch_model_specs()
+        if not ModelManager.reload_specs(force=True):
+            return
+        combo = self.props_panel.combo_model
+        current = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem("Auto-Detectar")
+        for m in ModelManager.get_all_models():
+            combo.addItem(m.NAME)
+        idx = combo.findText(current)
+        combo.setCurrentIndex(idx if idx >= 0 else 0)
+        combo.blockSignals(False)
+        if self._detected_model is not None:
+            self._detected_model = ModelManager.get_model_by_name(self._detected_model.NAME)
+        self.set_status(f"Modelos recarregados: {len(ModelManager.get_all_models())} disponíveis")
+
     def open_model_library(self):
         """Open the visual model library dialog."""
         dlg = ModelLibraryDialog(
@@ -1200,6 +1438,31 @@ class ModernMainWindow(QMainWindow):
                     Exporter.to_txt(text, path)
                     QMessageBox.information(self, "Sucesso", f"Texto salvo em:\n{path}")
 
+            elif result == 5:  # Searchable PDF
+                if not self.current_file_path:
+                    return
+                path, _ = QFileDialog.getSaveFileName(self, "Salvar PDF Pesquisável", "", "PDF (*.pdf)")
+                if path:
+                    self.progress.setRange(0, max(1, self.total_pages))
+                    self.progress.setValue(0)
+                    self.progress.setVisible(True)
+
+                    def on_progress(done, total):
+                        self.progress.setValue(done)
+                        self.set_status(f"Gerando PDF pesquisável: página {done} de {total}...")
+                        QApplication.processEvents()
+
+                    try:
+                        ok = Exporter.to_searchable_pdf(self.current_file_path, path, lang='por',
+                                                        progress_callback=on_progress)
+                    finally:
+                        self.progress.setVisible(False)
+                        self.progress.setRange(0, 0)
+                    if ok:
+                        QMessageBox.information(self, "Sucesso", f"PDF pesquisável salvo em:\n{path}")
+                    else:
+                        QMessageBox.critical(self, "Erro", "Erro ao gerar o PDF pesquisável.")
+
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao exportar: {e}")
 
@@ -1233,12 +1496,50 @@ class ModernMainWindow(QMainWindow):
             elif mode == 'each':
                 folder = QFileDialog.getExistingDirectory(self, "Selecionar pasta de destino")
                 if folder:
+                    self.progress.setRange(0, total)
+                    self.progress.setValue(0)
                     self.progress.setVisible(True)
                     QApplication.processEvents()
-                    results = PDFTools.split_each_page(self.current_file_path, folder)
-                    self.progress.setVisible(False)
+
+                    def on_progress(done, count, path):
+                        self.progress.setValue(done)
+                        self.set_status(f"Gravando {done} de {count}: {os.path.basename(path)}")
+                        QApplication.processEvents()
+
+                    fields = self.batch_fields if self.batch_fields_path == self.current_file_path else None
+                    try:
+                        results = PDFTools.split_each_page(self.current_file_path, folder,
+                                                           name_template=dlg.txt_name_template.text().strip() or None,
+                                                           fields=fields, compress=dlg.chk_compress.isChecked(),
+                                                           progress_callback=on_progress)
+                    finally:
+                        self.progress.setVisible(False)
+                        self.progress.setRange(0, 0)
                     QMessageBox.information(self, "Sucesso", f"{len(results)} arquivos gerados em:\n{folder}")
 
+            elif mode == 'segment':
+                folder = QFileDialog.getExistingDirectory(self, "Selecionar pasta de destino")
+                if folder:
+                    self.progress.setRange(0, total)
+                    self.progress.setValue(0)
+                    self.progress.setVisible(True)
+
+                    def on_progress(done, count):
+                        self.progress.setValue(done)
+                        self.set_status(f"Analisando cabeçalho da página {done} de {count}...")
+                        QApplication.processEvents()
+
+                    try:
+                        segments = DocumentSegmenter.segment(self.current_file_path, progress_callback=on_progress)
+                        self.progress.setRange(0, 0)
+                        self.set_status(f"{len(segments)} documentos encontrados. Gravando...")
+                        QApplication.processEvents()
+                        results = DocumentSegmenter.split(self.current_file_path, folder, segments)
+                    finally:
+                        self.progress.setVisible(False)
+                        self.progress.setRange(0, 0)
+                    QMessageBox.information(self, "Sucesso", f"{len(results)} documentos separados em:\n{folder}")
+
             elif mode == 'extract':
                 pages_str = dlg.txt_pages.text()
                 pages = self._parse_page_list(pages_str, total)
@@ -1264,15 +1565,94 @@ class ModernMainWindow(QMainWindow):
 
         path, _ = QFileDialog.getSaveFileName(self, "Salvar PDF Mesclado", "", "PDF (*.pdf)")
         if path:
+            self.progress.setRange(0, len(files))
+            self.progress.setValue(0)
             self.progress.setVisible(True)
             QApplication.processEvents()
-            ok = PDFTools.merge_pdfs(files, path)
-            self.progress.setVisible(False)
+
+            def on_progress(done, total):
+                self.progress.setValue(done)
+                self.set_status(f"Mesclando arquivo {done} de {total}...")
+                QApplication.processEvents()
+
+            try:
+                ok = PDFTools.merge_pdfs(files, path, progress_callback=on_progress)
+            finally:
+                self.progress.setVisible(False)
+                self.progress.setRange(0, 0)
             if ok:
                 QMessageBox.information(self, "Sucesso", f"PDFs mesclados em:\n{path}\n({len(files)} arquivos)")
             else:
                 QMessageBox.critical(self, "Erro", "Erro ao mesclar PDFs.")
 
+    def auto_rotate_pdf(self):
+        if not self.current_file_path or not self.current_file_path.lower().endswith('.pdf'):
+            QMessageBox.warning(self, "Aviso", "Carregue um arquivo PDF primeiro.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar PDF Corrigido", "", "PDF (*.pdf)")
+        if not path:
+            return
+
+        self.progress.setRange(0, max(1, self.total_pages))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+
+        def on_progress(done, total):
+            self.progress.setValue(done)
+            self.set_status(f"Detectando orientação: página {done} de {total}...")
+            QApplication.processEvents()
+
+        try:
+            applied = PDFTools.auto_rotate(self.current_file_path, path, progress_callback=on_progress)
+        finally:
+            self.progress.setVisible(False)
+            self.progress.setRange(0, 0)
+
+        if not os.path.exists(path):
+            QMessageBox.critical(self, "Erro", "Erro ao gravar o PDF corrigido.")
+            return
+        pages_lbl = ', '.join(str(p) for p, _ in applied[:20]) + (" ..." if len(applied) > 20 else "")
+        QMessageBox.information(self, "Sucesso",
+                                f"{len(applied)} páginas corrigidas{': ' + pages_lbl if applied else ''}\n"
+                                f"PDF salvo em:\n{path}")
+        self.page_cache.clear()
+        self.sidebar.file_list.addItem(path)
+        self.process_file(path)
+
+    def optimize_pdfs(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Selecionar PDFs para otimizar", "", "PDF (*.pdf)")
+        if not files:
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Selecionar pasta de destino")
+        if not folder:
+            return
+        if any(os.path.abspath(os.path.dirname(f)) == os.path.abspath(folder) for f in files):
+            QMessageBox.warning(self, "Aviso", "Escolha uma pasta de destino diferente da pasta dos arquivos originais.")
+            return
+
+        self.progress.setRange(0, len(files))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        QApplication.processEvents()
+
+        def on_progress(done, total):
+            self.progress.setValue(done)
+            self.set_status(f"Otimizando arquivo {done} de {total}...")
+            QApplication.processEvents()
+
+        try:
+            results = PDFTools.optimize_batch(files, folder, progress_callback=on_progress)
+        finally:
+            self.progress.setVisible(False)
+            self.progress.setRange(0, 0)
+
+        before = sum(r['before'] for r in results.values())
+        after = sum(r['after'] for r in results.values() if r['after'])
+        saved = (1 - after / before) * 100 if before and after else 0
+        QMessageBox.information(self, "Sucesso",
+                                f"{len(results)} arquivos otimizados em:\n{folder}\n"
+                                f"{before / 1048576:.1f} MB → {after / 1048576:.1f} MB ({saved:.0f}% menor)")
+
     def _parse_page_list(self, page_str, total_pages):
         """Parse '1, 3, 5-8, 12' into list of ints."""
         pages = set()
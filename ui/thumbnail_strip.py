@@ -0,0 +1,263 @@
+"""
+Strukturis Pro — Faixa de Miniaturas de Páginas
+Lista virtualizada de miniaturas renderizadas fora da thread da interface,
+apenas para os itens visíveis (mais uma margem), com cache em disco por
+arquivo (caminho, tamanho e data de modificação) limitado em tamanho.
+"""
+
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+import cv2
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import (Qt, Signal, QObject, QRunnable, QThreadPool, QTimer,
+                            QAbstractListModel, QModelIndex, QSize)
+from PySide6.QtGui import QImage, QPixmap
+from core.image_processing import ImageProcessing
+
+
+THUMB_DIR = os.path.join(os.path.expanduser('~'), '.strukturis', 'thumbs')
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def file_digest(path):
+    """
+    Chave do cache de miniaturas: SHA-1 de (caminho absoluto, tamanho,
+    mtime). Só um stat — o arquivo não é lido na thread da interface.
+    """
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def prune_cache(keep=None, max_bytes=MAX_CACHE_BYTES):
+    """Apaga as pastas de documentos usadas há mais tempo até caber em max_bytes."""
+    if not os.path.isdir(THUMB_DIR):
+        return
+    entries, total = [], 0
+    for name in os.listdir(THUMB_DIR):
+        folder = os.path.join(THUMB_DIR, name)
+        if not os.path.isdir(folder):
+            continue
+        try:
+            size = sum(e.stat().st_size for e in os.scandir(folder) if e.is_file())
+            entries.append((os.path.getmtime(folder), name, folder, size))
+        except OSError:
+            continue
+        total += size
+    for _, name, folder, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(folder, ignore_errors=True)
+        total -= size
+
+
+def _to_qimage(img):
+    """Converte BGR/cinza (numpy) em um QImage que possui os próprios bytes."""
+    h, w = img.shape[:2]
+    if img.ndim == 2:
+        return QImage(img.data, w, h, w, QImage.Format_Grayscale8).copy()
+    return QImage(img.data, w, h, 3 * w, QImage.Format_RGB888).rgbSwapped()
+
+
+class _ThumbSignals(QObject):
+    ready = Signal(str, int, QImage)
+
+
+class _PruneJob(QRunnable):
+    """Limpeza do cache em disco fora da thread da interface."""
+
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def run(self):
+        try:
+            # Marca o documento aberto como recém-usado antes de limpar
+            folder = os.path.join(THUMB_DIR, self.keep)
+            if os.path.isdir(folder):
+                os.utime(folder)
+            prune_cache(self.keep)
+        except Exception as e:
+            print(f"Erro ao limpar cache de miniaturas: {e}")
+
+
+class _ThumbJob(QRunnable):
+    """Carrega uma miniatura do cache em disco ou a renderiza do PDF."""
+
+    def __init__(self, path, digest, page_idx, side, signals):
+        super().__init__()
+        self.path = path
+        self.digest = digest
+        self.page_idx = page_idx
+        self.side = side
+        self.signals = signals
+
+    def run(self):
+        cache_file = os.path.join(THUMB_DIR, self.digest, f"{self.side}_{self.page_idx}.png")
+        img = cv2.imread(cache_file) if os.path.exists(cache_file) else None
+        if img is None:
+            # O render passa pelo ImageProcessing.RENDER_LOCK, o mesmo da página
+            # principal; leitura do cache e conversão para QImage seguem em paralelo
+            img = ImageProcessing.load_pdf_thumbnail(self.path, self.page_idx,
+                                                     max_side=self.side, color=True)
+            if img is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                cv2.imwrite(cache_file, img)
+            except Exception as e:
+                print(f"Erro ao salvar miniatura: {e}")
+        self.signals.ready.emit(self.digest, self.page_idx, _to_qimage(img))
+
+
+class ThumbnailModel(QAbstractListModel):
+    """Uma linha por página; guarda em memória só as últimas MAX_CACHED miniaturas."""
+
+    MAX_CACHED = 400
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.count = 0
+        self._pixmaps = OrderedDict()
+
+    def reset(self, count):
+        self.beginResetModel()
+        self.count = count
+        self._pixmaps.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return str(index.row() + 1)
+        if role == Qt.DecorationRole:
+            return self._pixmaps.get(index.row())
+        return None
+
+    def has_pixmap(self, row):
+        return row in self._pixmaps
+
+    def set_pixmap(self, row, pixmap):
+        if row >= self.count:
+            return
+        self._pixmaps[row] = pixmap
+        self._pixmaps.move_to_end(row)
+        while len(self._pixmaps) > self.MAX_CACHED:
+            self._pixmaps.popitem(last=False)
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+
+class ThumbnailStrip(QListView):
+    """Faixa horizontal de miniaturas; page_selected(idx 0-based) ao clicar."""
+
+    page_selected = Signal(int)
+
+    THUMB_SIDE = 120
+    PREFETCH = 6
+    MAX_THREADS = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        side = self.THUMB_SIDE
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(False)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(0)
+        self.setIconSize(QSize(side, side))
+        self.setGridSize(QSize(side + 16, side + 22))
+        self.setFixedHeight(side + 42)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setStyleSheet("""
+            QListView { background: #252526; border: none; border-top: 1px solid #3e3e42; color: #aaa; }
+            QListView::item:selected { background: #094771; color: white; border-radius: 4px; }
+        """)
+
+        self._model = ThumbnailModel(self)
+        self.setModel(self._model)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(self.MAX_THREADS)
+        self._signals = _ThumbSignals()
+        self._signals.ready.connect(self._on_ready)
+
+        # Agrupa eventos de rolagem/redimensionamento em uma única requisição
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(40)
+        self._timer.timeout.connect(self._request_visible)
+        self.horizontalScrollBar().valueChanged.connect(lambda _: self._timer.start())
+
+        self.clicked.connect(lambda idx: self.page_selected.emit(idx.row()))
+
+        self._path = None
+        self._digest = None
+        self._pending = set()
+
+    def set_document(self, path, page_count):
+        """Troca o documento exibido (path=None esvazia a faixa)."""
+        self._pool.clear()
+        self._pending.clear()
+        self._path = path
+        try:
+            self._digest = file_digest(path) if path else None
+        except Exception as e:
+            print(f"Erro ao ler arquivo para miniaturas: {e}")
+            self._path, self._digest = None, None
+        self._model.reset(page_count if self._path else 0)
+        self._timer.start()
+        if self._digest:
+            QThreadPool.globalInstance().start(_PruneJob(self._digest))
+
+    def set_current(self, page_idx):
+        """Destaca e rola até a página atual (sem emitir page_selected)."""
+        if 0 <= page_idx < self._model.count:
+            idx = self._model.index(page_idx)
+            self.setCurrentIndex(idx)
+            self.scrollTo(idx)
+
+    def _visible_rows(self):
+        # Grade uniforme: a faixa visível sai direto da posição da rolagem
+        cell = self.gridSize().width()
+        first = self.horizontalScrollBar().value() // cell
+        last = first + self.viewport().width() // cell
+        return first, min(last, self._model.count - 1)
+
+    def _request_visible(self):
+        if not self._path or self._model.count == 0:
+            return
+        first, last = self._visible_rows()
+        lo = max(0, first - self.PREFETCH)
+        hi = min(self._model.count - 1, last + self.PREFETCH)
+
+        # Itens fora da faixa atual que ainda não começaram são descartados
+        self._pool.clear()
+        self._pending.clear()
+        # Visíveis primeiro, depois a margem
+        rows = list(range(first, last + 1)) + list(range(lo, first)) + list(range(last + 1, hi + 1))
+        for row in rows:
+            if row in self._pending or self._model.has_pixmap(row):
+                continue
+            self._pending.add(row)
+            self._pool.start(_ThumbJob(self._path, self._digest, row, self.THUMB_SIDE, self._signals))
+
+    def _on_ready(self, digest, row, qimg):
+        if digest != self._digest:
+            return  # resultado de um documento anterior
+        self._pending.discard(row)
+        self._model.set_pixmap(row, QPixmap.fromImage(qimg))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._timer.start()